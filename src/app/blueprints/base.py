@@ -1,9 +1,13 @@
-from flask import Blueprint, jsonify, request
+from collections.abc import Iterable
+
+from flask import Blueprint, current_app, jsonify, request, Response, stream_with_context
 from flask_marshmallow import Schema
 from flask_restx import Resource
 
 from ..extensions import api as root_api
 
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
 blueprint = Blueprint('base', __name__)
 api = root_api.namespace('', description='Base endpoints')
 
@@ -63,6 +67,36 @@ class BaseResource(Resource, SerializerMixin):
 
         return file
 
+    @staticmethod
+    def get_request_file_stream(field_name: str = None) -> dict:
+        """Like `get_request_file`, but the file is returned as a stream instead of being read."""
+        field_name = field_name or 'document'
+        file = {}
+        request_file = request.files.get(field_name)
+
+        if request_file:
+            file = {
+                'mime_type': request_file.mimetype,
+                'filename': request_file.filename,
+                'file_stream': request_file.stream,
+            }
+
+        return file
+
+    @staticmethod
+    def accepts_ndjson() -> bool:
+        return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+    @staticmethod
+    def stream_ndjson(records: Iterable, serializer: Schema) -> Response:
+        """Serialize records one at a time as newline delimited JSON."""
+
+        def generate():
+            for record in records:
+                yield f'{current_app.json.dumps(serializer.dump(record, many=False))}\n'
+
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
 
 @api.route('/welcome')
 class WelcomeResource(Resource):
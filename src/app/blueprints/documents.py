@@ -1,15 +1,18 @@
 from dependency_injector.wiring import inject, Provide
-from flask import Blueprint, request, send_file
+from flask import Blueprint, request, Response
 from flask_jwt_extended import jwt_required
+from flask_restx import marshal
 from flask_security import roles_accepted
 from marshmallow import EXCLUDE
 from werkzeug.datastructures import FileStorage as WerkzeugFileStorage
 
 from app import serializers, swagger as swagger_models
-from app.blueprints.base import BaseResource
+from app.blueprints.base import BaseResource, NDJSON_MIMETYPE
 from app.di_container import ServiceDIContainer
 from app.extensions import api as root_api
-from app.models.document import StorageTypes
+from app.helpers.document_download import send_document
+from app.helpers.otp_token import OTPTokenManager
+from app.models.document import Document, StorageTypes
 from app.models.role import ROLES
 from app.serializers.document import DocumentStorageTypeSerializer
 from app.services.document import DocumentService
@@ -59,7 +62,7 @@ class NewDocumentResource(BaseDocumentResource):
         request_args = self.get_serializer(serializer_name='document_storage_type').load(
             request.args.to_dict(), unknown=EXCLUDE
         )
-        validated_data = serializer.valid_request_file(self.get_request_file())
+        validated_data = serializer.valid_request_file(self.get_request_file_stream())
         validated_data.update(request_args)
 
         document = self.service.create(**validated_data)
@@ -110,7 +113,7 @@ class DocumentResource(BaseDocumentResource):
             request_args = self.get_serializer(serializer_name='document_attachment').load(
                 request.args.to_dict(), unknown=EXCLUDE
             )
-            response = send_file(**self.service.get_document_content(document_id, request_args))
+            response = send_document(**self.service.get_document_content(document_id, request_args))
         else:
             document = self.service.find_by_id(document_id)
             response = serializer.dump(document), 200
@@ -128,7 +131,7 @@ class DocumentResource(BaseDocumentResource):
     def put(self, document_id: int) -> tuple:
         serializer = self.get_serializer(serializer_name='document')
         serializer.load({'id': document_id}, partial=True)
-        validated_data = serializer.valid_request_file(self.get_request_file())
+        validated_data = serializer.valid_request_file(self.get_request_file_stream())
 
         document = self.service.save(document_id, **validated_data)
 
@@ -149,6 +152,38 @@ class DocumentResource(BaseDocumentResource):
         return serializer.dump(document), 200
 
 
+@api.route('/download/<string:token>')
+@api.doc(params={'token': 'A download token sent by email'})
+class DocumentDownloadResource(BaseDocumentResource):
+    serializer_class = serializers.DocumentSerializer
+
+    @inject
+    def __init__(
+        self,
+        rest_api: str,
+        *args,
+        otp_token_manager: OTPTokenManager = Provide[ServiceDIContainer.document_download_token_manager],
+        **kwargs,
+    ):
+        super().__init__(rest_api, *args, **kwargs)
+        self.otp_token_manager = otp_token_manager
+
+    @api.doc(responses={200: 'Success', 400: 'Bad Request', 404: 'Not Found'})
+    @api.produces(['application/octet-stream'])
+    def get(self, token: str) -> Response:
+        """Download a document with a signed link.
+
+        The links are sent by email instead of the documents which are too big to be attached, the token
+        authorizes the download of one document until it expires.
+
+        """
+        document_id = self.otp_token_manager.verify_token(token)
+        # NOTE: A link outlives its document, the deleted documents can't be downloaded
+        self.get_serializer().load({'id': document_id}, partial=True)
+
+        return send_document(**self.service.get_document_content(document_id, {'as_attachment': 1}))
+
+
 @api.route('/search')
 class SearchDocumentResource(BaseDocumentResource):
     serializer_classes = {'document': serializers.DocumentSerializer, 'search': serializers.SearchSerializer}
@@ -159,16 +194,33 @@ class SearchDocumentResource(BaseDocumentResource):
         responses={200: 'Success', 401: 'Unauthorized', 403: 'Forbidden', 422: 'Unprocessable Entity'},
         security='auth_token',
     )
+    # NOTE: api.marshal_with cannot handle streamed responses. That's the reason is not added here.
+    @api.response(200, 'Success', swagger_models.document_search_output_sw_model)
+    @api.produces(['application/json', NDJSON_MIMETYPE])
     @api.expect(swagger_models.search_input_sw_model)
-    @api.marshal_with(swagger_models.document_search_output_sw_model)
-    def post(self) -> tuple:
-        serializer = self.get_serializer(serializer_name='document', many=True)
-        validated_data = self.get_serializer(serializer_name='search').load(request.get_json())
+    def post(self) -> tuple | Response:
+        """Search documents.
 
-        doc_data = self.service.get(**validated_data)
+        - `Accept: application/json`: returns a page of documents with its counters.
+        - `Accept: application/x-ndjson`: streams the page of documents, one JSON per line.
 
-        return {
-            'data': serializer.dump(list(doc_data['query'])),
-            'records_total': doc_data['records_total'],
-            'records_filtered': doc_data['records_filtered'],
-        }, 200
+        """
+        serializer = self.get_serializer(serializer_name='document', many=True)
+        validated_data = self.get_serializer(serializer_name='search', db_model=Document).load(request.get_json())
+
+        if self.accepts_ndjson():
+            records = self.service.stream(**validated_data, load_plan=serializer.get_load_plan())
+            return self.stream_ndjson(records, serializer)
+
+        doc_data = self.service.get(**validated_data, load_plan=serializer.get_load_plan())
+
+        return marshal(
+            {
+                'data': serializer.dump(doc_data['records']),
+                'records_total': doc_data['records_total'],
+                'records_filtered': doc_data['records_filtered'],
+                'has_more': doc_data['has_more'],
+                'next_cursor': doc_data['next_cursor'],
+            },
+            swagger_models.document_search_output_sw_model,
+        ), 200
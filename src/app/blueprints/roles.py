@@ -7,6 +7,7 @@ from app import serializers, swagger as swagger_models
 from app.extensions import api as root_api
 
 from ..di_container import ServiceDIContainer
+from ..models import Role
 from ..models.role import ADMIN_ROLE
 from ..services.role import RoleService
 from .base import BaseResource
@@ -109,12 +110,14 @@ class RolesSearchResource(BaseRoleResource):
     @api.marshal_with(swagger_models.role_search_output_sw_model)
     def post(self) -> tuple:
         serializer = self.get_serializer(serializer_name='role', many=True)
-        validated_data = self.get_serializer(serializer_name='search').load(request.get_json())
+        validated_data = self.get_serializer(serializer_name='search', db_model=Role).load(request.get_json())
 
-        doc_data = self.service.get(**validated_data)
+        doc_data = self.service.get(**validated_data, load_plan=serializer.get_load_plan())
 
         return {
-            'data': serializer.dump(list(doc_data['query'])),
+            'data': serializer.dump(doc_data['records']),
             'records_total': doc_data['records_total'],
             'records_filtered': doc_data['records_filtered'],
+            'has_more': doc_data['has_more'],
+            'next_cursor': doc_data['next_cursor'],
         }, 200
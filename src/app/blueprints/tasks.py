@@ -1,10 +1,15 @@
+import hashlib
+
 from celery import states
 from celery.result import AsyncResult
-from flask import Blueprint
+from flask import Blueprint, current_app, request, Response
 from flask_jwt_extended import jwt_required
 from flask_restx import Resource
 from flask_security import roles_accepted
 
+from app import serializers
+from app.blueprints.base import SerializerMixin
+from app.celery.progress_store import get_finished_task_status, get_progress_store
 from app.extensions import api as root_api
 from app.models.role import ROLES
 
@@ -12,23 +17,147 @@ blueprint = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 api = root_api.namespace('tasks', description='Tasks endpoints')
 
 
-@api.route('/status/<string:task_id>')
-class TaskStatusResource(Resource):
-    @jwt_required()
-    @roles_accepted(*ROLES)
-    @api.doc(
-        responses={401: 'Unauthorized', 403: 'Forbidden', 404: 'Not found', 422: 'Unprocessable Entity'},
-        security='auth_token',
-    )
-    def get(self, task_id: str):
+class BaseTaskStatusResource(Resource):
+    @staticmethod
+    def _get_backend_task_status(task_id: str) -> dict:
         task_data = AsyncResult(task_id)
+
+        if task_data.state == states.SUCCESS:
+            # NOTE: A task can return anything, e.g. the callback of the exports returns True
+            return get_finished_task_status(task_data.info, task_data.state)
+
         response = {'state': task_data.state}
 
         if task_data.state == states.PENDING:
             response.update({'current': 0, 'total': 1})
-        elif task_data.state in [states.STARTED, states.SUCCESS]:
-            response.update(task_data.info)
+        elif task_data.state == states.STARTED:
+            task_info = task_data.info if isinstance(task_data.info, dict) else {}
+            response.update({'current': 0, 'total': 1, **task_info})
         else:
             response.update({'current': 1, 'total': 1})
 
-        return response, 200
+        return response
+
+    def _get_tasks_status(self, task_ids: list) -> dict:
+        """Status of the tasks, read from the progress store in one call if the application has one."""
+        store = get_progress_store()
+
+        if store is None:
+            return {task_id: self._get_backend_task_status(task_id) for task_id in task_ids}
+
+        return {
+            task_id: task_status or {'state': states.PENDING, 'current': 0, 'total': 1}
+            for task_id, task_status in store.get_many(task_ids).items()
+        }
+
+    def _get_aggregated_tasks_status(self, task_ids: list) -> dict:
+        """Status of the tasks, a task which dispatched a group of tasks has the status of the group."""
+        tasks_status = self._get_tasks_status(task_ids)
+        groups = {
+            task_id: task_status
+            for task_id, task_status in tasks_status.items()
+            if task_status['state'] == states.SUCCESS and 'children' in task_status
+        }
+
+        if groups:
+            group_task_ids = [
+                group_task_id for group in groups.values() for group_task_id in [*group['children'], group['callback']]
+            ]
+            group_tasks_status = self._get_tasks_status(group_task_ids)
+
+            for task_id, group in groups.items():
+                tasks_status[task_id] = self._get_group_status(
+                    [group_tasks_status[child_id] for child_id in group['children']],
+                    group_tasks_status[group['callback']],
+                )
+
+        return tasks_status
+
+    @staticmethod
+    def _get_group_status(children_status: list, callback_status: dict) -> dict:
+        """Status of tasks which run in parallel and of the callback run once they finish.
+
+        The progress is the sum of the progress of the tasks, the callback
+        counts as one more step. The result has the results of the tasks.
+
+        """
+        tasks_states = [task_status['state'] for task_status in [*children_status, callback_status]]
+
+        if any(state in states.PROPAGATE_STATES for state in tasks_states):
+            state = states.FAILURE
+        elif all(state == states.SUCCESS for state in tasks_states):
+            state = states.SUCCESS
+        else:
+            state = states.STARTED
+
+        callback_current = 1 if callback_status['state'] == states.SUCCESS else 0
+
+        return {
+            'state': state,
+            'current': sum(task_status['current'] for task_status in children_status) + callback_current,
+            'total': sum(task_status['total'] for task_status in children_status) + 1,
+            'result': [task_status.get('result') for task_status in children_status],
+        }
+
+    @staticmethod
+    def _make_response(response: dict, tasks_states: list) -> tuple | Response:
+        """Add the polling hints to the response.
+
+        The ETag changes with the status, so a client which sends it in
+        `If-None-Match` gets a 304 without body while nothing changes.
+        `Retry-After` asks the clients to wait before polling again while a
+        task hasn't finished.
+
+        """
+        etag = hashlib.md5(current_app.json.dumps(response).encode(), usedforsecurity=False).hexdigest()
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+
+        if any(state not in states.READY_STATES for state in tasks_states):
+            headers['Retry-After'] = str(current_app.config['TASK_STATUS_RETRY_AFTER'])
+
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+        return response, 200, headers
+
+
+@api.route('/status')
+class TasksStatusResource(BaseTaskStatusResource, SerializerMixin):
+    parser = api.parser()
+    parser.add_argument('task_ids', type=str, location='args', required=True, action='append')
+
+    serializer_class = serializers.TaskStatusSerializer
+
+    @jwt_required()
+    @roles_accepted(*ROLES)
+    @api.doc(
+        responses={304: 'Not Modified', 401: 'Unauthorized', 403: 'Forbidden', 422: 'Unprocessable Entity'},
+        security='auth_token',
+    )
+    @api.expect(parser)
+    def get(self):
+        task_ids = self.get_serializer().load({'task_ids': request.args.getlist('task_ids')})['task_ids']
+        tasks_status = self._get_aggregated_tasks_status(list(dict.fromkeys(task_ids)))
+        response = {'data': [{'task_id': task_id, **tasks_status[task_id]} for task_id in task_ids]}
+
+        return self._make_response(response, [task_status['state'] for task_status in tasks_status.values()])
+
+
+@api.route('/status/<string:task_id>')
+class TaskStatusResource(BaseTaskStatusResource):
+    @jwt_required()
+    @roles_accepted(*ROLES)
+    @api.doc(
+        responses={
+            304: 'Not Modified',
+            401: 'Unauthorized',
+            403: 'Forbidden',
+            404: 'Not found',
+            422: 'Unprocessable Entity',
+        },
+        security='auth_token',
+    )
+    def get(self, task_id: str):
+        response = self._get_aggregated_tasks_status([task_id])[task_id]
+
+        return self._make_response(response, [response['state']])
@@ -1,17 +1,19 @@
 from dependency_injector.wiring import inject, Provide
-from flask import Blueprint, request, url_for
+from flask import Blueprint, request, Response, url_for
 from flask_jwt_extended import jwt_required
 from flask_login import current_user
+from flask_restx import marshal
 from flask_security import roles_accepted
 from marshmallow import EXCLUDE
 
 from app import serializers, swagger as swagger_models
-from app.blueprints.base import BaseResource
+from app.blueprints.base import BaseResource, NDJSON_MIMETYPE
 from app.celery.excel.tasks import export_user_data_in_excel_task
 from app.celery.tasks import create_user_email_task, create_word_and_excel_documents_task
 from app.celery.word.tasks import export_user_data_in_word_task
 from app.di_container import ServiceDIContainer
 from app.extensions import api as root_api
+from app.models import User
 from app.models.role import ADMIN_ROLE, ROLES, TEAM_LEADER_ROLE
 from app.services.user import UserService
 
@@ -114,19 +116,36 @@ class UsersSearchResource(BaseUserResource):
         responses={200: 'Success', 401: 'Unauthorized', 403: 'Forbidden', 422: 'Unprocessable Entity'},
         security='auth_token',
     )
+    # NOTE: api.marshal_with cannot handle streamed responses. That's the reason is not added here.
+    @api.response(200, 'Success', swagger_models.user_search_output_sw_model)
+    @api.produces(['application/json', NDJSON_MIMETYPE])
     @api.expect(swagger_models.search_input_sw_model)
-    @api.marshal_with(swagger_models.user_search_output_sw_model)
-    def post(self) -> tuple:
+    def post(self) -> tuple | Response:
+        """Search users.
+
+        - `Accept: application/json`: returns a page of users with its counters.
+        - `Accept: application/x-ndjson`: streams the page of users, one JSON per line.
+
+        """
         serializer = self.get_serializer(serializer_name='user', many=True)
-        validated_data = self.get_serializer(serializer_name='search').load(request.get_json())
+        validated_data = self.get_serializer(serializer_name='search', db_model=User).load(request.get_json())
 
-        doc_data = self.service.get(**validated_data)
+        if self.accepts_ndjson():
+            records = self.service.stream(**validated_data, load_plan=serializer.get_load_plan())
+            return self.stream_ndjson(records, serializer)
 
-        return {
-            'data': serializer.dump(list(doc_data['query'])),
-            'records_total': doc_data['records_total'],
-            'records_filtered': doc_data['records_filtered'],
-        }, 200
+        doc_data = self.service.get(**validated_data, load_plan=serializer.get_load_plan())
+
+        return marshal(
+            {
+                'data': serializer.dump(doc_data['records']),
+                'records_total': doc_data['records_total'],
+                'records_filtered': doc_data['records_filtered'],
+                'has_more': doc_data['has_more'],
+                'next_cursor': doc_data['next_cursor'],
+            },
+            swagger_models.user_search_output_sw_model,
+        ), 200
 
 
 @api.route('/xlsx')
@@ -141,7 +160,7 @@ class ExportUsersExcelResource(BaseUserResource):
     )
     @api.expect(swagger_models.search_input_sw_model)
     def post(self) -> tuple:
-        serializer = self.get_serializer()
+        serializer = self.get_serializer(db_model=User)
         deserialized_data = serializer.load(request.get_json())
 
         task = export_user_data_in_excel_task.apply_async((current_user.id, deserialized_data), countdown=5)
@@ -168,7 +187,7 @@ class ExportUsersWordResource(BaseUserResource):
     @api.expect(parser, swagger_models.search_input_sw_model)
     def post(self) -> tuple:
         payload, args = request.get_json(), request.args.to_dict()
-        serializer = self.get_serializer(serializer_name='search')
+        serializer = self.get_serializer(serializer_name='search', db_model=User)
         deserialized_data = serializer.load(payload)
         request_args = self.get_serializer(serializer_name='user_export_word').load(args, unknown=EXCLUDE)
         to_pdf = request_args.get('to_pdf', 0)
@@ -200,11 +219,14 @@ class ExportUsersExcelAndWordResource(BaseUserResource):
     @api.expect(parser, swagger_models.search_input_sw_model)
     def post(self) -> tuple:
         payload, args = request.get_json(), request.args.to_dict()
-        serializer = self.get_serializer(serializer_name='search')
+        serializer = self.get_serializer(serializer_name='search', db_model=User)
         deserialized_data = serializer.load(payload)
         request_args = self.get_serializer(serializer_name='user_export_word').load(args, unknown=EXCLUDE)
         to_pdf = request_args.get('to_pdf', 0)
 
-        create_word_and_excel_documents_task.apply_async(args=[current_user.id, deserialized_data, to_pdf])
+        task = create_word_and_excel_documents_task.apply_async(args=[current_user.id, deserialized_data, to_pdf])
 
-        return {}, 202
+        return {
+            'task': task.id,
+            'url': url_for('tasks_task_status_resource', task_id=task.id, _external=True),
+        }, 202
@@ -1,9 +1,17 @@
 """Runs Celery and registers Celery tasks."""
 
 import logging
+import threading
 
-from celery import Celery, Task
-from flask import Flask
+from celery import Celery, states, Task
+from celery.signals import task_postrun, task_prerun, worker_process_init, worker_process_shutdown
+from flask import current_app, Flask, g, has_app_context
+from flask.ctx import AppContext
+from flask.globals import app_ctx
+
+from app.celery.mail import get_mail_renderer
+from app.celery.progress import ProgressReporter
+from app.celery.progress_store import get_finished_task_status, get_progress_store
 
 
 class MyCelery(Celery):
@@ -47,6 +55,7 @@ class MyCelery(Celery):
 class ContextTask(Task):
     abstract = True
     queue = 'default'
+    flask_app = None
 
     def on_failure(self, exc, task_id, args, kwargs, einfo) -> None:
         """Handler called when the task fails.
@@ -137,6 +146,117 @@ class ContextTask(Task):
         """
         logging.info('Celery task started')
 
+    def get_progress_reporter(self, total: int) -> ProgressReporter:
+        """Create a reporter which coalesces the progress updates of the task.
+
+        The reporter is rate limited by `TASK_PROGRESS_MIN_INTERVAL_MS` and
+        `TASK_PROGRESS_MIN_STEP`, it writes in the progress store of the
+        application if there is one.
+
+        Parameters
+        ----------
+        total : int
+            Total of items processed by the task.
+
+        Returns
+        -------
+        ProgressReporter
+
+        """
+        return ProgressReporter(
+            self,
+            total,
+            min_interval=current_app.config['TASK_PROGRESS_MIN_INTERVAL_MS'] / 1000,
+            min_step=current_app.config['TASK_PROGRESS_MIN_STEP'],
+            store=get_progress_store(),
+        )
+
+
+_worker_state = threading.local()
+
+
+def _is_worker_app_context(app: Flask) -> bool:
+    app_context = getattr(_worker_state, 'app_context', None)
+    return has_app_context() and app_ctx._get_current_object() is app_context and app_context.app is app
+
+
+def _get_worker_app_context(app: Flask) -> AppContext | None:
+    """Return the application context reused by the tasks of the current thread.
+
+    The context is pushed by the first task and it's never popped. None is
+    returned if another context is pushed, e.g. by a request which runs an
+    eager task, in that case the task pushes its own context.
+
+    """
+    if not has_app_context():
+        _worker_state.app_context = app.app_context()
+        _worker_state.app_context.push()
+        _worker_state.depth = 0
+
+    return _worker_state.app_context if _is_worker_app_context(app) else None
+
+
+@task_prerun.connect
+def begin_task_session(task: Task = None, **kwargs) -> None:  # pylint: disable=unused-argument
+    app = getattr(task, 'flask_app', None)
+
+    if app is None or not app.config['CELERY_REUSE_APP_CONTEXT'] or _get_worker_app_context(app) is None:
+        return
+
+    # NOTE: An eager task which runs inside another task (e.g. a chord callback) shares its session.
+    _worker_state.depth += 1
+
+
+@task_postrun.connect
+def end_task_session(task: Task = None, **kwargs) -> None:  # pylint: disable=unused-argument
+    """Roll back and remove the session of a task which ran in the worker application context.
+
+    The tasks commit their own changes, the uncommitted ones are discarded
+    as they are when a new application context is popped, and the next
+    task gets a new session.
+
+    """
+    app = getattr(task, 'flask_app', None)
+
+    if app is None or not app.config['CELERY_REUSE_APP_CONTEXT'] or not _is_worker_app_context(app):
+        return
+
+    _worker_state.depth -= 1
+
+    if _worker_state.depth > 0:
+        return
+
+    vars(g).clear()
+    session = app.extensions['sqlalchemy'].session
+
+    if not session.registry.has():
+        return
+
+    try:
+        session.rollback()
+    finally:
+        session.remove()
+
+
+@task_prerun.connect
+def save_task_started(task_id: str = None, task: Task = None, **kwargs) -> None:  # pylint: disable=unused-argument
+    app = getattr(task, 'flask_app', None)
+    store = get_progress_store(app) if app else None
+
+    if store is not None:
+        store.save(task_id, {'state': states.STARTED, 'current': 0, 'total': 1})
+
+
+@task_postrun.connect
+def save_task_finished(
+    task_id: str = None, task: Task = None, retval: object = None, state: str = None, **kwargs
+) -> None:  # pylint: disable=unused-argument
+    app = getattr(task, 'flask_app', None)
+    store = get_progress_store(app) if app else None
+
+    if store is not None:
+        store.save(task_id, get_finished_task_status(retval, state))
+
 
 def make_celery(app: Flask) -> Celery:
     celery = MyCelery(app.import_name)
@@ -154,6 +274,9 @@ def make_celery(app: Flask) -> Celery:
         Without this wrapper, attempting to access Flask-specific features inside a Celery task will raise:
             RuntimeError: Working outside of application context.
 
+        If `CELERY_REUSE_APP_CONTEXT` is enabled, the task runs in the application context of the
+        worker process, which is pushed by the `task_prerun` hook.
+
         Args
         ----
             *args: Positional arguments passed to the task.
@@ -164,10 +287,40 @@ def make_celery(app: Flask) -> Celery:
             The result of the task's `run` method.
 
         """
+        if app.config['CELERY_REUSE_APP_CONTEXT'] and _is_worker_app_context(app):
+            return self.run(*args, **kwargs)
+
         with app.app_context():
             return self.run(*args, **kwargs)
 
     ContextTask.__call__ = __call__
+    ContextTask.flask_app = app
     celery.Task = ContextTask  # pylint: disable=invalid-name
 
+    @worker_process_init.connect(weak=False)
+    def precompile_mail_templates(**kwargs):  # pylint: disable=unused-argument
+        """Compile the mail templates when a worker process starts instead of on its first email."""
+        with app.app_context():
+            total_templates = get_mail_renderer().precompile()
+
+        logging.info(f'{total_templates} mail templates compiled')
+
+    @worker_process_init.connect(weak=False)
+    def delete_expired_task_progress(**kwargs):  # pylint: disable=unused-argument
+        store = get_progress_store(app)
+
+        if store is not None:
+            logging.info(f'{store.delete_expired()} expired task progress statuses deleted')
+
+    @worker_process_shutdown.connect(weak=False)
+    def log_mail_templates_latency(**kwargs):  # pylint: disable=unused-argument
+        with app.app_context():
+            stats = get_mail_renderer().get_stats()
+
+        for template_name, template_stats in stats.items():
+            logging.info(
+                f'Mail template "{template_name}" rendered {template_stats["renders"]} times, '
+                f'mean {template_stats["mean_ms"]:.2f} ms, max {template_stats["max_ms"]:.2f} ms'
+            )
+
     return celery
@@ -0,0 +1,153 @@
+"""Module for sharing the rows of the users exports between tasks.
+
+The Word and Excel exports render the same users. Instead of running the
+search query and dumping the users once per document, the rows are
+materialized once in a JSON lines file and every renderer streams them
+from the file. The first line of the file has the column names and every
+next line has the values of a row, so the keys are not repeated per row.
+
+"""
+
+import json
+import os
+import uuid
+from collections.abc import Iterable, Iterator
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
+from app.models import User
+from app.repositories import UserRepository
+from app.serializers import UserSerializer
+
+USER_EXPORT_COLUMNS = [
+    'name',
+    'last_name',
+    'email',
+    'birth_date',
+    'role_name',
+    'role_label',
+    'created_at',
+    'updated_at',
+    'deleted_at',
+]
+
+
+def get_user_export_record(user_data: dict) -> dict:
+    """Flatten the serialized data of a user into an export record."""
+    role = user_data['roles'][0]
+    record = {column: user_data.get(column) for column in USER_EXPORT_COLUMNS}
+    record.update({'role_name': role.get('name'), 'role_label': role.get('label')})
+    return record
+
+
+def count_user_export_records(request_data: dict) -> int:
+    """Count the users of the requested page."""
+    rqo = SQLAlchemyQueryBuilder()
+    page_number, items_per_page, _ = rqo.get_request_query_fields(User, request_data)
+
+    query = rqo.create_search_query(User, db.session.query(User), request_data)
+    records_filtered = query.order_by(None).with_entities(sa.func.count(User.id)).scalar()
+
+    if not request_data.get('after'):
+        records_filtered -= page_number * items_per_page
+
+    return max(min(records_filtered, items_per_page), 0)
+
+
+def iter_user_export_records(request_data: dict) -> Iterator[dict]:
+    """Yield the export records of the requested users one at a time."""
+    user_serializer = UserSerializer()
+    load_plan = UserSerializer(many=True).get_load_plan()
+
+    for user in UserRepository().stream(load_plan=load_plan, **request_data):
+        yield get_user_export_record(user_serializer.dump(user))
+
+
+class UserExportDataset:
+    """Export records of users stored in a JSON lines file.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of the dataset file.
+    total_rows : int
+        Number of records of the dataset.
+
+    """
+
+    def __init__(self, filepath: str, total_rows: int = 0):
+        self.filepath = filepath
+        self.total_rows = total_rows
+
+    @classmethod
+    def create(cls, records: Iterable[dict], directory_path: str) -> 'UserExportDataset':
+        """Write the records in a new dataset file.
+
+        The file is written with a temporary name and renamed once it is
+        complete, so a reader never sees a partial dataset. The temporary
+        file is deleted if the records can't be written.
+
+        """
+        filepath = f'{directory_path}/{uuid.uuid1().hex}.jsonl'
+        tmp_filepath = f'{filepath}.tmp'
+        dataset = cls(filepath)
+
+        try:
+            with open(tmp_filepath, 'w', encoding='utf-8') as fp:
+                fp.write(json.dumps(USER_EXPORT_COLUMNS) + '\n')
+
+                for record in records:
+                    values = [record.get(column) for column in USER_EXPORT_COLUMNS]
+                    fp.write(json.dumps(values, separators=(',', ':')) + '\n')
+                    dataset.total_rows += 1
+
+            os.replace(tmp_filepath, filepath)
+        except BaseException:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+            raise
+
+        return dataset
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'UserExportDataset':
+        return cls(data['filepath'], data['total_rows'])
+
+    def to_dict(self) -> dict:
+        return {'filepath': self.filepath, 'total_rows': self.total_rows}
+
+    def __iter__(self) -> Iterator[dict]:
+        with open(self.filepath, encoding='utf-8') as fp:
+            columns = json.loads(fp.readline())
+
+            for line in fp:
+                yield dict(zip(columns, json.loads(line)))
+
+    def delete(self) -> None:
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+
+def get_user_export_records(request_data: dict, dataset: dict | None = None) -> tuple[int, Iterator[dict]]:
+    """Get the export records of a shared dataset, or of the search if there is none.
+
+    Parameters
+    ----------
+    request_data : dict
+        Search of the users to export.
+    dataset : dict, optional
+        Data of a `UserExportDataset` which has the records of the search.
+
+    Returns
+    -------
+    tuple[int, Iterator[dict]]
+        Number of records and the records.
+
+    """
+    if dataset:
+        user_dataset = UserExportDataset.from_dict(dataset)
+        return user_dataset.total_rows, iter(user_dataset)
+
+    return count_user_export_records(request_data), iter_user_export_records(request_data)
@@ -1,21 +1,22 @@
 import mimetypes
 import uuid
+from collections.abc import Iterator
 from datetime import datetime, UTC
 from tempfile import NamedTemporaryFile
 
 import magic
 import xlsxwriter
-from celery import states
 from flask import current_app
-from xlsxwriter import Workbook
 from xlsxwriter.worksheet import Worksheet
 
 from app.celery import ContextTask
+from app.celery.dataset import get_user_export_records
+from app.celery.excel.writer import ExcelSheetWriter
+from app.celery.progress import ProgressReporter
 from app.extensions import celery, db
 from app.file_storages import LocalStorage
-from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
-from app.models import Document, User
-from app.serializers import DocumentSerializer, UserSerializer
+from app.models import Document
+from app.serializers import DocumentSerializer
 from app.utils import to_readable
 
 _COLUMN_DISPLAY_ORDER = [
@@ -31,41 +32,13 @@ _COLUMN_DISPLAY_ORDER = [
 _EXCLUDE_COLUMNS = ['id', 'password']
 
 
-def _parse_user_data(users: list) -> list:
-    excel_rows = []
+def _get_excel_column_names() -> list:
+    return [column.title().replace('_', ' ') for column in _COLUMN_DISPLAY_ORDER if column]
 
-    for user in users:
-        user_dict = {
-            'role': user.get('roles')[0].get('label'),
-        }
-        del user['roles']
-
-        user_dict.update({k: to_readable(v) for (k, v) in user.items() if k in _COLUMN_DISPLAY_ORDER})
-
-        user_dict = dict(sorted(user_dict.items(), key=lambda x: _COLUMN_DISPLAY_ORDER.index(x[0])))
-        excel_rows.append(user_dict)
-
-    return excel_rows
-
-
-def _get_excel_user_data(users: list, excel_rows: list) -> None:
-    parser_user_data = _parse_user_data(users)
-
-    for user in parser_user_data:
-        user_values = list(user.values())
-        excel_rows.append(user_values)
 
-
-def _get_excel_column_names(excel_rows: list) -> None:
-    column_names = [column.title().replace('_', ' ') for column in _COLUMN_DISPLAY_ORDER if column]
-
-    excel_rows.append(column_names)
-
-
-def _adjust_each_column_width(rows: list, worksheet: Worksheet, excel_longest_word: int) -> None:
-    if rows:
-        for i, _ in enumerate(rows[0]):
-            worksheet.set_column(i, i + 1, excel_longest_word + 1)
+def _get_excel_user_row(record: dict) -> list:
+    record['role'] = record['role_label']
+    return [to_readable(record.get(column)) for column in _COLUMN_DISPLAY_ORDER]
 
 
 def _add_excel_autofilter(worksheet: Worksheet) -> None:
@@ -75,80 +48,43 @@ def _add_excel_autofilter(worksheet: Worksheet) -> None:
     worksheet.autofilter(columns)
 
 
-def _get_user_data(request_data: dict) -> list:
-    rqo = SQLAlchemyQueryBuilder()
-    page_number, items_per_page, order_by = rqo.get_request_query_fields(User, request_data)
-
-    query = db.session.query(User)
-    query = rqo.create_search_query(User, query, request_data)
-    query = query.order_by(*order_by).offset(page_number * items_per_page).limit(items_per_page)
-
-    user_serializer = UserSerializer(many=True)
-    user_list = user_serializer.dump(list(query))
+def export_user_data_in_excel_task_logic(self, created_by: int, request_data: dict, dataset: dict | None = None):
+    def _write_excel_rows(rows: Iterator[list], writer: ExcelSheetWriter, progress: ProgressReporter) -> None:
+        writer.write_header(_get_excel_column_names())
+        progress.update(writer.total_rows)
 
-    return user_list
+        for row in rows:
+            writer.write_row(row)
+            progress.update(writer.total_rows)
 
-
-def _find_longest_word(word_list: list) -> str:
-    str_list = [str(item) for item in word_list]
-    longest_word = max(str_list, key=len)
-    return str(longest_word)
-
-
-def export_user_data_in_excel_task_logic(self, created_by: int, request_data: dict):
-    def _write_excel_rows(rows: list, workbook: Workbook, worksheet: Worksheet) -> int:
-        excel_longest_word = ''
-
-        for i, row in enumerate(rows, 1):
-            row_format = None
-
-            if i == 1:
-                row_format = workbook.add_format(
-                    {
-                        'bold': True,
-                        'bg_color': '#cccccc',
-                    }
-                )
-            elif i % 2 == 0:
-                row_format = workbook.add_format(
-                    {
-                        'bg_color': '#f1f1f1',
-                    }
-                )
-
-            range_cells = f'A{i}:I10'
-
-            row_longest_word = _find_longest_word(row)
-            if len(row_longest_word) > len(excel_longest_word):
-                excel_longest_word = row_longest_word
-
-            worksheet.write_row(range_cells, row, row_format)
-            self.update_state(state=states.STARTED, meta={'current': i, 'total': self.total_progress})
-
-        return len(excel_longest_word)
+        writer.close()
+        progress.flush()
 
     local_storage = LocalStorage()
-    user_list = _get_user_data(request_data)
+
+    total_rows, records = get_user_export_records(request_data, dataset)
 
     # Excel rows + 2 (Excel header row and save data in database)
-    self.total_progress = len(user_list) + 2
+    self.total_progress = total_rows + 2
     tempfile = NamedTemporaryFile()
-    excel_rows = []
 
-    self.update_state(state=states.STARTED, meta={'current': 0, 'total': self.total_progress})
+    progress = self.get_progress_reporter(self.total_progress)
+    progress.update(0, force=True)
 
-    workbook = xlsxwriter.Workbook(tempfile.name)
+    # NOTE: In constant memory mode each row is flushed to disk once the next
+    # one is written, so the rows must be written in order.
+    workbook = xlsxwriter.Workbook(tempfile.name, {'constant_memory': True})
     worksheet = workbook.add_worksheet()
     worksheet.set_zoom(120)
-
-    _get_excel_column_names(excel_rows)
-    _get_excel_user_data(user_list, excel_rows)
     _add_excel_autofilter(worksheet)
 
-    excel_longest_word = _write_excel_rows(excel_rows, workbook, worksheet)
-    _adjust_each_column_width(excel_rows, worksheet, excel_longest_word)
+    writer = ExcelSheetWriter(workbook, worksheet)
+    _write_excel_rows((_get_excel_user_row(record) for record in records), writer, progress)
     workbook.close()
 
+    # Written rows (Excel header row included) + 1 (save data in database)
+    self.total_progress = writer.total_rows + 1
+
     filepath = ''
     try:
         mime_type = magic.from_file(tempfile.name, mime=True)
@@ -158,8 +94,7 @@ def export_user_data_in_excel_task_logic(self, created_by: int, request_data: di
         directory_path = current_app.config.get('STORAGE_DIRECTORY')
         filepath = f'{directory_path}/{internal_filename}'
 
-        data = tempfile.file.read()
-        local_storage.save_bytes(data, filepath)
+        local_storage.copy_file(tempfile.name, filepath)
 
         file_prefix = datetime.now(UTC).strftime('%Y%m%d')
         basename = f'{file_prefix}_users'
@@ -195,7 +130,7 @@ def export_user_data_in_excel_task_logic(self, created_by: int, request_data: di
 
 
 @celery.task(bind=True, base=ContextTask, queue='fast')
-def export_user_data_in_excel_task(self, created_by: int, request_data: dict):
+def export_user_data_in_excel_task(self, created_by: int, request_data: dict, dataset: dict | None = None):
     # HACK: Consider to move self logic outside of task_logic function.
     #       It helps both maintainability and testability.
-    return export_user_data_in_excel_task_logic(self, created_by, request_data)
+    return export_user_data_in_excel_task_logic(self, created_by, request_data, dataset)
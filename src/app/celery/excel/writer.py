@@ -0,0 +1,80 @@
+"""Styling layer for the Excel documents.
+
+xlsxwriter adds a new entry to the styles table of the workbook for every
+`Workbook.add_format` call, even if the properties are the same. The
+formats used by a sheet are declared once when the writer is created and
+shared by every row.
+
+"""
+
+from xlsxwriter import Workbook
+from xlsxwriter.format import Format
+from xlsxwriter.worksheet import Worksheet
+
+HEADER_FORMAT = 'header'
+ZEBRA_FORMAT = 'zebra'
+
+DEFAULT_FORMATS = {
+    HEADER_FORMAT: {'bold': True, 'bg_color': '#cccccc'},
+    ZEBRA_FORMAT: {'bg_color': '#f1f1f1'},
+}
+
+# NOTE: Excel doesn't allow columns wider than 255 characters
+MAX_COLUMN_WIDTH = 255
+
+
+class ExcelSheetWriter:
+    """Write a header and zebra striped rows on a worksheet.
+
+    The width of each column is tracked while the rows are written, so
+    `close` can fit the columns to their content without reading the rows
+    again.
+
+    Parameters
+    ----------
+    workbook : Workbook
+        Workbook where the formats are declared.
+    worksheet : Worksheet
+        Worksheet where the rows are written.
+    formats : dict
+        Properties of the formats by name, `DEFAULT_FORMATS` by default.
+    column_padding : int
+        Characters added to the width of every column.
+
+    """
+
+    def __init__(self, workbook: Workbook, worksheet: Worksheet, formats: dict = None, column_padding: int = 1):
+        self.worksheet = worksheet
+        self.formats = {
+            name: workbook.add_format(properties) for name, properties in (formats or DEFAULT_FORMATS).items()
+        }
+        self.column_padding = column_padding
+        self.column_widths = []
+        self.total_rows = 0
+
+    def get_format(self, name: str) -> Format:
+        return self.formats[name]
+
+    def write_header(self, row: list) -> None:
+        self.write_row(row, self.get_format(HEADER_FORMAT))
+
+    def write_row(self, row: list, row_format: Format = None) -> None:
+        if row_format is None and self.total_rows % 2:
+            row_format = self.get_format(ZEBRA_FORMAT)
+
+        self.worksheet.write_row(self.total_rows, 0, row, row_format)
+        self._update_column_widths(row)
+        self.total_rows += 1
+
+    def _update_column_widths(self, row: list) -> None:
+        for i, cell in enumerate(row):
+            width = len(str(cell))
+
+            if i == len(self.column_widths):
+                self.column_widths.append(width)
+            elif width > self.column_widths[i]:
+                self.column_widths[i] = width
+
+    def close(self) -> None:
+        for i, width in enumerate(self.column_widths):
+            self.worksheet.set_column(i, i, min(width + self.column_padding, MAX_COLUMN_WIDTH))
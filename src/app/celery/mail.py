@@ -0,0 +1,310 @@
+"""Module for rendering and sending the emails of the Celery tasks.
+
+`Mail.send` opens a new SMTP connection for every email, so every email
+pays the connection, the TLS handshake and the login. Every worker process
+keeps a pool of open connections instead. A connection which has been idle
+for `keepalive` seconds is checked with a NOOP before it is reused, and a
+message is sent again over a new connection if the server closed the one
+which was used.
+
+The mail templates are compiled when the worker process starts instead of
+on the first email, and the blocks which only have text are rendered once.
+
+"""
+
+import atexit
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_mail import Connection, Message
+from jinja2 import Environment, nodes, Template
+
+_DISCONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPConnectionPool:
+    """Pool of SMTP connections of a process.
+
+    Parameters
+    ----------
+    mail_state : flask_mail._Mail
+        Flask-Mail state of the application, it has the settings of the SMTP server.
+    size : int
+        Maximum number of idle connections.
+    keepalive : float
+        Seconds after which an idle connection is checked before it is reused.
+    clock : Callable[[], float]
+        Monotonic clock used for the idle time of the connections.
+
+    """
+
+    def __init__(self, mail_state, size: int = 2, keepalive: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.mail_state = mail_state
+        self.size = size
+        self.keepalive = keepalive
+        self.clock = clock
+        self.pid = os.getpid()
+        self.total_connections = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self, connection: Connection) -> None:
+        connection.host = None if self.mail_state.suppress else connection.configure_host()
+        self.total_connections += 1
+
+    @staticmethod
+    def _disconnect(connection: Connection) -> None:
+        if connection.host is None:
+            return
+
+        try:
+            connection.host.quit()
+        except (smtplib.SMTPException, OSError):
+            connection.host.close()
+
+        connection.host = None
+
+    @staticmethod
+    def _is_alive(connection: Connection) -> bool:
+        if connection.host is None:
+            return True
+
+        try:
+            return connection.host.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self) -> Connection:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, released_at = self._idle.pop()
+
+            if self.clock() - released_at < self.keepalive or self._is_alive(connection):
+                return connection
+
+            self._disconnect(connection)
+
+        connection = Connection(self.mail_state)
+        self._connect(connection)
+        return connection
+
+    def _release(self, connection: Connection) -> None:
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, self.clock()))
+                return
+
+        self._disconnect(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a connection of the pool.
+
+        The connection is closed instead of returned to the pool if the
+        block raises an exception.
+
+        """
+        connection = self._acquire()
+
+        try:
+            yield connection
+        except BaseException:
+            self._disconnect(connection)
+            raise
+
+        self._release(connection)
+
+    def send_many(self, messages: Iterable[Message]) -> int:
+        """Send the messages over one connection.
+
+        Parameters
+        ----------
+        messages : Iterable[Message]
+            Messages to send.
+
+        Returns
+        -------
+        int
+            Number of sent messages.
+
+        """
+        total_messages = 0
+
+        with self.connection() as connection:
+            for message in messages:
+                try:
+                    message.send(connection)
+                except _DISCONNECTION_ERRORS:
+                    logging.warning('The SMTP server closed the connection, sending the email again')
+                    self._disconnect(connection)
+                    self._connect(connection)
+                    message.send(connection)
+
+                total_messages += 1
+
+        return total_messages
+
+    def send(self, message: Message) -> None:
+        self.send_many([message])
+
+    def close(self) -> None:
+        # NOTE: A forked process inherits the sockets of its parent, closing them would close the
+        #       connections of the parent.
+        if self.pid != os.getpid():
+            return
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for connection, _ in idle:
+            self._disconnect(connection)
+
+
+class MailTemplateRenderer:
+    """Renderer of the mail templates of a Jinja environment.
+
+    Parameters
+    ----------
+    jinja_env : Environment
+        Jinja environment of the application.
+    prefix : str
+        Prefix of the names of the mail templates.
+    clock : Callable[[], float]
+        Clock used for measuring the render latency.
+
+    """
+
+    def __init__(self, jinja_env: Environment, prefix: str = 'mails/', clock: Callable[[], float] = time.perf_counter):
+        self.jinja_env = jinja_env
+        self.prefix = prefix
+        self.clock = clock
+        self._templates = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _is_static_block(self, block: nodes.Block) -> bool:
+        return all(
+            isinstance(node, nodes.Output) and all(isinstance(child, nodes.TemplateData) for child in node.nodes)
+            for node in block.body
+        )
+
+    def _cache_static_blocks(self, template_name: str, template: Template) -> None:
+        source, _, _ = self.jinja_env.loader.get_source(self.jinja_env, template_name)
+
+        for block in self.jinja_env.parse(source).find_all(nodes.Block):
+            if self._is_static_block(block):
+                rendered_block = ''.join(template.blocks[block.name](template.new_context()))
+                template.blocks[block.name] = lambda context, rendered_block=rendered_block: iter([rendered_block])
+
+    def get_template(self, template_name: str) -> Template:
+        """Get a compiled template, it's compiled only the first time."""
+        template = self._templates.get(template_name)
+
+        if template is None:
+            template = self.jinja_env.get_template(template_name)
+            self._cache_static_blocks(template_name, template)
+            self._templates[template_name] = template
+
+        return template
+
+    def precompile(self) -> int:
+        """Compile every mail template.
+
+        Returns
+        -------
+        int
+            Number of compiled templates.
+
+        """
+        template_names = self.jinja_env.list_templates(filter_func=lambda name: name.startswith(self.prefix))
+
+        for template_name in template_names:
+            self.get_template(template_name)
+
+        return len(template_names)
+
+    def render(self, template_name: str, **context) -> str:
+        """Render a mail template with the context processors of the application, as `render_template` does."""
+        start = self.clock()
+        current_app.update_template_context(context)
+        rendered_template = self.get_template(template_name).render(context)
+        self._add_latency(template_name, self.clock() - start)
+        return rendered_template
+
+    def _add_latency(self, template_name: str, latency: float) -> None:
+        with self._lock:
+            renders, total, maximum = self._stats.get(template_name, (0, 0.0, 0.0))
+            self._stats[template_name] = (renders + 1, total + latency, max(maximum, latency))
+
+    def get_stats(self) -> dict:
+        """Get the number of renders and the mean and maximum latency in milliseconds per template."""
+        with self._lock:
+            return {
+                template_name: {
+                    'renders': renders,
+                    'mean_ms': total * 1000 / renders,
+                    'max_ms': maximum * 1000,
+                }
+                for template_name, (renders, total, maximum) in self._stats.items()
+            }
+
+
+_mail_renderer = None
+_smtp_pool = None
+_smtp_pool_lock = threading.Lock()
+
+
+def _forget_smtp_pool() -> None:
+    global _smtp_pool, _smtp_pool_lock  # pylint: disable=global-statement
+
+    _smtp_pool = None
+    _smtp_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_smtp_pool)
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Return the SMTP connection pool of the current process.
+
+    The pool is created on first use. A forked process (e.g. a Celery
+    prefork worker) creates its own pool instead of using the connections
+    of its parent.
+
+    """
+    global _smtp_pool  # pylint: disable=global-statement
+
+    mail_state = current_app.extensions['mail']
+
+    with _smtp_pool_lock:
+        if _smtp_pool is None or _smtp_pool.mail_state is not mail_state:
+            if _smtp_pool is not None:
+                _smtp_pool.close()
+
+            _smtp_pool = SMTPConnectionPool(
+                mail_state,
+                size=current_app.config['MAIL_POOL_SIZE'],
+                keepalive=current_app.config['MAIL_POOL_KEEPALIVE'],
+            )
+            atexit.register(_smtp_pool.close)
+
+        return _smtp_pool
+
+
+def get_mail_renderer() -> MailTemplateRenderer:
+    """Return the mail template renderer of the current process."""
+    global _mail_renderer  # pylint: disable=global-statement
+
+    with _smtp_pool_lock:
+        if _mail_renderer is None or _mail_renderer.jinja_env is not current_app.jinja_env:
+            _mail_renderer = MailTemplateRenderer(current_app.jinja_env)
+
+        return _mail_renderer
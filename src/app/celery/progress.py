@@ -0,0 +1,92 @@
+"""Module for reporting the progress of the Celery tasks.
+
+Every `Task.update_state` call is a write in the result backend, reporting
+the progress of each processed row makes the backend the bottleneck of
+the task. The reporter coalesces the updates, a new state is only sent
+once `min_interval` seconds have passed since the last one and the
+progress has advanced at least `min_step` percent.
+
+If the application has a progress store the updates are written there
+instead of in the result backend.
+
+"""
+
+import time
+from collections.abc import Callable
+
+from celery import states, Task
+
+from app.celery.progress_store import ProgressStore
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        task: Task,
+        total: int,
+        min_interval: float = 0.5,
+        min_step: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        store: ProgressStore | None = None,
+    ):
+        self.task = task
+        self.total = total
+        self.min_interval = min_interval
+        self.min_step = min_step
+        self.clock = clock
+        self.store = store
+        self.current = 0
+        self.total_updates = 0
+        self._reported_current = None
+        self._reported_at = None
+
+    def _get_percentage(self, current: int) -> float:
+        return current * 100 / self.total if self.total else 100.0
+
+    def _is_due(self, now: float) -> bool:
+        if self._reported_at is None or self.current >= self.total:
+            return True
+
+        if now - self._reported_at < self.min_interval:
+            return False
+
+        return self._get_percentage(self.current) - self._get_percentage(self._reported_current) >= self.min_step
+
+    def update(self, current: int, force: bool = False) -> bool:
+        """Report the progress of the task if the last report is old enough.
+
+        Parameters
+        ----------
+        current : int
+            Processed items.
+        force : bool
+            Report the progress even if the last report is recent.
+
+        Returns
+        -------
+        bool
+            True if the progress was reported.
+
+        """
+        self.current = current
+        now = self.clock()
+
+        if not force and not self._is_due(now):
+            return False
+
+        if self.store is None:
+            self.task.update_state(state=states.STARTED, meta={'current': current, 'total': self.total})
+        else:
+            self.store.save(self.task.request.id, {'state': states.STARTED, 'current': current, 'total': self.total})
+
+        self.total_updates += 1
+        self._reported_current = current
+        self._reported_at = now
+        return True
+
+    def flush(self) -> bool:
+        """Report the last progress if it was coalesced."""
+        if self.current == self._reported_current:
+            return False
+
+        return self.update(self.current, force=True)
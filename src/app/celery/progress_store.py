@@ -0,0 +1,216 @@
+"""Module for storing the progress of the Celery tasks.
+
+The status endpoint is polled by the clients while the tasks report their
+progress, reading and writing both in the result backend makes it the
+bottleneck. The tasks write their state and progress in a lightweight
+store instead, which the status endpoint reads in one call for many tasks.
+
+The store is chosen with `TASK_PROGRESS_STORE`, "backend" keeps reading
+the progress from the result backend.
+
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+
+from celery import states
+from flask import current_app, Flask
+
+_TASK_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+
+class ProgressStore(ABC):
+    """Abstract interface for storing the status of the tasks.
+
+    A status is a dict with the state of the task, its progress (`current`
+    and `total`) and, once it finishes, its result.
+
+    """
+
+    @abstractmethod
+    def save(self, task_id: str, status: dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_many(self, task_ids: Iterable[str]) -> dict[str, dict | None]:
+        """Get the status of the tasks, None for the tasks which aren't stored."""
+        raise NotImplementedError
+
+    def get(self, task_id: str) -> dict | None:
+        return self.get_many([task_id])[task_id]
+
+    def delete_expired(self) -> int:
+        """Delete the status of the tasks which expired.
+
+        Returns
+        -------
+        int
+            Number of deleted statuses.
+
+        """
+        return 0
+
+
+class MemoryProgressStore(ProgressStore):
+    """Store of the current process, for tests and eager tasks.
+
+    The statuses which expired are deleted when they are read.
+
+    """
+
+    def __init__(self, expires: float = 3600, clock: Callable[[], float] = time.monotonic):
+        self.expires = expires
+        self.clock = clock
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def save(self, task_id: str, status: dict) -> None:
+        with self._lock:
+            self._statuses[task_id] = (dict(status), self.clock())
+
+    def get_many(self, task_ids: Iterable[str]) -> dict[str, dict | None]:
+        now = self.clock()
+        statuses = {}
+
+        with self._lock:
+            for task_id in task_ids:
+                status, saved_at = self._statuses.get(task_id, (None, None))
+
+                if saved_at is not None and now - saved_at >= self.expires:
+                    del self._statuses[task_id]
+                    status = None
+
+                statuses[task_id] = dict(status) if status else None
+
+        return statuses
+
+
+class FileProgressStore(ProgressStore):
+    """Store with a JSON file per task, the directory can be shared by the web and worker hosts."""
+
+    def __init__(self, directory_path: str, expires: float = 3600, clock: Callable[[], float] = time.time):
+        self.directory_path = directory_path
+        self.expires = expires
+        self.clock = clock
+        os.makedirs(directory_path, exist_ok=True)
+
+    def _get_filepath(self, task_id: str) -> str | None:
+        if not _TASK_ID_PATTERN.match(task_id):
+            return None
+
+        return os.path.join(self.directory_path, f'{task_id}.json')
+
+    def save(self, task_id: str, status: dict) -> None:
+        filepath = self._get_filepath(task_id)
+
+        if filepath is None:
+            raise ValueError(f'Task id "{task_id}" not valid')
+
+        # NOTE: The file is replaced atomically, so a reader never gets a partial status
+        tmp_filepath = f'{filepath}.{uuid.uuid4().hex}.tmp'
+
+        with open(tmp_filepath, 'w', encoding='utf-8') as fp:
+            json.dump(status, fp, default=str)
+
+        os.replace(tmp_filepath, filepath)
+
+    def _read(self, filepath: str) -> dict | None:
+        try:
+            with open(filepath, encoding='utf-8') as fp:
+                if self.clock() - os.fstat(fp.fileno()).st_mtime < self.expires:
+                    return json.load(fp)
+        except FileNotFoundError:
+            return None
+
+        self._delete(filepath)
+        return None
+
+    @staticmethod
+    def _delete(filepath: str) -> None:
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            pass
+
+    def get_many(self, task_ids: Iterable[str]) -> dict[str, dict | None]:
+        statuses = {}
+
+        for task_id in task_ids:
+            filepath = self._get_filepath(task_id)
+            statuses[task_id] = self._read(filepath) if filepath else None
+
+        return statuses
+
+    def delete_expired(self) -> int:
+        total_deleted = 0
+        expired_at = self.clock() - self.expires
+
+        with os.scandir(self.directory_path) as entries:
+            for entry in entries:
+                try:
+                    is_expired = entry.is_file() and entry.stat().st_mtime <= expired_at
+                except FileNotFoundError:
+                    continue
+
+                if is_expired:
+                    self._delete(entry.path)
+                    total_deleted += 1
+
+        return total_deleted
+
+
+PROGRESS_STORES = {
+    'memory': lambda config: MemoryProgressStore(expires=config['TASK_PROGRESS_EXPIRES']),
+    'file': lambda config: FileProgressStore(
+        config['TASK_PROGRESS_DIRECTORY'] or f'{config["STORAGE_DIRECTORY"]}/task_progress',
+        expires=config['TASK_PROGRESS_EXPIRES'],
+    ),
+}
+
+
+def get_finished_task_status(result: object, state: str) -> dict:
+    """Build the status of a task which finished from its result."""
+    if state != states.SUCCESS:
+        return {'state': state, 'current': 1, 'total': 1}
+
+    if isinstance(result, dict):
+        return {'current': 1, 'total': 1, **result, 'state': state}
+
+    return {'state': state, 'current': 1, 'total': 1, 'result': result}
+
+
+_progress_store = None
+_progress_store_key = None
+_progress_store_lock = threading.Lock()
+
+
+def get_progress_store(app: Flask = None) -> ProgressStore | None:
+    """Return the progress store of the application, None if the progress is read from the result backend.
+
+    Parameters
+    ----------
+    app : Flask
+        Application of the store, by default the current application. The
+        task hooks run before the task pushes its application context.
+
+    """
+    global _progress_store, _progress_store_key  # pylint: disable=global-statement
+
+    app = app or current_app._get_current_object()  # pylint: disable=protected-access
+    store_name = app.config['TASK_PROGRESS_STORE']
+
+    if store_name == 'backend':
+        return None
+
+    with _progress_store_lock:
+        if _progress_store is None or _progress_store_key != (app, store_name):
+            _progress_store = PROGRESS_STORES[store_name](app.config)
+            _progress_store_key = (app, store_name)
+
+        return _progress_store
@@ -1,19 +1,24 @@
 import logging
+import os
+from tempfile import TemporaryDirectory
 
-from celery import chain, chord
-from flask import render_template
+from celery import chord, group
+from flask import current_app, url_for
 from flask_mail import Message
 
 from app.celery import ContextTask
+from app.celery.dataset import iter_user_export_records, UserExportDataset
 from app.celery.excel.tasks import export_user_data_in_excel_task
+from app.celery.mail import get_mail_renderer, get_smtp_pool
 from app.celery.word.tasks import export_user_data_in_word_task
-from app.extensions import celery, db, mail
+from app.extensions import celery
+from app.helpers.mail_attachments import COMPRESSED_MIME_TYPES, FileAttachmentsMessage, zip_file, ZIP_MIME_TYPE
+from app.models import Document
 from app.repositories import DocumentRepository
 from config import Config
 
 
-@celery.task(base=ContextTask)
-def create_user_email_task(email_data) -> bool:
+def _get_new_user_message(email_data: dict) -> Message:
     email_data.update({'login_url': f'http://{Config.SERVER_NAME}'})
 
     msg = Message(
@@ -23,11 +28,27 @@ def create_user_email_task(email_data) -> bool:
             'recipients': [email_data.get('email')],
         }
     )
-    msg.html = render_template('mails/new_user.html', **email_data)
-    mail.send(msg)
+    msg.html = get_mail_renderer().render('mails/new_user.html', **email_data)
+    return msg
+
+
+@celery.task(base=ContextTask)
+def create_user_email_task(email_data) -> bool:
+    get_smtp_pool().send(_get_new_user_message(email_data))
     return True
 
 
+@celery.task(base=ContextTask)
+def create_users_email_task(users_email_data: list) -> int:
+    """Send the welcome email to many users over one SMTP connection.
+
+    It's meant for creating users in bulk, e.g. seeding a database, where a
+    task per user would open a connection per email.
+
+    """
+    return get_smtp_pool().send_many(_get_new_user_message(email_data) for email_data in users_email_data)
+
+
 @celery.task(base=ContextTask)
 def reset_password_email_task(email_data) -> bool:
     logging.info(f'to: {email_data}')
@@ -40,8 +61,8 @@ def reset_password_email_task(email_data) -> bool:
         'recipients': to,
     }
     msg = Message(**email_args)
-    msg.html = render_template('mails/reset_password.html', **email_data)
-    mail.send(msg)
+    msg.html = get_mail_renderer().render('mails/reset_password.html', **email_data)
+    get_smtp_pool().send(msg)
     return True
 
 
@@ -50,6 +71,44 @@ def send_email_with_attachments_task(task_data: list) -> bool:
     return send_email_with_attachments_task_logic(task_data)
 
 
+def _attach_documents(msg: FileAttachmentsMessage, documents: list[Document], directory_path: str) -> list[dict]:
+    """Attach the documents which fit in the email and get a download link of the rest.
+
+    Documents bigger than `MAIL_ATTACHMENT_ZIP_MIN_SIZE` are attached in a
+    zip, unless they are compressed already. Documents which don't fit in
+    `MAIL_ATTACHMENTS_MAX_SIZE` are not attached, a signed download link
+    which expires in `DOCUMENT_DOWNLOAD_TOKEN_EXPIRES` seconds is sent
+    instead.
+
+    """
+    zip_min_size = current_app.config['MAIL_ATTACHMENT_ZIP_MIN_SIZE']
+    attachments_max_size = current_app.config['MAIL_ATTACHMENTS_MAX_SIZE']
+    otp_token_manager = current_app.container.document_download_token_manager()
+    attachments_size = 0
+    download_links = []
+
+    for document in documents:
+        filepath, filename, mime_type = document.get_filepath(), document.name, document.mime_type
+
+        if os.path.getsize(filepath) >= zip_min_size and mime_type not in COMPRESSED_MIME_TYPES:
+            filename = f'{os.path.splitext(document.name)[0]}.zip'
+            filepath = f'{directory_path}/{document.id}_{filename}'
+            zip_file(document.get_filepath(), document.name, filepath)
+            mime_type = ZIP_MIME_TYPE
+
+        filesize = os.path.getsize(filepath)
+
+        if attachments_size + filesize > attachments_max_size:
+            token = otp_token_manager.generate_token(document.id)
+            url = url_for('documents_document_download_resource', token=token, _external=True)
+            download_links.append({'name': document.name, 'url': url})
+        else:
+            msg.attach_file(filepath, filename, mime_type)
+            attachments_size += filesize
+
+    return download_links
+
+
 def send_email_with_attachments_task_logic(task_data: list) -> bool:
     document_repository = DocumentRepository()
     auth_user_data = task_data[0].get('result').get('created_by')
@@ -61,31 +120,55 @@ def send_email_with_attachments_task_logic(task_data: list) -> bool:
         'recipients': to,
     }
 
-    msg = Message(**email_args)
-    msg.html = render_template('mails/attachments.html', **auth_user_data)
+    msg = FileAttachmentsMessage(**email_args)
+    documents = [document_repository.find_by_id(item.get('result')['id']) for item in task_data]
+
+    with TemporaryDirectory() as directory_path:
+        download_links = _attach_documents(msg, documents, directory_path)
 
-    for item in task_data:
-        document = document_repository.find_by_id(item.get('result')['id'])
-        with open(document.get_filepath(), 'rb') as fp:
-            msg.attach(document.name, document.mime_type, fp.read())
+    msg.html = get_mail_renderer().render(
+        'mails/attachments.html',
+        **auth_user_data,
+        download_links=download_links,
+        download_links_expire_in_hours=current_app.config['DOCUMENT_DOWNLOAD_TOKEN_EXPIRES'] // 3600,
+    )
+    get_smtp_pool().send(msg)
 
-    mail.send(msg)
     return True
 
 
 @celery.task(base=ContextTask, queue='fast')
-def create_word_and_excel_documents_task(created_by: int, request_data: dict, to_pdf: int) -> bool:
-    group_tasks = [
-        export_user_data_in_word_task.s(created_by, request_data, to_pdf),
-        export_user_data_in_excel_task.s(created_by, request_data),
-    ]
-    callback_task = send_email_with_attachments_task.s()
-    callback_result = chord(chain(*group_tasks))(callback_task)
+def delete_user_export_dataset_task(dataset: dict) -> bool:
+    UserExportDataset.from_dict(dataset).delete()
+    return True
 
-    if callback_result.successful():
-        db.session.commit()
-    else:
-        db.session.rollback()
 
-    db.session.close()
-    return True
+@celery.task(base=ContextTask, queue='fast')
+def create_word_and_excel_documents_task(created_by: int, request_data: dict, to_pdf: int) -> dict:
+    """Create the Word and Excel documents of the users in parallel.
+
+    The task only materializes the users and dispatches the documents, it
+    doesn't wait for them. The ids of the dispatched tasks are returned so
+    the status of the whole export can be built from them.
+
+    """
+    # NOTE: The search runs once, both documents are rendered in parallel from the same dataset.
+    directory_path = current_app.config.get('STORAGE_DIRECTORY')
+    dataset = UserExportDataset.create(iter_user_export_records(request_data), directory_path).to_dict()
+
+    word_task = export_user_data_in_word_task.s(created_by, request_data, to_pdf, dataset)
+    excel_task = export_user_data_in_excel_task.s(created_by, request_data, dataset)
+    callback_task = send_email_with_attachments_task.s()
+    children = [word_task.freeze().id, excel_task.freeze().id]
+    callback = callback_task.freeze().id
+
+    # NOTE: The dataset is deleted once the export finishes, if a document fails the chord fails its callback
+    callback_task.link(delete_user_export_dataset_task.si(dataset))
+    callback_task.link_error(delete_user_export_dataset_task.si(dataset))
+    chord(group(word_task, excel_task))(callback_task)
+
+    return {
+        'status': 'Task dispatched!',
+        'children': children,
+        'callback': callback,
+    }
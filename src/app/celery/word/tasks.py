@@ -1,102 +1,71 @@
 import mimetypes
 import uuid
+from collections.abc import Iterator
 from datetime import datetime, UTC
 from tempfile import NamedTemporaryFile
 
 import docx
-from celery import states
 from flask import current_app
 
 from app.celery import ContextTask
+from app.celery.dataset import get_user_export_records
+from app.celery.progress import ProgressReporter
+from app.celery.word.writer import WordTableWriter
 from app.extensions import celery, db
 from app.file_storages import LocalStorage
-from app.helpers.libreoffice import convert_to
-from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
-from app.models import Document, User
-from app.serializers import DocumentSerializer, UserSerializer
+from app.helpers.libreoffice import get_libreoffice_batch_converter
+from app.models import Document
+from app.serializers import DocumentSerializer
 from app.utils import to_readable
 from app.utils.constants import MS_WORD_MIME_TYPE, PDF_MIME_TYPE
 
 _COLUMN_DISPLAY_ORDER = ['name', 'last_name', 'email', 'birth_date', 'role', 'created_at', 'updated_at', 'deleted_at']
 
 
-def _add_table_user_data(users_query: list, rows: list) -> None:
-    user_list = []
+def _get_word_column_names() -> list:
+    return [column.title().replace('_', ' ') for column in _COLUMN_DISPLAY_ORDER if column]
 
-    for user in users_query:
-        user_dict = {
-            'role': user.get('roles')[0].get('name'),
-        }
-        del user['roles']
-
-        user_dict.update({k: to_readable(v) for (k, v) in user.items() if k in _COLUMN_DISPLAY_ORDER})
-
-        user_dict = dict(sorted(user_dict.items(), key=lambda x: _COLUMN_DISPLAY_ORDER.index(x[0])))
-        user_list.append(user_dict)
-
-    for _, user_dict in enumerate(user_list):
-        user_values = list(user_dict.values())
-        rows.append(user_values)
-
-
-def _add_table_column_names(rows: list, original_column_names: set) -> None:
-    formatted_column_names = [column.title().replace('_', ' ') for column in original_column_names if column]
-
-    rows.append(formatted_column_names)
 
+def _get_word_user_row(record: dict) -> list:
+    record['role'] = record['role_name']
+    return [to_readable(record.get(column)) for column in _COLUMN_DISPLAY_ORDER]
 
-def _get_user_data(request_data: dict) -> list:
-    rqo = SQLAlchemyQueryBuilder()
-    page_number, items_per_page, order_by = rqo.get_request_query_fields(User, request_data)
 
-    query = db.session.query(User)
-    query = rqo.create_search_query(User, query, request_data)
-    query = query.order_by(*order_by).offset(page_number * items_per_page).limit(items_per_page)
+def export_user_data_in_word_task_logic(
+    self, created_by: int, request_data: dict, to_pdf: int, dataset: dict | None = None
+):
+    def _write_docx_content(rows: Iterator[list], document: docx.Document, progress: ProgressReporter) -> None:
+        writer = WordTableWriter(document, len(_COLUMN_DISPLAY_ORDER))
+        writer.write_row(_get_word_column_names())
+        progress.update(writer.total_rows)
 
-    user_serializer = UserSerializer(many=True)
-    user_list = user_serializer.dump(list(query))
+        for row in rows:
+            writer.write_row(row)
+            progress.update(writer.total_rows)
 
-    return user_list
-
-
-def export_user_data_in_word_task_logic(self, created_by: int, request_data: dict, to_pdf: int):
-    def _write_docx_content(rows: list, document: docx.Document) -> None:
-        header_fields = rows[0]
-        assert len(header_fields) == len(_COLUMN_DISPLAY_ORDER)
-
-        table = document.add_table(rows=len(rows), cols=len(header_fields))
-
-        for i, _ in enumerate(rows):
-            row = table.rows[i]
-            for j, table_cell in enumerate(rows[i]):
-                row.cells[j].text = str(table_cell)
-
-            self.update_state(state=states.STARTED, meta={'current': i, 'total': self.total_progress})
+        progress.flush()
 
     local_storage = LocalStorage()
-    user_list = _get_user_data(request_data)
+    total_rows, records = get_user_export_records(request_data, dataset)
 
     # Word table rows + 2 (Word table header and save data in database)
-    self.total_progress = len(user_list) + 2
+    self.total_progress = total_rows + 2
     tempfile_suffix = '.docx'
     tempfile = NamedTemporaryFile(suffix=tempfile_suffix)
-    table_data = []
     mime_type = PDF_MIME_TYPE if to_pdf else MS_WORD_MIME_TYPE
 
-    self.update_state(state=states.STARTED, meta={'current': 0, 'total': self.total_progress})
-
-    _add_table_column_names(table_data, set(_COLUMN_DISPLAY_ORDER))
-    _add_table_user_data(user_list, table_data)
+    progress = self.get_progress_reporter(self.total_progress)
+    progress.update(0, force=True)
 
     document = docx.Document()
-    _write_docx_content(table_data, document)
+    _write_docx_content((_get_word_user_row(record) for record in records), document, progress)
     document.save(tempfile.name)
 
     directory_path = current_app.config.get('STORAGE_DIRECTORY')
     temp_filename = local_storage.get_basename(tempfile.name)
 
     if to_pdf:
-        convert_to(directory_path, tempfile.name)
+        get_libreoffice_batch_converter().convert_to(directory_path, tempfile.name)
     else:
         dst = f'{directory_path}/{temp_filename}{tempfile_suffix}'
         local_storage.copy_file(tempfile.name, dst)
@@ -143,7 +112,7 @@ def export_user_data_in_word_task_logic(self, created_by: int, request_data: dic
 
 
 @celery.task(bind=True, base=ContextTask, queue='fast')
-def export_user_data_in_word_task(self, created_by: int, request_data: dict, to_pdf: int):
+def export_user_data_in_word_task(self, created_by: int, request_data: dict, to_pdf: int, dataset: dict | None = None):
     # HACK: Consider to move self logic outside of task_logic function.
     #       It helps both maintainability and testability.
-    return export_user_data_in_word_task_logic(self, created_by, request_data, to_pdf)
+    return export_user_data_in_word_task_logic(self, created_by, request_data, to_pdf, dataset)
@@ -0,0 +1,75 @@
+"""Bulk table writer for the Word documents.
+
+python-docx rebuilds the cell grid of the whole table every time
+`_Row.cells` is read, so filling a table cell by cell is quadratic on the
+number of rows. The writer copies a template row, which already has a run
+in each cell, and replaces the text of the runs. Texts which python-docx
+would write as several elements (tabs, line breaks, empty texts or
+surrounding whitespaces) are written with the same steps as `cell.text`,
+so the generated document is the same as the one built cell by cell.
+
+"""
+
+from copy import deepcopy
+
+from docx.document import Document
+from docx.oxml.ns import qn
+from docx.oxml.table import CT_Row, CT_Tc
+
+_TEMPLATE_CELL_TEXT = 'x'
+_SPECIAL_CHARACTERS = frozenset('\t\n\r')
+
+
+class WordTableWriter:
+    """Append rows to a new table of a Word document.
+
+    Parameters
+    ----------
+    document : Document
+        Document where the table is added.
+    cols : int
+        Number of columns of the table.
+
+    """
+
+    def __init__(self, document: Document, cols: int):
+        self.table = document.add_table(rows=1, cols=cols)
+        self._tbl = self.table._tbl  # pylint: disable=protected-access
+        self._template_row = self._tbl.tr_lst[0]
+        self._tbl.remove(self._template_row)
+        self.cols = cols
+        self.total_rows = 0
+
+        for tc in self._template_row.tc_lst:
+            self._set_cell_text(tc, _TEMPLATE_CELL_TEXT)
+
+    @staticmethod
+    def _set_cell_text(tc: CT_Tc, text: str) -> None:
+        # NOTE: Same steps as the setter of `docx.table._Cell.text`
+        tc.clear_content()
+        tc.add_p().add_r().text = text
+
+    @staticmethod
+    def _is_plain_text(text: str) -> bool:
+        return bool(text) and text == text.strip() and _SPECIAL_CHARACTERS.isdisjoint(text)
+
+    def _build_row(self, row: list) -> CT_Row:
+        if len(row) != self.cols:
+            raise ValueError(f'The row has {len(row)} cells but the table has {self.cols} columns')
+
+        tr = deepcopy(self._template_row)
+        texts = list(tr.iter(qn('w:t')))
+
+        for tc, t, cell in zip(tr.tc_lst, texts, row):
+            text = str(cell)
+
+            if self._is_plain_text(text):
+                t.text = text
+            else:
+                self._set_cell_text(tc, text)
+
+        return tr
+
+    def write_row(self, row: list) -> None:
+        self._tbl.append(self._build_row(row))
+        self.total_rows += 1
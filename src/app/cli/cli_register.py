@@ -4,8 +4,11 @@ import click
 from flask import current_app, Flask
 
 from app.cli.create_db_cli import CreateDatabaseCli
+from app.cli.gc_blobs_cli import GcBlobsCli
+from app.cli.index_advisor_cli import IndexAdvisorCli
 from app.cli.seeder_cli import SeederCli
 from app.extensions import db
+from app.file_storages import ContentAddressedStorage
 
 
 def init_app(app: Flask):
@@ -21,6 +24,65 @@ def init_app(app: Flask):
         seeder_cli = SeederCli(db=db)
         seeder_cli.run_command()
 
+    @app.cli.command('index-advisor', help='Suggest indexes for the recorded search shapes.')
+    @click.option('--shapes-file', default=None, help='Recorded search shapes, SEARCH_SHAPES_FILE by default.')
+    @click.option('--emit-migration', is_flag=True, default=False, help='Create a migration with the indexes.')
+    @click.option('--directory', default=None, help='Migrations directory, app/migrations by default.')
+    def index_advisor(shapes_file: str, emit_migration: bool, directory: str) -> None:
+        """Command line script for suggesting indexes.
+
+        The search shapes recorded in SEARCH_SHAPES_FILE are explained and
+        the composite indexes that would serve them are reported.
+
+        Examples
+        --------
+        Report the suggested indexes::
+
+            flask index-advisor --shapes-file storage/search_shapes.jsonl
+
+        Create a migration with the suggested indexes::
+
+            flask index-advisor --emit-migration
+
+        """
+        shapes_file = shapes_file or current_app.config['SEARCH_SHAPES_FILE']
+        if not shapes_file:
+            raise click.UsageError('--shapes-file is required if SEARCH_SHAPES_FILE is not set.')
+
+        index_advisor_cli = IndexAdvisorCli(
+            db=db,
+            shapes_file=shapes_file,
+            migrations_directory=directory or f'{current_app.root_path}/migrations',
+        )
+        index_advisor_cli.run_command(emit_migration=emit_migration)
+
+    @app.cli.command('gc-blobs', help='Delete the document blobs which no document references.')
+    @click.option('--min-age', default=3600, show_default=True, help='Seconds since a blob was written.')
+    @click.option('--dry-run', is_flag=True, default=False, help='Report the orphan blobs without deleting them.')
+    def gc_blobs(min_age: int, dry_run: bool) -> None:
+        """Command line script for deleting the orphan blobs of the content
+        addressed storage.
+
+        The blobs written in the last `--min-age` seconds are kept, their
+        documents may not be committed yet.
+
+        Examples
+        --------
+        Report the orphan blobs::
+
+            flask gc-blobs --dry-run
+
+        Delete the orphan blobs written more than one day ago::
+
+            flask gc-blobs --min-age 86400
+
+        """
+        blobs_directory = (
+            current_app.config['DOCUMENT_BLOBS_DIRECTORY'] or f'{current_app.config["STORAGE_DIRECTORY"]}/blobs'
+        )
+        gc_blobs_cli = GcBlobsCli(db=db, file_storage=ContentAddressedStorage(blobs_directory))
+        gc_blobs_cli.run_command(min_age=min_age, dry_run=dry_run)
+
     @app.shell_context_processor
     def make_shell_context() -> dict:
         """Returns the shell context for an interactive shell for this
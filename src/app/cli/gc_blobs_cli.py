@@ -0,0 +1,45 @@
+import flask_sqlalchemy
+import sqlalchemy as sa
+
+from app.cli.base_cli import BaseCli
+from app.file_storages import ContentAddressedStorage
+from app.models import Document
+
+
+class GcBlobsCli(BaseCli):
+    """Delete the blobs of the content addressed storage which no document references.
+
+    A blob is referenced while there is a document with its digest, the
+    documents which are soft deleted keep their blob, so they can be
+    restored. The blobs are left by the uploads whose transaction was rolled
+    back and by the documents which were removed from the database.
+
+    """
+
+    def __init__(self, db: flask_sqlalchemy.SQLAlchemy, file_storage: ContentAddressedStorage):
+        self.db = db
+        self.file_storage = file_storage
+
+    def get_referenced_digests(self) -> set:
+        query = sa.select(Document.content_hash).where(Document.content_hash.is_not(None)).distinct()
+        return set(self.db.session.scalars(query))
+
+    def run_command(self, *args, **kwargs):
+        min_age = kwargs.get('min_age', 3600)
+        dry_run = kwargs.get('dry_run', False)
+
+        try:
+            referenced_digests = self.get_referenced_digests()
+        finally:
+            self.db.session.close()
+
+        orphan_digests = self.file_storage.delete_orphan_blobs(referenced_digests, min_age=min_age, dry_run=dry_run)
+
+        for digest in orphan_digests:
+            print(f'{"orphan" if dry_run else "deleted"}: {digest}')  # noqa: T201
+
+        print(  # noqa: T201
+            f'{len(orphan_digests)} orphan blobs {"found" if dry_run else "deleted"}, '
+            f'{len(referenced_digests)} blobs referenced.'
+        )
+        return orphan_digests
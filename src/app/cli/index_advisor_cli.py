@@ -0,0 +1,233 @@
+import uuid
+from datetime import date, datetime
+
+import flask_sqlalchemy
+import sqlalchemy as sa
+from alembic.script import ScriptDirectory
+
+from app.cli.base_cli import BaseCli
+from app.helpers.search_shapes import search_shape_recorder
+from app.helpers.sqlalchemy_query_builder import (
+    BETWEEN_OP,
+    EQUAL_OP,
+    GREATER_THAN_OP,
+    GREATER_THAN_OR_EQUAL_TO_OP,
+    IN_OP,
+    LESS_THAN_OP,
+    LESS_THAN_OR_EQUAL_TO_OP,
+    NOT_EQUAL_OP,
+    NOT_IN_OP,
+    SQLAlchemyQueryBuilder,
+    STARTS_WITH_OP,
+)
+
+# NOTE: contains, ncontains, endswith and match can't be served by a B-tree index
+EQUALITY_OPERATORS = {EQUAL_OP, IN_OP}
+RANGE_OPERATORS = {
+    NOT_EQUAL_OP,
+    NOT_IN_OP,
+    LESS_THAN_OP,
+    LESS_THAN_OR_EQUAL_TO_OP,
+    GREATER_THAN_OP,
+    GREATER_THAN_OR_EQUAL_TO_OP,
+    BETWEEN_OP,
+    STARTS_WITH_OP,
+}
+
+EXPLAIN_STATEMENTS = {
+    'mysql': 'EXPLAIN',
+    'sqlite': 'EXPLAIN QUERY PLAN',
+}
+
+MAX_INDEX_NAME_LENGTH = 64
+
+_MIGRATION_TEMPLATE = '''"""Add indexes suggested by the index advisor
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {create_date}
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '{revision}'
+down_revision = '{down_revision}'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+{upgrades}
+
+
+def downgrade():
+{downgrades}
+'''
+
+
+class IndexAdvisorCli(BaseCli):
+    """Suggest indexes for the recorded search shapes.
+
+    Every shape is replayed with sample values and explained. The suggested
+    composite index follows the equality, sort, range rule: columns filtered
+    by equality first, then the sorting columns and finally one column
+    filtered by range.
+
+    """
+
+    def __init__(self, db: flask_sqlalchemy.SQLAlchemy, shapes_file: str, migrations_directory: str):
+        self.db = db
+        self.shapes_file = shapes_file
+        self.migrations_directory = migrations_directory
+        self.query_builder = SQLAlchemyQueryBuilder()
+
+    def _get_models(self) -> dict:
+        return {mapper.local_table.name: mapper.class_ for mapper in self.db.Model.registry.mappers}
+
+    @staticmethod
+    def suggest_index(db_model: type[flask_sqlalchemy.model.Model], shape: dict) -> tuple[str, ...]:
+        def is_indexable(field_name: str) -> bool:
+            field = getattr(db_model, field_name, None)
+            return field is not None and field_name != 'id' and not isinstance(field.type, sa.Text)
+
+        equality_fields = [
+            field_name for field_name, field_operator in shape['search'] if field_operator in EQUALITY_OPERATORS
+        ]
+        sorting_fields = [field_name for field_name, _ in shape['order']]
+        range_fields = [
+            field_name for field_name, field_operator in shape['search'] if field_operator in RANGE_OPERATORS
+        ]
+
+        columns = []
+        for field_name in (*equality_fields, *sorting_fields, *range_fields[:1]):
+            if is_indexable(field_name) and field_name not in columns:
+                columns.append(field_name)
+
+        return tuple(columns)
+
+    def _get_existing_indexes(self, table_name: str) -> list[list[str]]:
+        inspector = sa.inspect(self.db.engine)
+        indexes = [
+            index['column_names']
+            for index in inspector.get_indexes(table_name)
+            if index.get('dialect_options', {}).get('mysql_prefix') != 'FULLTEXT'
+        ]
+        indexes += [constraint['column_names'] for constraint in inspector.get_unique_constraints(table_name)]
+        indexes.append(inspector.get_pk_constraint(table_name)['constrained_columns'])
+        return indexes
+
+    def _is_covered(self, table_name: str, columns: tuple[str, ...]) -> bool:
+        return any(index[: len(columns)] == list(columns) for index in self._get_existing_indexes(table_name))
+
+    @staticmethod
+    def _get_sample_value(field: sa.orm.InstrumentedAttribute, field_operator: str) -> any:
+        """Value of the type of a field, the statement is explained with the values rendered as literals."""
+        if isinstance(field.type, sa.Enum):
+            value = field.type.enums[0]
+        elif isinstance(field.type, sa.DateTime | sa.TIMESTAMP):
+            value = datetime(2000, 1, 1)
+        elif isinstance(field.type, sa.Date):
+            value = date(2000, 1, 1)
+        elif isinstance(field.type, sa.Boolean):
+            value = True
+        elif isinstance(field.type, sa.Integer):
+            value = 1
+        else:
+            value = 'a'
+
+        if field_operator in [IN_OP, NOT_IN_OP, BETWEEN_OP]:
+            return [value, value]
+        return value
+
+    def explain(self, db_model: type[flask_sqlalchemy.model.Model], shape: dict) -> list[dict]:
+        dialect = self.db.session.get_bind().dialect
+        if dialect.name not in EXPLAIN_STATEMENTS:
+            return []
+
+        request_data = {
+            'search': [
+                {
+                    'field_name': field_name,
+                    'field_operator': field_operator,
+                    'field_value': self._get_sample_value(getattr(db_model, field_name), field_operator),
+                }
+                for field_name, field_operator in shape['search']
+            ],
+            'order': [{'field_name': field_name, 'sorting': sorting} for field_name, sorting in shape['order']],
+        }
+        query = self.query_builder.create_search_query(db_model, self.db.session.query(db_model), request_data)
+        query = self.query_builder.paginate_query(db_model, query, request_data)
+        sql = query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+
+        # NOTE: exec_driver_sql is used because the literal values could
+        # contain characters which are parsed as parameters by sa.text.
+        result = self.db.session.connection().exec_driver_sql(f'{EXPLAIN_STATEMENTS[dialect.name]} {sql}')
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    def _get_index_name(table_name: str, columns: tuple[str, ...]) -> str:
+        return f'ix_{table_name}_{"_".join(columns)}'[:MAX_INDEX_NAME_LENGTH]
+
+    def emit_migration(self, suggestions: dict[str, list[tuple[str, ...]]]) -> str:
+        script_directory = ScriptDirectory(self.migrations_directory)
+        down_revision = script_directory.get_current_head()
+        revision = uuid.uuid4().hex[-12:]
+        upgrades, downgrades = [], []
+
+        for table_name, indexes in suggestions.items():
+            if upgrades:
+                upgrades.append('')
+                downgrades.append('')
+
+            upgrades.append(f"    with op.batch_alter_table('{table_name}', schema=None) as batch_op:")
+            downgrades.append(f"    with op.batch_alter_table('{table_name}', schema=None) as batch_op:")
+
+            for columns in indexes:
+                index_name = self._get_index_name(table_name, columns)
+                upgrades.append(f"        batch_op.create_index('{index_name}', {list(columns)!r}, unique=False)")
+                downgrades.append(f"        batch_op.drop_index('{index_name}')")
+
+        filepath = f'{script_directory.versions}/{revision}_add_index_advisor_indexes.py'
+        with open(filepath, 'w', encoding='utf-8') as fp:
+            fp.write(
+                _MIGRATION_TEMPLATE.format(
+                    revision=revision,
+                    down_revision=down_revision,
+                    create_date=datetime.now(),
+                    upgrades='\n'.join(upgrades),
+                    downgrades='\n'.join(downgrades),
+                )
+            )
+
+        return filepath
+
+    def run_command(self, *args, **kwargs):
+        emit_migration = kwargs.get('emit_migration', False)
+        models = self._get_models()
+        suggestions = {}
+
+        for shape in search_shape_recorder.read(self.shapes_file):
+            db_model = models.get(shape['table'])
+            if db_model is None:
+                continue
+
+            columns = self.suggest_index(db_model, shape)
+            is_covered = not columns or self._is_covered(shape['table'], columns)
+
+            print(f'{shape["table"]} search={shape["search"]} order={shape["order"]}')  # noqa: T201
+            for row in self.explain(db_model, shape):
+                print(f'    explain: {row}')  # noqa: T201
+
+            if is_covered:
+                print('    served by an existing index')  # noqa: T201
+            else:
+                print(f'    suggested index: ({", ".join(columns)})')  # noqa: T201
+                table_suggestions = suggestions.setdefault(shape['table'], [])
+                if columns not in table_suggestions:
+                    table_suggestions.append(columns)
+
+        if emit_migration and suggestions:
+            filepath = self.emit_migration(suggestions)
+            print(f'Migration created: {filepath}')  # noqa: T201
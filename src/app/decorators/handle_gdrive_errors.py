@@ -1,3 +1,4 @@
+import inspect
 import logging
 from functools import wraps
 
@@ -14,16 +15,31 @@ def handle_gdrive_errors():
         404: GoogleDriveNotFoundError('File or resource not found.'),
     }
 
+    def raise_gdrive_error(func, e: HttpError):
+        status = e.resp.status
+        logger.error(f'Google API error {status} in {func.__name__}: {e}')
+
+        raise gdrive_http_error_map.get(status, GoogleDriveError(f'Unexpected error: {e}')) from e
+
     def decorator(func):
+        # NOTE: The body of a generator runs while it's iterated, after the call has returned
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                try:
+                    return (yield from func(*args, **kwargs))
+                except HttpError as e:
+                    raise_gdrive_error(func, e)
+
+            return generator_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except HttpError as e:
-                status = e.resp.status
-                logger.error(f'Google API error {status} in {func.__name__}: {e}')
-
-                raise gdrive_http_error_map.get(status, GoogleDriveError(f'Unexpected error: {e}')) from e
+                raise_gdrive_error(func, e)
 
         return wrapper
 
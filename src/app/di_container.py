@@ -3,8 +3,11 @@
 from dependency_injector import containers, providers
 
 from app import services
+from app.file_storages import ContentAddressedStorage, LocalStorage
+from app.helpers.gdrive_cache import GoogleDriveCache
 from app.helpers.otp_token import OTPTokenManager
 from app.providers.google_drive import GoogleDriveFilesProvider, GoogleDrivePermissionsProvider
+from app.utils.constants import DOCUMENT_DOWNLOAD_TOKEN_SALT
 
 
 class ServiceDIContainer(containers.DeclarativeContainer):
@@ -35,6 +38,12 @@ class ServiceDIContainer(containers.DeclarativeContainer):
         salt=config.salt,
         expiration=config.expiration.as_int(),
     )
+    document_download_token_manager = providers.Factory(
+        OTPTokenManager,
+        secret_key=config.secret_key,
+        salt=DOCUMENT_DOWNLOAD_TOKEN_SALT,
+        expiration=config.document_download_expiration.as_int(),
+    )
 
     # Providers
     gdrive_files_provider = providers.Factory(
@@ -50,12 +59,26 @@ class ServiceDIContainer(containers.DeclarativeContainer):
         enable_google_drive=config.gdrive.enable,
     )
 
+    # File storages
+    document_file_storage = providers.Selector(
+        config.document_storage,
+        local=providers.Factory(LocalStorage),
+        content_addressed=providers.Factory(ContentAddressedStorage, directory_path=config.document_blobs_directory),
+    )
+    gdrive_cache = providers.Singleton(
+        GoogleDriveCache,
+        directory_path=config.gdrive.cache_directory,
+        max_size=config.gdrive.cache_max_size.as_int(),
+    )
+
     # Services
     auth_service = providers.Factory(services.AuthService)
     document_service = providers.Factory(
         services.DocumentService,
+        file_storage=document_file_storage,
         gdrive_files_provider=gdrive_files_provider,
         gdrive_permissions_provider=gdrive_permissions_provider,
+        gdrive_cache=gdrive_cache,
     )
     role_service = providers.Factory(services.RoleService)
     user_service = providers.Factory(services.UserService)
@@ -58,6 +58,10 @@ class FileEmptyError(OSError):
     pass
 
 
+class FileTooLargeError(OSError):
+    pass
+
+
 class GoogleDriveError(Exception):
     """Base exception for Google Drive operations."""
 
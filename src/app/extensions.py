@@ -68,9 +68,19 @@ def _init_python_dependency_injector(flask_app: Flask):
             'secret_key': flask_app.config.get('SECRET_KEY'),
             'salt': flask_app.config.get('SECURITY_PASSWORD_SALT'),
             'expiration': flask_app.config.get('RESET_TOKEN_EXPIRES'),
+            'document_download_expiration': flask_app.config.get('DOCUMENT_DOWNLOAD_TOKEN_EXPIRES'),
+            'document_storage': flask_app.config.get('DOCUMENT_STORAGE'),
+            'document_blobs_directory': (
+                flask_app.config.get('DOCUMENT_BLOBS_DIRECTORY') or f'{flask_app.config["STORAGE_DIRECTORY"]}/blobs'
+            ),
             'gdrive': {
                 'service_account_path': f'{flask_app.config["ROOT_DIRECTORY"]}/service_account.json',
                 'enable': not flask_app.config['TESTING'],
+                'cache_directory': (
+                    flask_app.config.get('GDRIVE_CACHE_DIRECTORY')
+                    or f'{flask_app.config["STORAGE_DIRECTORY"]}/gdrive_cache'
+                ),
+                'cache_max_size': flask_app.config.get('GDRIVE_CACHE_MAX_SIZE'),
             },
         }
     )
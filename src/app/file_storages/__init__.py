@@ -1,3 +1,4 @@
 """Package for abstracting file storage operations and backends."""
 
+from .content_addressed import ContentAddressedStorage
 from .local import LocalStorage
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import IO
 
 
 class BaseFileStorage(ABC):
@@ -8,6 +9,10 @@ class BaseFileStorage(ABC):
     def save_bytes(self, file_content: bytes, filename: str, override: bool = False):
         raise NotImplementedError
 
+    @abstractmethod
+    def save_stream(self, file_stream: IO[bytes], filename: str, override: bool = False, max_size: int = None) -> int:
+        raise NotImplementedError
+
     @abstractmethod
     def copy_file(self, src: str, dst: str) -> None:
         raise NotImplementedError
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import time
+import uuid
+from collections.abc import Iterator
+from typing import IO
+
+from app.exceptions import FileEmptyError, FileTooLargeError
+
+from .local import LocalStorage
+
+_DIGEST_LENGTH = 64
+
+
+class ContentAddressedStorage(LocalStorage):
+    """Local storage which keeps every content once, under its SHA-256 digest.
+
+    The blob of a content is stored in `<directory_path>/<digest[:2]>/<digest>`,
+    the first two characters of the digest shard the blobs, so a folder
+    never has too many files. A content which is already stored isn't
+    written again, the documents with the same content share the blob.
+
+    The blobs are referenced by the `content_hash` of the documents, a blob
+    which isn't referenced by any document is deleted by the `gc-blobs`
+    command.
+
+    Parameters
+    ----------
+    directory_path : str
+        Folder of the blobs.
+
+    """
+
+    def __init__(self, directory_path: str):
+        self.directory_path = directory_path
+
+    def get_blob_directory(self, digest: str) -> str:
+        return f'{self.directory_path}/{digest[:2]}'
+
+    def get_blob_path(self, digest: str) -> str:
+        return f'{self.get_blob_directory(digest)}/{digest}'
+
+    def blob_exists(self, digest: str) -> bool:
+        return os.path.exists(self.get_blob_path(digest))
+
+    def _touch_blob(self, digest: str) -> bool:
+        """Refresh the modification time of a blob, so the garbage collector doesn't delete a blob that is reused."""
+        try:
+            os.utime(self.get_blob_path(digest))
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def _hash_stream(self, file_stream: IO[bytes], max_size: int = None) -> tuple[str, int]:
+        sha256 = hashlib.sha256()
+        filesize = 0
+
+        while chunk := file_stream.read(self.chunk_size):
+            filesize += len(chunk)
+
+            if max_size is not None and filesize > max_size:
+                raise FileTooLargeError(f'The file is larger than {max_size} bytes!')
+
+            sha256.update(chunk)
+
+        if filesize == 0:
+            raise FileEmptyError('The file is empty!')
+
+        return sha256.hexdigest(), filesize
+
+    def _write_blob(self, file_stream: IO[bytes], max_size: int = None) -> tuple[str, int]:
+        """Write a stream in a temporary file while it's hashed, the file becomes the blob of the digest."""
+        os.makedirs(self.directory_path, exist_ok=True)
+        tmp_filename = f'{self.directory_path}/{uuid.uuid4().hex}.tmp'
+        sha256 = hashlib.sha256()
+        filesize = 0
+
+        try:
+            with open(tmp_filename, 'xb') as f:
+                while chunk := file_stream.read(self.chunk_size):
+                    filesize += len(chunk)
+
+                    if max_size is not None and filesize > max_size:
+                        raise FileTooLargeError(f'The file is larger than {max_size} bytes!')
+
+                    sha256.update(chunk)
+                    f.write(chunk)
+
+            if filesize == 0:
+                raise FileEmptyError('The file is empty!')
+
+            digest = sha256.hexdigest()
+
+            if self._touch_blob(digest):
+                self.delete_file(tmp_filename)
+            else:
+                os.makedirs(self.get_blob_directory(digest), exist_ok=True)
+                os.replace(tmp_filename, self.get_blob_path(digest))
+        except BaseException:
+            self.delete_file(tmp_filename)
+            raise
+
+        return digest, filesize
+
+    def save_blob(self, file_stream: IO[bytes], max_size: int = None) -> tuple[str, int]:
+        """Save a stream as a blob, nothing is written if its content is already stored.
+
+        A seekable stream is hashed before it's written, so a known content
+        is only read. A stream which can't be read twice is hashed while it's
+        written in a temporary file, which is discarded if the content is
+        already stored.
+
+        Parameters
+        ----------
+        file_stream : IO[bytes]
+            Content of the file.
+        max_size : int
+            Maximum size of the file in bytes, there is no limit by default.
+
+        Returns
+        -------
+        tuple[str, int]
+            SHA-256 digest and size of the content.
+
+        """
+        if not file_stream.seekable():
+            return self._write_blob(file_stream, max_size)
+
+        start = file_stream.tell()
+        digest, filesize = self._hash_stream(file_stream, max_size)
+
+        if self._touch_blob(digest):
+            return digest, filesize
+
+        file_stream.seek(start)
+        return self._write_blob(file_stream, max_size)
+
+    def iter_blobs(self) -> Iterator[os.DirEntry]:
+        """Iterate over the stored blobs, the temporary files of the writes in progress are skipped."""
+        if not os.path.isdir(self.directory_path):
+            return
+
+        with os.scandir(self.directory_path) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.is_file() and len(entry.name) == _DIGEST_LENGTH:
+                            yield entry
+
+    def delete_orphan_blobs(self, referenced_digests: set, min_age: float = 3600, dry_run: bool = False) -> list:
+        """Delete the blobs which aren't referenced.
+
+        Parameters
+        ----------
+        referenced_digests : set
+            Digests of the blobs which are referenced by a document.
+        min_age : float
+            Seconds since the last write of a blob before it can be deleted,
+            the document of a blob which has just been written may not be
+            committed yet.
+        dry_run : bool
+            Report the orphan blobs without deleting them.
+
+        Returns
+        -------
+        list
+            Digests of the orphan blobs.
+
+        """
+        orphan_digests = []
+        deleted_before = time.time() - min_age
+
+        for entry in self.iter_blobs():
+            try:
+                is_orphan = entry.name not in referenced_digests and entry.stat().st_mtime <= deleted_before
+            except FileNotFoundError:
+                continue
+
+            if is_orphan:
+                orphan_digests.append(entry.name)
+
+                if not dry_run:
+                    self.delete_file(entry.path)
+
+        return orphan_digests
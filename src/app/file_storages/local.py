@@ -1,12 +1,16 @@
 import os
+import uuid
 from shutil import copyfile
+from typing import IO
 
-from app.exceptions import FileEmptyError
+from app.exceptions import FileEmptyError, FileTooLargeError
 
 from .base import BaseFileStorage
 
 
 class LocalStorage(BaseFileStorage):
+    chunk_size = 1024 * 1024
+
     def save_bytes(self, file_content: bytes, filename: str, override: bool = False):
         try:
             if not override and os.path.exists(filename):
@@ -26,6 +30,56 @@ class LocalStorage(BaseFileStorage):
                     os.remove(filename)
             raise e
 
+    def save_stream(self, file_stream: IO[bytes], filename: str, override: bool = False, max_size: int = None) -> int:
+        """Save a stream in a file without loading it in memory.
+
+        The stream is written in chunks in a temporary file of the same
+        directory, which replaces the file once the stream is complete, so
+        the file is never read half written.
+
+        Parameters
+        ----------
+        file_stream : IO[bytes]
+            Content of the file.
+        filename : str
+            Path of the file.
+        override : bool
+            Replace the file if it already exists.
+        max_size : int
+            Maximum size of the file in bytes, there is no limit by default.
+
+        Returns
+        -------
+        int
+            Size of the file.
+
+        """
+        if not override and os.path.exists(filename):
+            raise FileExistsError('The file already exists!')
+
+        tmp_filename = f'{filename}.{uuid.uuid4().hex}.tmp'
+        filesize = 0
+
+        try:
+            with open(tmp_filename, 'xb') as f:
+                while chunk := file_stream.read(self.chunk_size):
+                    filesize += len(chunk)
+
+                    if max_size is not None and filesize > max_size:
+                        raise FileTooLargeError(f'The file is larger than {max_size} bytes!')
+
+                    f.write(chunk)
+
+            if filesize == 0:
+                raise FileEmptyError('The file is empty!')
+
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            self.delete_file(tmp_filename)
+            raise
+
+        return filesize
+
     def copy_file(self, src: str, dst: str) -> None:
         copyfile(src, dst)
 
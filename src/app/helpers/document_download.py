@@ -0,0 +1,227 @@
+"""Module for sending the content of the documents.
+
+`send_file` answers the conditional requests: the responses have an ETag,
+so a client which sends it back in `If-None-Match` gets a 304 without the
+file, and `Range`/`If-Range` requests get the requested bytes (206) for
+resuming big downloads. The local documents stored by content use their
+digest as ETag.
+
+A local file is read by the WSGI server with its file wrapper, which uses
+`os.sendfile` if the server supports it (e.g. Gunicorn). The transfer can
+be offloaded to the front server instead with `DOCUMENT_DOWNLOAD_OFFLOAD`:
+
+- "x-sendfile": the response has the path of the file in `X-Sendfile`
+  (Apache with mod_xsendfile, Lighttpd).
+- "x-accel-redirect": the response has the URI of the file in
+  `X-Accel-Redirect` (nginx). The URI is the path of the file relative to
+  `DOCUMENT_X_ACCEL_ROOT` under the `DOCUMENT_X_ACCEL_PREFIX` internal
+  location.
+
+The front server answers the `Range` requests of the offloaded files.
+
+The documents of Google Drive are streamed: the chunks are relayed to the
+client as they are downloaded and a `Range` request only downloads the
+requested bytes.
+
+"""
+
+import itertools
+import os
+import unicodedata
+from collections.abc import Callable, Iterator
+from typing import IO
+from urllib.parse import quote
+
+from flask import current_app, request, Response, send_file, stream_with_context
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.utils import send_file as werkzeug_send_file
+
+X_SENDFILE = 'x-sendfile'
+X_ACCEL_REDIRECT = 'x-accel-redirect'
+OFFLOADS = (X_SENDFILE, X_ACCEL_REDIRECT)
+
+
+def _get_x_accel_redirect_uri(filepath: str) -> str | None:
+    root = os.path.realpath(current_app.config['DOCUMENT_X_ACCEL_ROOT'] or current_app.config['STORAGE_DIRECTORY'])
+    filepath = os.path.realpath(filepath)
+
+    if os.path.commonpath([root, filepath]) != root:
+        return None
+
+    prefix = current_app.config['DOCUMENT_X_ACCEL_PREFIX'].rstrip('/')
+    return quote(f'{prefix}/{os.path.relpath(filepath, root)}')
+
+
+def _send_offloaded_file(filepath: str, offload: str, **kwargs) -> Response | None:
+    """Send the headers of a file, the front server sends its content."""
+    internal_uri = _get_x_accel_redirect_uri(filepath) if offload == X_ACCEL_REDIRECT else None
+
+    if offload == X_ACCEL_REDIRECT and internal_uri is None:
+        return None
+
+    response = werkzeug_send_file(
+        filepath,
+        request.environ,
+        use_x_sendfile=True,
+        response_class=current_app.response_class,
+        _root_path=current_app.root_path,
+        conditional=False,
+        **kwargs,
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+
+    if internal_uri is not None:
+        del response.headers['X-Sendfile']
+        response.headers['X-Accel-Redirect'] = internal_uri
+
+    # NOTE: The Range requests are answered by the front server
+    response = response.make_conditional(request.environ, accept_ranges=False)
+
+    if response.status_code == 304:
+        response.headers.pop('X-Sendfile', None)
+        response.headers.pop('X-Accel-Redirect', None)
+
+    return response
+
+
+def _set_content_disposition(response: Response, as_attachment: bool, download_name: str = None) -> None:
+    if download_name is None:
+        return
+
+    try:
+        download_name.encode('ascii')
+        filenames = {'filename': download_name}
+    except UnicodeEncodeError:
+        simple_name = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        filenames = {'filename': simple_name, 'filename*': f"UTF-8''{quote(download_name, safe='!#$&+-.^_`|~')}"}
+
+    response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline', **filenames)
+
+
+def _get_requested_range(size: int | None, etag: str | None) -> tuple[int, int] | None:
+    """Bytes requested by the `Range` header, `If-Range` discards the range if the document changed."""
+    if request.range is None or size is None:
+        return None
+
+    # NOTE: The streamed documents have no modification date, an If-Range with a date never matches
+    if request.if_range.date is not None:
+        return None
+
+    if request.if_range.etag is not None and request.if_range.etag != etag:
+        return None
+
+    byte_range = request.range.range_for_length(size)
+
+    if byte_range is None:
+        raise RequestedRangeNotSatisfiable(length=size)
+
+    return byte_range
+
+
+def _send_stream(
+    stream_content: Callable[[int, int | None], Iterator[bytes]],
+    size: int | None,
+    mimetype: str,
+    as_attachment: bool,
+    download_name: str | None,
+    etag: bool | str,
+) -> Response:
+    """Send the chunks of a stream as they are received.
+
+    The first chunk is read before the response is sent, so an error of
+    the storage is answered with an error response instead of a broken
+    download.
+
+    """
+    etag = etag if isinstance(etag, str) else None
+    response = current_app.response_class(mimetype=mimetype)
+    response.cache_control.no_cache = True
+    _set_content_disposition(response, as_attachment, download_name)
+
+    if etag:
+        response.set_etag(etag)
+
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+
+    if size is not None:
+        response.headers['Accept-Ranges'] = 'bytes'
+
+    byte_range = _get_requested_range(size, etag)
+
+    if byte_range is None:
+        chunks = stream_content(0, None)
+        content_length = size
+    else:
+        start, stop = byte_range
+        chunks = stream_content(start, stop - 1)
+        content_length = stop - start
+        response.status_code = 206
+        response.content_range = ContentRange('bytes', start, stop, size)
+
+    first_chunk = next(chunks, b'')
+    response.response = stream_with_context(itertools.chain([first_chunk], chunks))
+
+    if content_length is not None:
+        response.content_length = content_length
+
+    return response
+
+
+def send_document(
+    path_or_file: str | IO[bytes] = None,
+    mimetype: str = None,
+    as_attachment: bool = False,
+    download_name: str = None,
+    etag: bool | str = True,
+    stream_content: Callable[[int, int | None], Iterator[bytes]] = None,
+    size: int = None,
+) -> Response:
+    """Send the content of a document answering the conditional and Range requests.
+
+    Parameters
+    ----------
+    path_or_file : str | IO[bytes]
+        Path of a local file or a file object with the content.
+    mimetype : str
+        MIME type of the document.
+    as_attachment : bool
+        Send the document as an attachment instead of inline.
+    download_name : str
+        Name of the file the browser uses when it's saved.
+    etag : bool | str
+        ETag of the document, True for generating it from the modification
+        time and the size of a local file.
+    stream_content : Callable[[int, int | None], Iterator[bytes]]
+        Function which streams the content between two bytes (the last one
+        inclusive, None for the end of the document), instead of
+        `path_or_file`.
+    size : int
+        Size of the streamed document, the `Range` requests are only
+        answered if it's known.
+
+    Returns
+    -------
+    Response
+        Response with the document, only with its headers if the transfer
+        is offloaded to the front server.
+
+    """
+    if stream_content is not None:
+        return _send_stream(stream_content, size, mimetype, bool(as_attachment), download_name, etag)
+
+    kwargs = {'mimetype': mimetype, 'as_attachment': bool(as_attachment), 'download_name': download_name, 'etag': etag}
+    offload = current_app.config['DOCUMENT_DOWNLOAD_OFFLOAD']
+
+    if offload and offload not in OFFLOADS:
+        raise ValueError(f'DOCUMENT_DOWNLOAD_OFFLOAD "{offload}" not valid, it must be one of {OFFLOADS}')
+
+    if offload and isinstance(path_or_file, str | os.PathLike):
+        response = _send_offloaded_file(os.fspath(path_or_file), offload, **kwargs)
+
+        if response is not None:
+            return response
+
+    return send_file(path_or_file, conditional=True, **kwargs)
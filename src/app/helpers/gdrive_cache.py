@@ -0,0 +1,272 @@
+"""Module for caching the content of the Google Drive documents on disk.
+
+Every download of a Google Drive document goes out to Google Drive. The
+cache keeps a copy of the downloaded files in a local folder, so the next
+downloads of the same revision are sent from the disk.
+
+A cached file is keyed by the id of the file and its revision (the
+`modifiedTime` and `md5Checksum` of its metadata), a new revision is never
+read from the copy of an older one. The files which haven't been read for
+the longest time are deleted once the cache exceeds its size.
+
+Concurrent misses of the same file download it once: the first download
+fills a partial file of the revision in a thread of its own, so the fill
+runs at the speed of Google Drive whatever the speed of its client. The
+filler holds a `flock` lock of the partial file until it's published as
+the cached file (or deleted if the download fails), the other downloads
+don't wait for it, they read the partial file while it grows. The locks
+are per file and work between the processes which share the folder.
+
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import IO
+
+from app.exceptions import GoogleDriveError
+
+logger = logging.getLogger(__name__)
+
+_STORAGE_ID_PATTERN = re.compile(r'^[\w-]+$')
+
+
+class GoogleDriveCache:
+    """Read-through cache of the content of the Google Drive files.
+
+    Parameters
+    ----------
+    directory_path : str
+        Folder of the cached files.
+    max_size : int
+        Maximum size of the cached files in bytes, 0 disables the cache.
+
+    """
+
+    chunk_size = 1024 * 1024
+    # NOTE: Seconds a reader of a partial file waits for the next chunk of the fill
+    poll_interval = 0.05
+
+    def __init__(self, directory_path: str, max_size: int = 0):
+        self.directory_path = directory_path
+        self.max_size = max_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def files_directory(self) -> str:
+        return f'{self.directory_path}/files'
+
+    @staticmethod
+    def get_revision(metadata: dict) -> str:
+        """Key of the revision of a file from its metadata."""
+        revision = f'{metadata.get("modifiedTime")}:{metadata.get("md5Checksum")}'
+        return hashlib.sha256(revision.encode()).hexdigest()[:32]
+
+    def _get_file_directory(self, storage_id: str) -> str:
+        if not _STORAGE_ID_PATTERN.match(storage_id):
+            raise ValueError(f'Storage id "{storage_id}" not valid')
+
+        return f'{self.files_directory}/{storage_id}'
+
+    def get_filepath(self, storage_id: str, revision: str) -> str:
+        return f'{self._get_file_directory(storage_id)}/{revision}'
+
+    def can_store(self, size: int | None) -> bool:
+        return self.enabled and size is not None and size <= self.max_size
+
+    def get(self, storage_id: str, revision: str) -> str | None:
+        """Path of the cached revision of a file, None if it isn't cached."""
+        filepath = self.get_filepath(storage_id, revision)
+
+        try:
+            # NOTE: The modification time is the last read, the least recently read files are evicted first
+            os.utime(filepath)
+        except FileNotFoundError:
+            return None
+
+        return filepath
+
+    @staticmethod
+    def _is_file_of_path(path: str, file: IO[bytes]) -> bool:
+        """Check the file is still the one of the path, it may have been replaced or deleted since it was opened."""
+        try:
+            path_stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+
+        file_stat = os.fstat(file.fileno())
+        return (path_stat.st_dev, path_stat.st_ino) == (file_stat.st_dev, file_stat.st_ino)
+
+    def _read(self, filepath: str) -> Iterator[bytes]:
+        with open(filepath, 'rb') as f:
+            while chunk := f.read(self.chunk_size):
+                yield chunk
+
+    def _fill(self, partial_file: IO[bytes], filepath: str, chunks: Iterator[bytes], errors: list) -> None:
+        """Write the chunks in the partial file, it's published as the cached file once it's complete.
+
+        The lock of the partial file is released when the file is closed,
+        after it's published or deleted.
+
+        """
+        partial_filepath = f'{filepath}.partial'
+
+        with partial_file:
+            try:
+                for chunk in chunks:
+                    partial_file.write(chunk)
+
+                # NOTE: The folder of the file is deleted if the file is invalidated during the download
+                if not self._is_file_of_path(partial_filepath, partial_file):
+                    raise FileNotFoundError(f'Partial file {partial_filepath} deleted during the download')
+
+                os.replace(partial_filepath, filepath)
+            except BaseException as e:
+                logger.exception(f'Download of {filepath} failed, it is not cached')
+                errors.append(e)
+
+                if self._is_file_of_path(partial_filepath, partial_file):
+                    os.remove(partial_filepath)
+
+                return
+
+        self.evict()
+
+    def _tail(self, partial_file: IO[bytes], filepath: str, errors: list = None) -> Iterator[bytes]:
+        """Read a partial file while it's filled, until its filler releases the lock."""
+        with partial_file:
+            partial_file.seek(0)
+
+            while True:
+                if chunk := partial_file.read(self.chunk_size):
+                    yield chunk
+                    continue
+
+                try:
+                    fcntl.flock(partial_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    time.sleep(self.poll_interval)
+
+            # NOTE: The fill is over, its last chunks were written before the lock was released
+            while chunk := partial_file.read(self.chunk_size):
+                yield chunk
+
+            if not self._is_file_of_path(filepath, partial_file):
+                raise errors[0] if errors else GoogleDriveError(f'Download of {filepath} failed')
+
+    def read_through(self, storage_id: str, revision: str, download: Callable[[], Iterator[bytes]]) -> Iterator[bytes]:
+        """Stream a revision of a file from the cache, it's downloaded and cached if it isn't cached.
+
+        The first miss of a revision fills its partial file in a thread,
+        the misses read the partial file while it's filled.
+
+        Parameters
+        ----------
+        storage_id : str
+            Id of the file.
+        revision : str
+            Key of the revision of the file.
+        download : Callable[[], Iterator[bytes]]
+            Function which downloads the content of the file, it's called
+            in the thread of the caller.
+
+        Yields
+        ------
+        bytes
+            Chunk of the content.
+
+        """
+        filepath = self.get_filepath(storage_id, revision)
+        partial_filepath = f'{filepath}.partial'
+
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            partial_file = open(partial_filepath, 'a+b', buffering=0)
+        except FileNotFoundError:
+            # NOTE: The file is being invalidated, it isn't cached
+            yield from download()
+            return
+
+        try:
+            fcntl.flock(partial_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield from self._tail(partial_file, filepath)
+            return
+
+        try:
+            # NOTE: The partial file may have been published or deleted before it was locked
+            if not self._is_file_of_path(partial_filepath, partial_file):
+                partial_file.close()
+                yield from self.read_through(storage_id, revision, download)
+                return
+
+            if cached_filepath := self.get(storage_id, revision):
+                os.remove(partial_filepath)
+                partial_file.close()
+                yield from self._read(cached_filepath)
+                return
+
+            # NOTE: A partial file is left by a download interrupted without releasing its lock (e.g. a killed process)
+            partial_file.truncate(0)
+            reader = open(partial_filepath, 'rb', buffering=0)
+            errors = []
+            threading.Thread(target=self._fill, args=(partial_file, filepath, download(), errors), daemon=True).start()
+        except BaseException:
+            partial_file.close()
+            raise
+
+        yield from self._tail(reader, filepath, errors)
+
+    def invalidate(self, storage_id: str) -> None:
+        """Delete the cached revisions of a file."""
+        shutil.rmtree(self._get_file_directory(storage_id), ignore_errors=True)
+
+    def evict(self) -> int:
+        """Delete the least recently read files until the cache fits in its size.
+
+        Returns
+        -------
+        int
+            Number of deleted files.
+
+        """
+        cached_files = []
+
+        for dirpath, _, filenames in os.walk(self.files_directory):
+            for filename in filenames:
+                if filename.endswith('.partial'):
+                    continue
+
+                try:
+                    stat = os.stat(os.path.join(dirpath, filename))
+                except FileNotFoundError:
+                    continue
+
+                cached_files.append((stat.st_mtime, stat.st_size, os.path.join(dirpath, filename)))
+
+        total_size = sum(size for _, size, _ in cached_files)
+        total_deleted = 0
+
+        for _, size, filepath in sorted(cached_files):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+
+            total_size -= size
+            total_deleted += 1
+
+        return total_deleted
@@ -1,22 +1,32 @@
+import atexit
+import fcntl
+import http.client
 import logging
 import os
+import queue
 import re
+import shutil
+import signal
 import subprocess
 import sys
+import threading
+import time
 import uuid
+import xmlrpc.client
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+PDF_FILTER_NAME = 'writer_pdf_Export'
+
 
 def convert_to(folder: str, source: str) -> str:
     logger.debug(f'Folder: {folder}')
     logger.debug(f'Word file: {source}')
 
-    if not os.path.isdir(folder):
-        raise FileNotFoundError(f'{source} directory not found')
-
-    if not os.path.isfile(source):
-        raise FileNotFoundError(f'{source} file not found')
+    _check_paths(folder, source)
 
     args = [
         libreoffice_exec(),
@@ -26,13 +36,25 @@ def convert_to(folder: str, source: str) -> str:
         #       Without this, LibreOffice may fail or hang due to profile conflicts.
         f'-env:UserInstallation=file:///tmp/lo_profile_{uuid.uuid4().hex}',
         '--convert-to',
-        'pdf:writer_pdf_Export',
+        f'pdf:{PDF_FILTER_NAME}',
         '--outdir',
         folder,
         source,
     ]
 
     process = subprocess.run(args, capture_output=True, env={'HOME': os.getenv('HOME')}, check=False)
+    return _get_converted_filename(process)
+
+
+def _check_paths(folder: str, source: str) -> None:
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f'{source} directory not found')
+
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f'{source} file not found')
+
+
+def _get_converted_filename(process: subprocess.CompletedProcess) -> str:
     logger.debug(f'STDOUT: {process.stdout.decode()}')
     logger.debug(f'STDERR: {process.stderr.decode()}')
     logger.debug(f'RETURNCODE: {process.returncode}')
@@ -54,8 +76,555 @@ def libreoffice_exec() -> str:
 
 class LibreOfficeError(Exception):
     def __init__(self, output):
+        super().__init__(output)
         self.output = output
 
 
+class LibreOfficeCrashError(LibreOfficeError):
+    """The LibreOffice instance died or stopped answering."""
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    def __init__(self, timeout: float | None):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host: str) -> http.client.HTTPConnection:
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
+
+
+class LibreOfficeInstance:
+    """Long-lived headless LibreOffice driven by UNO.
+
+    The instance runs a `unoserver` process, which starts
+    `soffice --headless --accept=...` with the user profile of the instance
+    and keeps it running. The conversions are sent to unoserver with
+    XML-RPC and run in the running soffice through UNO, so they don't pay
+    the startup of LibreOffice. A dead process is started again by the next
+    conversion.
+
+    Parameters
+    ----------
+    profile_directory : str
+        Directory of the user profile, it's only used by this instance.
+    port : int
+        Port of the XML-RPC server of unoserver, the next one is the port
+        of the UNO connection of soffice.
+    timeout : int
+        Seconds to wait for the start of the process or for a conversion,
+        unoserver kills soffice if a conversion takes longer.
+    executable : str
+        Path of the `unoserver` executable, it must run with a Python which
+        has the `uno` module (e.g. the `python3-uno` package).
+
+    """
+
+    api_version = '3'
+
+    def __init__(self, profile_directory: str, port: int, timeout: int, executable: str = 'unoserver'):
+        self.profile_directory = profile_directory
+        self.port = port
+        self.timeout = timeout
+        self.executable = executable
+        self._process = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    @property
+    def _pid_filepath(self) -> str:
+        return f'{self.profile_directory}.pid'
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _get_server(self, timeout: float | None = None) -> xmlrpc.client.ServerProxy:
+        return xmlrpc.client.ServerProxy(self.url, allow_none=True, transport=_TimeoutTransport(timeout))
+
+    def _kill_orphan_process(self) -> None:
+        """Stop the process left by a previous owner of the profile which was killed without stopping it."""
+        try:
+            with open(self._pid_filepath, encoding='utf-8') as f:
+                pid = int(f.read())
+
+            # NOTE: The pid may have been reused by another process since
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                if b'unoserver' not in f.read():
+                    return
+
+            os.killpg(pid, signal.SIGTERM)
+        except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+            pass
+
+    def start(self) -> None:
+        """Start unoserver and wait until it answers."""
+        self._kill_orphan_process()
+        os.makedirs(self.profile_directory, exist_ok=True)
+        args = [
+            self.executable,
+            '--port',
+            str(self.port),
+            '--uno-port',
+            str(self.port + 1),
+            '--user-installation',
+            os.path.abspath(self.profile_directory),
+            '--executable',
+            shutil.which(libreoffice_exec()) or libreoffice_exec(),
+            '--conversion-timeout',
+            str(self.timeout),
+        ]
+        # NOTE: The process has its own session, so it's stopped together with its soffice process
+        self._process = subprocess.Popen(  # pylint: disable=consider-using-with
+            args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+        )
+        with open(self._pid_filepath, 'w', encoding='utf-8') as f:
+            f.write(str(self._process.pid))
+
+        started_until = time.monotonic() + self.timeout
+
+        while time.monotonic() < started_until:
+            if not self.is_alive():
+                raise LibreOfficeCrashError(f'unoserver exited with code {self._process.returncode} on start')
+
+            try:
+                with self._get_server(timeout=1) as server:
+                    api_version = server.info()['api']
+            except (OSError, xmlrpc.client.Error):
+                time.sleep(0.5)
+                continue
+
+            if api_version != self.api_version:
+                self.stop()
+                raise LibreOfficeError(f'unoserver API {api_version} not supported, it must be {self.api_version}')
+
+            logger.info(f'LibreOffice started on port {self.port} with the profile {self.profile_directory}')
+            return
+
+        self.stop()
+        raise LibreOfficeCrashError(f'unoserver did not start after {self.timeout} seconds')
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+
+        try:
+            os.killpg(self._process.pid, signal.SIGTERM)
+            self._process.wait(timeout=10)
+        except ProcessLookupError:
+            pass
+        except subprocess.TimeoutExpired:
+            os.killpg(self._process.pid, signal.SIGKILL)
+            self._process.wait()
+
+        self._process = None
+
+        if os.path.exists(self._pid_filepath):
+            os.remove(self._pid_filepath)
+
+    def reset(self) -> None:
+        """Stop the process and delete its profile, the next conversion starts a new one."""
+        logger.warning(f'Resetting the LibreOffice instance of the profile {self.profile_directory}')
+        self.stop()
+        # NOTE: A crash can leave the profile locked or corrupted
+        shutil.rmtree(self.profile_directory, ignore_errors=True)
+
+    def convert(self, folder: str, source: str) -> str:
+        """Convert a document to PDF in the running soffice.
+
+        Parameters
+        ----------
+        folder : str
+            Directory where the PDF is saved.
+        source : str
+            Path of the document.
+
+        Returns
+        -------
+        str
+            Path of the PDF, named after the document.
+
+        Raises
+        ------
+        LibreOfficeCrashError
+            The process died or stopped answering.
+        LibreOfficeError
+            LibreOffice couldn't convert the document.
+
+        """
+        if not self.is_alive():
+            self.start()
+
+        filename, _ = os.path.splitext(os.path.basename(source))
+        output = os.path.abspath(f'{folder}/{filename}.pdf')
+
+        try:
+            # NOTE: unoserver answers when the conversion ends, it kills soffice after its conversion timeout
+            with self._get_server() as server:
+                server.convert(os.path.abspath(source), None, output, 'pdf', PDF_FILTER_NAME, [], True, None, None)
+        except xmlrpc.client.Fault as exc:
+            error_class = LibreOfficeError if self.is_alive() else LibreOfficeCrashError
+            raise error_class(f'LibreOffice failed converting {source}.\n{exc.faultString}') from exc
+        except (OSError, xmlrpc.client.Error) as exc:
+            raise LibreOfficeCrashError(f'LibreOffice stopped answering converting {source}') from exc
+
+        return output
+
+
+class LibreOfficePool:
+    """Pool of long-lived LibreOffice instances.
+
+    An instance converts one document at a time, every conversion is
+    handed to an idle instance and, if all of them are busy, the caller
+    waits until one is released. The instances are started by their first
+    conversion and kept running, an instance which crashes is reset and
+    the conversion is retried once with a new process and profile.
+
+    The instances are claimed by slot with a file lock, so the processes of
+    a Celery worker don't share them. The slot gives the profile directory
+    and the ports of the instance.
+
+    Parameters
+    ----------
+    size : int
+        Number of LibreOffice instances.
+    profiles_directory : str
+        Directory where the user profiles are kept.
+    timeout : int
+        Seconds to wait for an idle instance, for the start of an instance
+        or for a conversion.
+    port : int
+        First port of the instances, every instance uses two ports.
+    executable : str
+        Path of the `unoserver` executable.
+
+    """
+
+    def __init__(
+        self, size: int, profiles_directory: str, timeout: int = 120, port: int = 2003, executable: str = 'unoserver'
+    ):
+        self.size = size
+        self.profiles_directory = profiles_directory
+        self.timeout = timeout
+        self.port = port
+        self.executable = executable
+        self._instances = []
+        self._idle_instances = queue.Queue()
+        self._lock_files = []
+        self._lock = threading.Lock()
+
+    def _claim_slot(self) -> int:
+        os.makedirs(self.profiles_directory, exist_ok=True)
+        slot = 0
+
+        while True:
+            lock_file = open(  # pylint: disable=consider-using-with
+                os.path.join(self.profiles_directory, f'slot_{slot}.lock'), 'w', encoding='utf-8'
+            )
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                slot += 1
+                continue
+
+            self._lock_files.append(lock_file)
+            return slot
+
+    def _create_instance(self) -> LibreOfficeInstance:
+        slot = self._claim_slot()
+        return LibreOfficeInstance(
+            os.path.join(self.profiles_directory, f'slot_{slot}'),
+            port=self.port + 2 * slot,
+            timeout=self.timeout,
+            executable=self.executable,
+        )
+
+    def _get_idle_instance(self) -> LibreOfficeInstance:
+        with self._lock:
+            if self._idle_instances.empty() and len(self._instances) < self.size:
+                instance = self._create_instance()
+                self._instances.append(instance)
+                return instance
+
+        try:
+            return self._idle_instances.get(timeout=self.timeout)
+        except queue.Empty as exc:
+            raise LibreOfficeError(f'No idle LibreOffice instance after {self.timeout} seconds') from exc
+
+    def convert_to(self, folder: str, source: str) -> str:
+        """Convert a document to PDF.
+
+        Parameters
+        ----------
+        folder : str
+            Directory where the PDF is saved.
+        source : str
+            Path of the document.
+
+        Returns
+        -------
+        str
+            Path of the PDF.
+
+        """
+        _check_paths(folder, source)
+        instance = self._get_idle_instance()
+
+        try:
+            try:
+                return instance.convert(folder, source)
+            except LibreOfficeCrashError:
+                instance.reset()
+                return instance.convert(folder, source)
+        finally:
+            self._idle_instances.put(instance)
+
+    def convert_many(self, folder: str, sources: list[str]) -> dict[str, str | LibreOfficeError]:
+        """Convert several documents to PDF with the same instance.
+
+        A document which crashes LibreOffice only fails its own conversion,
+        the instance is restarted for the next documents.
+
+        Parameters
+        ----------
+        folder : str
+            Directory where the PDFs are saved.
+        sources : list[str]
+            Paths of the documents, their names must be unique.
+
+        Returns
+        -------
+        dict[str, str | LibreOfficeError]
+            Path of the PDF, or the error, of each document.
+
+        """
+        instance = self._get_idle_instance()
+        results = {}
+
+        try:
+            for source in sources:
+                try:
+                    results[source] = instance.convert(folder, source)
+                except LibreOfficeCrashError as exc:
+                    results[source] = exc
+                    instance.reset()
+                except LibreOfficeError as exc:
+                    results[source] = exc
+
+            return results
+        finally:
+            self._idle_instances.put(instance)
+
+    def close(self) -> None:
+        with self._lock:
+            for instance in self._instances:
+                instance.stop()
+
+            for lock_file in self._lock_files:
+                lock_file.close()
+
+            self._instances = []
+            self._lock_files = []
+            self._idle_instances = queue.Queue()
+
+
+class LibreOfficeBatchConverter:
+    """Convert the documents requested at the same time in one batch.
+
+    The first conversion requested waits `window` seconds, or until
+    `max_files` documents are pending, and every pending document is
+    converted by the same LibreOffice instance. Each caller gets the PDF of
+    its document or the error of its document, a caller which waited longer
+    than the window plus two pool timeouts (an idle instance and the
+    conversion) gets an error and its document is skipped if it's still
+    pending.
+
+    Notes
+    -----
+    The batches are collected per process, concurrent conversions of the
+    same process come from the threads of a Celery worker with a threads or
+    gevent pool, or from the threads of the web server.
+
+    Parameters
+    ----------
+    pool : LibreOfficePool
+        Pool which converts the batches.
+    window : float
+        Seconds to wait for more documents after the first one.
+    max_files : int
+        Max documents per batch.
+
+    """
+
+    def __init__(self, pool: LibreOfficePool, window: float, max_files: int):
+        self.pool = pool
+        self.window = window
+        self.max_files = max_files
+        self._pending_conversions = queue.Queue()
+        self._executor = None
+        self._collector = None
+        self._lock = threading.Lock()
+
+    def _ensure_collector(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix='libreoffice')
+
+            if self._collector is None or not self._collector.is_alive():
+                self._collector = threading.Thread(target=self._collect_batches, name='libreoffice-batch', daemon=True)
+                self._collector.start()
+
+    def _collect_batches(self) -> None:
+        while True:
+            batch = [self._pending_conversions.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_files:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                try:
+                    batch.append(self._pending_conversions.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._convert_batch, batch)
+
+    @staticmethod
+    def _group_batch(batch: list[tuple[str, str, Future]]) -> list[tuple[str, dict[str, Future]]]:
+        # NOTE: soffice has one output directory per invocation and names the
+        #       PDFs after the documents, so the groups need unique names.
+        groups = []
+
+        for folder, source, future in batch:
+            group = next(
+                (
+                    futures
+                    for group_folder, futures in groups
+                    if group_folder == folder
+                    and os.path.basename(source) not in {os.path.basename(path) for path in futures}
+                ),
+                None,
+            )
+            if group is None:
+                group = {}
+                groups.append((folder, group))
+            group[source] = future
+
+        return groups
+
+    def _convert_batch(self, batch: list[tuple[str, str, Future]]) -> None:
+        # NOTE: The conversions whose caller stopped waiting are cancelled, the others can't be cancelled anymore
+        batch = [conversion for conversion in batch if conversion[2].set_running_or_notify_cancel()]
+
+        for folder, futures in self._group_batch(batch):
+            try:
+                results = self.pool.convert_many(folder, list(futures))
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                results = dict.fromkeys(futures, exc)
+
+            for source, future in futures.items():
+                if isinstance(results[source], Exception):
+                    future.set_exception(results[source])
+                else:
+                    future.set_result(results[source])
+
+    def convert_to(self, folder: str, source: str) -> str:
+        """Convert a document to PDF in the next batch.
+
+        Parameters
+        ----------
+        folder : str
+            Directory where the PDF is saved.
+        source : str
+            Path of the document.
+
+        Returns
+        -------
+        str
+            Path of the PDF.
+
+        """
+        _check_paths(folder, source)
+
+        if self.window <= 0 or self.max_files <= 1:
+            return self.pool.convert_to(folder, source)
+
+        future = Future()
+        self._ensure_collector()
+        self._pending_conversions.put((folder, source, future))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FuturesTimeoutError as exc:
+            future.cancel()
+            raise LibreOfficeError(f'LibreOffice did not convert {source} after {self.timeout} seconds') from exc
+
+    @property
+    def timeout(self) -> float:
+        """Seconds a conversion waits for its batch: the window, an idle instance and the conversion."""
+        return self.window + 2 * self.pool.timeout
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_pool = None
+_pool_pid = None
+_batch_converter = None
+_pool_lock = threading.Lock()
+
+
+def get_libreoffice_pool() -> LibreOfficePool:
+    """Return the LibreOffice pool of the current process.
+
+    The pool is created on first use, a forked process (e.g. a Celery
+    worker process) creates its own pool.
+
+    """
+    global _pool, _pool_pid  # pylint: disable=global-statement
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = LibreOfficePool(
+                size=current_app.config['LIBREOFFICE_POOL_SIZE'],
+                profiles_directory=current_app.config['LIBREOFFICE_PROFILES_DIRECTORY'],
+                timeout=current_app.config['LIBREOFFICE_TIMEOUT'],
+                port=current_app.config['LIBREOFFICE_PORT'],
+                executable=current_app.config['LIBREOFFICE_UNOSERVER_EXEC'],
+            )
+            _pool_pid = os.getpid()
+            atexit.register(_pool.close)
+
+        return _pool
+
+
+def get_libreoffice_batch_converter() -> LibreOfficeBatchConverter:
+    """Return the batch converter of the current process."""
+    global _batch_converter  # pylint: disable=global-statement
+
+    pool = get_libreoffice_pool()
+
+    with _pool_lock:
+        if _batch_converter is None or _batch_converter.pool is not pool:
+            if _batch_converter is not None:
+                _batch_converter.close()
+
+            _batch_converter = LibreOfficeBatchConverter(
+                pool,
+                window=current_app.config['LIBREOFFICE_BATCH_WINDOW_MS'] / 1000,
+                max_files=current_app.config['LIBREOFFICE_BATCH_MAX_FILES'],
+            )
+
+        return _batch_converter
+
+
 if __name__ == '__main__':
     print('Converted to ' + convert_to(sys.argv[1], sys.argv[2]))  # noqa: T201
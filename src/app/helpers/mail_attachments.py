@@ -0,0 +1,104 @@
+"""Module for attaching files from disk to emails.
+
+`flask_mail.Message.attach` needs the whole content of the file, which is
+copied again while it is encoded in base64. The attachments of
+`FileAttachmentsMessage` are read from disk in chunks and only their
+base64 text is kept, so the raw content of a file isn't loaded in memory.
+
+The base64 text (about 4/3 of the size of the file) is still kept whole as
+the payload of its part, and the message is rendered again as a string
+when it's sent. The memory of an email grows with its attachments, it's
+bounded by `MAIL_ATTACHMENTS_MAX_SIZE`: the documents which don't fit are
+sent as a download link instead.
+
+"""
+
+import base64
+import io
+import zipfile
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+
+from flask_mail import Message
+
+from app.utils.constants import MS_EXCEL_MIME_TYPE, MS_WORD_MIME_TYPE
+
+ZIP_MIME_TYPE = 'application/zip'
+# NOTE: Compressing again these formats barely reduces their size
+COMPRESSED_MIME_TYPES = frozenset(
+    {
+        MS_EXCEL_MIME_TYPE,
+        MS_WORD_MIME_TYPE,
+        ZIP_MIME_TYPE,
+        'application/gzip',
+        'image/jpeg',
+        'image/png',
+    }
+)
+# NOTE: 57 bytes are encoded in a line of 76 characters, the maximum length of a base64 line.
+_ENCODE_CHUNK_SIZE = 57 * 1024
+
+
+def encode_file(filepath: str) -> str:
+    """Encode a file in base64 with lines of 76 characters, the file is read in chunks but the text is returned whole."""
+    output = io.StringIO()
+
+    with open(filepath, 'rb') as fp:
+        while chunk := fp.read(_ENCODE_CHUNK_SIZE):
+            output.write(base64.encodebytes(chunk).decode('ascii'))
+
+    return output.getvalue()
+
+
+def zip_file(filepath: str, arcname: str, dst: str) -> None:
+    """Compress a file in a new zip file."""
+    with zipfile.ZipFile(dst, 'w', compression=zipfile.ZIP_DEFLATED) as zip_fp:
+        zip_fp.write(filepath, arcname)
+
+
+class FileAttachmentsMessage(Message):
+    """Message with attachments which are encoded from disk."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_attachments = []
+
+    def attach_file(self, filepath: str, filename: str, content_type: str) -> None:
+        """Attach a file to the email.
+
+        The file is encoded when it is attached, so it can be deleted before
+        the email is sent.
+
+        """
+        part = MIMEBase(*content_type.split('/'))
+        part.set_payload(encode_file(filepath))
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        self.file_attachments.append(part)
+
+    def _message(self):
+        msg = super()._message()
+
+        if not self.file_attachments:
+            return msg
+
+        if not msg.is_multipart():
+            body, msg = msg, MIMEMultipart()
+            headers = [
+                (key, value)
+                for key, value in body.items()
+                if not key.lower().startswith('content-') and key.lower() != 'mime-version'
+            ]
+
+            for key, value in headers:
+                del body[key]
+                msg[key] = value
+
+            del body['MIME-Version']
+            msg.attach(body)
+            msg.policy = body.policy
+
+        for part in self.file_attachments:
+            msg.attach(part)
+
+        return msg
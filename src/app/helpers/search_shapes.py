@@ -0,0 +1,65 @@
+"""Module for recording the shapes of the search requests.
+
+A search shape is a search request without its values, for example:
+
+    {"order": [["created_at", "desc"], ["id", "asc"]], "search": [["name", "contains"]], "table": "users"}
+
+The shapes are appended as JSON lines to `SEARCH_SHAPES_FILE`, the
+`flask index-advisor` command replays them for suggesting indexes.
+
+"""
+
+import json
+import threading
+
+from flask import current_app
+
+from app.extensions import db
+from app.helpers.sqlalchemy_query_builder import KeysetClauseBuilder
+
+
+class SearchShapeRecorder:
+    def __init__(self):
+        self._recorded_shapes = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_shape(db_model: type[db.Model], request_data: dict) -> dict:
+        return {
+            'table': db_model.__tablename__,
+            'search': [
+                [criteria['field_name'], criteria['field_operator']] for criteria in request_data.get('search', [])
+            ],
+            'order': [list(sort_key) for sort_key in KeysetClauseBuilder.get_sort_keys(request_data, db_model)],
+        }
+
+    def record(self, db_model: type[db.Model], request_data: dict) -> None:
+        filepath = current_app.config.get('SEARCH_SHAPES_FILE')
+        if not filepath:
+            return
+
+        line = json.dumps(self.get_shape(db_model, request_data), sort_keys=True)
+
+        with self._lock:
+            if line in self._recorded_shapes:
+                return
+
+            with open(filepath, 'a', encoding='utf-8') as fp:
+                fp.write(f'{line}\n')
+
+            self._recorded_shapes.add(line)
+
+    @staticmethod
+    def read(filepath: str) -> list[dict]:
+        shapes = {}
+
+        with open(filepath, encoding='utf-8') as fp:
+            for line in fp:
+                if line.strip():
+                    shape = json.loads(line)
+                    shapes[json.dumps(shape, sort_keys=True)] = shape
+
+        return list(shapes.values())
+
+
+search_shape_recorder = SearchShapeRecorder()
@@ -17,13 +17,27 @@ References
 ----------
 Query operators: https://docs.sqlalchemy.org/en/20/core/operators.html
 Comparison Operators: https://docs.sqlalchemy.org/en/20/core/operators.html#comparison-operators
+Keyset pagination: https://use-the-index-luke.com/no-offset
+SQL compilation caching: https://docs.sqlalchemy.org/en/20/core/connections.html#sql-compilation-caching
+MySQL full-text search: https://dev.mysql.com/doc/refman/8.0/en/fulltext-boolean.html
 
 """
 
+import base64
+import binascii
+import enum
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
 import sqlalchemy as sa
 from flask_sqlalchemy.query import Query as FlaskQuery
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.visitors import InternalTraversal
 
 from app.extensions import db
+from config import Config
 
 REQUEST_QUERY_DELIMITER = ';'
 
@@ -36,6 +50,7 @@ CONTAINS_OP = 'contains'
 NOT_CONTAINS_OP = 'ncontains'
 STARTS_WITH_OP = 'startswith'
 ENDS_WITH_OP = 'endswith'
+MATCH_OP = 'match'
 
 STRING_QUERY_OPERATORS = {
     EQUAL_OP,
@@ -44,6 +59,7 @@ STRING_QUERY_OPERATORS = {
     NOT_CONTAINS_OP,
     STARTS_WITH_OP,
     ENDS_WITH_OP,
+    MATCH_OP,
 }
 
 # No-String query operators
@@ -69,6 +85,82 @@ QUERY_OPERATORS = {
 
 ALL_OPERATORS = STRING_QUERY_OPERATORS | QUERY_OPERATORS
 
+# Sorting
+ASC_SORTING = 'asc'
+DESC_SORTING = 'desc'
+DEFAULT_ORDER = [{'field_name': 'id', 'sorting': ASC_SORTING}]
+
+
+class _BooleanModePhrase(sa.TypeDecorator):
+    """Search value of a full-text match in boolean mode, bound as a phrase.
+
+    The operators of the boolean mode (e.g. `@`, `*`, `+`, `-`, `(`) have no
+    meaning inside a phrase, so the value is searched as it's typed. Its
+    double quotes are replaced by spaces, as they would end the phrase.
+
+    """
+
+    impl = sa.String
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: sa.Dialect) -> str | None:
+        if value is None:
+            return None
+        return '"{}"'.format(value.replace('"', ' '))
+
+
+class FullTextMatch(sa.ColumnElement):
+    """Full-text search clause.
+
+    It's compiled as `MATCH (field) AGAINST ("value" IN BOOLEAN MODE)` on
+    MySQL if the field has a FULLTEXT index, otherwise it falls back to
+    `field LIKE '%value%'`, e.g. SQLite test databases or fields without a
+    FULLTEXT index. The value is matched as a phrase, so the words are found
+    together and in order as in the substring match of the fallback.
+
+    """
+
+    inherit_cache = True
+    type = sa.Boolean()
+    _is_implicitly_boolean = True
+    _traverse_internals = [
+        ('match_clause', InternalTraversal.dp_clauseelement),
+        ('like_clause', InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, field: sa.orm.InstrumentedAttribute, field_value: str | sa.BindParameter):
+        self.match_clause = field.match(self._as_phrase(field_value))
+        self.like_clause = field.contains(field_value)
+        self.has_fulltext_index = self._has_fulltext_index(field)
+
+    @staticmethod
+    def _as_phrase(field_value: str | sa.BindParameter) -> sa.BindParameter:
+        # NOTE: Only one of the clauses is compiled, so the phrase shares the name of the bind of the LIKE clause
+        if isinstance(field_value, sa.BindParameter):
+            return sa.bindparam(
+                field_value.key, field_value.value, type_=_BooleanModePhrase(), unique=field_value.unique
+            )
+        return sa.literal(field_value, _BooleanModePhrase())
+
+    @staticmethod
+    def _has_fulltext_index(field: sa.orm.InstrumentedAttribute) -> bool:
+        column = field.property.columns[0]
+        return any(
+            index.kwargs.get('mysql_prefix') == 'FULLTEXT' and [c.name for c in index.columns] == [column.name]
+            for index in column.table.indexes
+        )
+
+
+@compiles(FullTextMatch)
+def _compile_full_text_match(element: FullTextMatch, compiler: sa.sql.compiler.SQLCompiler, **kwargs) -> str:
+    return compiler.process(element.like_clause, **kwargs)
+
+
+@compiles(FullTextMatch, 'mysql')
+def _compile_mysql_full_text_match(element: FullTextMatch, compiler: sa.sql.compiler.SQLCompiler, **kwargs) -> str:
+    clause = element.match_clause if element.has_fulltext_index else element.like_clause
+    return compiler.process(clause, **kwargs)
+
 
 class OrderByClauseBuilder:
     @staticmethod
@@ -93,7 +185,7 @@ class OrderByClauseBuilder:
 
         """
         order_by_values = []
-        request_order = request_data.get('order', [{'field_name': 'id', 'sorting': 'asc'}])
+        request_order = request_data.get('order', DEFAULT_ORDER)
 
         for item in request_order:
             field_name = item.get('field_name')
@@ -109,15 +201,155 @@ class OrderByClauseBuilder:
         return order_by_values
 
 
+class KeysetClauseBuilder:
+    """Build keyset (cursor) pagination clauses.
+
+    A cursor is an opaque URL-safe string which encodes the sort keys of
+    the request plus the values of the last row returned, for example:
+
+        Request order:
+            [{'field_name': 'name', 'sorting': 'asc'}]
+
+        Cursor payload:
+            {'keys': [['name', 'asc'], ['id', 'asc']], 'values': ['John', 42]}
+
+    The next page is fetched with `(name, id) > ('John', 42)` instead of an
+    `OFFSET`, so every page costs the same whatever its position.
+
+    Notes
+    -----
+    The primary key is always appended as the last sort key for making the
+    ordering deterministic. NULL values are handled following the MySQL
+    semantic, NULL values are sorted first with ascending order.
+
+    """
+
+    @staticmethod
+    def get_sort_keys(request_data: dict, db_model: type[db.Model] = None) -> list[tuple[str, str]]:
+        sort_keys = []
+
+        for item in request_data.get('order') or DEFAULT_ORDER:
+            field_name = item.get('field_name')
+
+            if db_model is not None and getattr(db_model, field_name, None) is None:
+                continue
+
+            sort_keys.append((field_name, item.get('sorting', ASC_SORTING)))
+
+        if 'id' not in {field_name for field_name, _ in sort_keys}:
+            sort_keys.append(('id', ASC_SORTING))
+
+        return sort_keys
+
+    @staticmethod
+    def build_order_by(db_model: type[db.Model], sort_keys: list[tuple[str, str]]) -> list[sa.UnaryExpression]:
+        return [
+            getattr(db_model, field_name).desc() if sorting == DESC_SORTING else getattr(db_model, field_name).asc()
+            for field_name, sorting in sort_keys
+        ]
+
+    @staticmethod
+    def _serialize_value(value: any) -> any:
+        if isinstance(value, date | datetime):
+            return value.isoformat()
+        elif isinstance(value, enum.Enum):
+            return value.value
+        return value
+
+    @staticmethod
+    def _deserialize_value(field: sa.orm.InstrumentedAttribute, value: any) -> any:
+        if value is None:
+            return None
+
+        try:
+            python_type = field.type.python_type
+        except NotImplementedError:
+            return value
+
+        if issubclass(python_type, datetime):
+            return datetime.fromisoformat(value)
+        elif issubclass(python_type, date):
+            return date.fromisoformat(value)
+        elif issubclass(python_type, enum.Enum):
+            return python_type(value)
+        return value
+
+    def encode_cursor(self, record: db.Model, sort_keys: list[tuple[str, str]]) -> str:
+        payload = {
+            'keys': [list(sort_key) for sort_key in sort_keys],
+            'values': [self._serialize_value(getattr(record, field_name)) for field_name, _ in sort_keys],
+        }
+        raw_cursor = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw_cursor).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> dict:
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(f'{cursor}{padding}'))
+            keys = [tuple(sort_key) for sort_key in payload['keys']]
+            values = payload['values']
+        except (binascii.Error, json.JSONDecodeError, KeyError, TypeError, UnicodeDecodeError, ValueError) as exc:
+            raise ValueError('Invalid cursor') from exc
+
+        if len(keys) != len(values):
+            raise ValueError('Invalid cursor')
+
+        return {'keys': keys, 'values': values}
+
+    @staticmethod
+    def _is_after(field: sa.orm.InstrumentedAttribute, value: any, sorting: str) -> sa.ColumnElement:
+        if sorting == DESC_SORTING:
+            return sa.false() if value is None else sa.or_(field < value, field.is_(None))
+        return field.is_not(None) if value is None else field > value
+
+    @staticmethod
+    def _is_equal(field: sa.orm.InstrumentedAttribute, value: any) -> sa.ColumnElement:
+        return field.is_(None) if value is None else field == value
+
+    def build_clause(self, db_model: type[db.Model], cursor: str, sort_keys: list[tuple[str, str]]) -> sa.ColumnElement:
+        """Build the clause that selects the rows placed after the cursor.
+
+        Example
+        -------
+        Sort keys (name asc, id asc) and cursor values ('John', 42):
+            name > 'John' OR (name = 'John' AND id > 42)
+
+        """
+        decoded_cursor = self.decode_cursor(cursor)
+
+        if decoded_cursor['keys'] != sort_keys:
+            raise ValueError("Cursor doesn't match the requested order")
+
+        fields = [getattr(db_model, field_name) for field_name, _ in sort_keys]
+        values = [
+            self._deserialize_value(field, value) for field, value in zip(fields, decoded_cursor['values'], strict=True)
+        ]
+
+        clauses = []
+        for i, (_, sorting) in enumerate(sort_keys):
+            previous_keys_are_equal = [self._is_equal(fields[j], values[j]) for j in range(i)]
+            clauses.append(sa.and_(*previous_keys_are_equal, self._is_after(fields[i], values[i], sorting)))
+
+        return sa.or_(*clauses)
+
+
 class StringQueryClauseBuilder:
     def __init__(self):
-        self._operator_map = {
+        self._bound_operator_map = {
             'eq': self._eq,
             'ne': self._ne,
-            'contains': self._contains,
-            'ncontains': self._ncontains,
-            'startswith': self._startswith,
-            'endswith': self._endswith,
+            'contains': self._like,
+            'ncontains': self._not_like,
+            'startswith': self._like,
+            'endswith': self._like,
+            'match': self._match,
+        }
+        self._like_patterns = {
+            'contains': '%{}%',
+            'ncontains': '%{}%',
+            'startswith': '{}%',
+            'endswith': '%{}',
         }
 
     @staticmethod
@@ -129,53 +361,48 @@ class StringQueryClauseBuilder:
         return field != field_value
 
     @staticmethod
-    def _contains(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return field.like(f'%{field_value}%')
+    def _match(field: sa.orm.InstrumentedAttribute, field_value: str | sa.BindParameter) -> FullTextMatch:
+        return FullTextMatch(field, field_value)
 
     @staticmethod
-    def _ncontains(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return ~field.like(f'%{field_value}%')
+    def _like(field: sa.orm.InstrumentedAttribute, pattern: sa.BindParameter) -> sa.BinaryExpression:
+        return field.like(pattern)
 
     @staticmethod
-    def _startswith(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return field.like(f'{field_value}%')
-
-    @staticmethod
-    def _endswith(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return field.like(f'%{field_value}')
-
-    def build_clause(
-        self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: str
-    ) -> sa.BinaryExpression:
-        if field_operator not in self._operator_map:
-            raise ValueError(f'Unsupported operator: {field_operator}')
-
-        return self._operator_map[field_operator](field, field_value)
+    def _not_like(field: sa.orm.InstrumentedAttribute, pattern: sa.BindParameter) -> sa.BinaryExpression:
+        return ~field.like(pattern)
 
-    def build_clause_with_multiple_values(
-        self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: str
-    ) -> sa.BinaryExpression:
-        if REQUEST_QUERY_DELIMITER in field_value:
+    def get_bind_values(self, field_operator: str, field_value: str) -> list:
+        if isinstance(field_value, str) and REQUEST_QUERY_DELIMITER in field_value:
             values = field_value.split(REQUEST_QUERY_DELIMITER)
-            sql_clause = sa.or_(*(self.build_clause(field, field_operator, value) for value in values))
         else:
-            sql_clause = self.build_clause(field, field_operator, field_value)
+            values = [field_value]
+
+        pattern = self._like_patterns.get(field_operator)
+        return [pattern.format(value) for value in values] if pattern else values
 
-        return sql_clause
+    def build_bound_clause(
+        self, field: sa.orm.InstrumentedAttribute, field_operator: str, bind_params: list[sa.BindParameter]
+    ) -> sa.ColumnElement:
+        if field_operator not in self._bound_operator_map:
+            raise ValueError(f'Unsupported operator: {field_operator}')
+
+        clauses = [self._bound_operator_map[field_operator](field, bind_param) for bind_param in bind_params]
+        return sa.or_(*clauses) if len(clauses) > 1 else clauses[0]
 
 
 class ComparisonClauseBuilder:
     def __init__(self):
-        self._operator_map = {
+        self._bound_operator_map = {
             'eq': self._eq,
             'ne': self._ne,
             'lt': self._lt,
             'lte': self._lte,
             'gt': self._gt,
             'gte': self._gte,
-            'in': self._in,
-            'nin': self._nin,
-            'between': self._between,
+            'in': self._in_values,
+            'nin': self._nin_values,
+            'between': self._between_values,
         }
 
     @staticmethod
@@ -203,40 +430,41 @@ class ComparisonClauseBuilder:
         return field >= field_value
 
     @staticmethod
-    def _in(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return field.in_(field_value.split(REQUEST_QUERY_DELIMITER))
+    def _in_values(field: sa.orm.InstrumentedAttribute, values: sa.BindParameter) -> sa.BinaryExpression:
+        return field.in_(values)
 
     @staticmethod
-    def _nin(field: sa.orm.InstrumentedAttribute, field_value: str) -> sa.BinaryExpression:
-        return ~field.in_(field_value.split(REQUEST_QUERY_DELIMITER))
+    def _nin_values(field: sa.orm.InstrumentedAttribute, values: sa.BindParameter) -> sa.BinaryExpression:
+        return ~field.in_(values)
 
     @staticmethod
-    def _between(field: sa.orm.InstrumentedAttribute, field_value: any) -> sa.BinaryExpression:
-        values = field_value.split(REQUEST_QUERY_DELIMITER)
-        return field.between(values[0], values[1])
-
-    def build_clause(
-        self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: any
+    def _between_values(
+        field: sa.orm.InstrumentedAttribute, lower_value: sa.BindParameter, upper_value: sa.BindParameter
     ) -> sa.BinaryExpression:
-        if field_operator not in self._operator_map:
+        return field.between(lower_value, upper_value)
+
+    def get_bind_values(self, field_operator: str, field_value: any) -> list:
+        # NOTE: The values of in, nin and between are a delimited string or a list of values
+        if field_operator in [IN_OP, NOT_IN_OP]:
+            return [field_value if isinstance(field_value, list) else field_value.split(REQUEST_QUERY_DELIMITER)]
+        elif field_operator == BETWEEN_OP:
+            values = field_value if isinstance(field_value, list) else field_value.split(REQUEST_QUERY_DELIMITER)
+            return [values[0], values[1]]
+        elif isinstance(field_value, str) and REQUEST_QUERY_DELIMITER in field_value:
+            return field_value.split(REQUEST_QUERY_DELIMITER)
+        return [field_value]
+
+    def build_bound_clause(
+        self, field: sa.orm.InstrumentedAttribute, field_operator: str, bind_params: list[sa.BindParameter]
+    ) -> sa.ColumnElement:
+        if field_operator not in self._bound_operator_map:
             raise ValueError(f'Unsupported operator: {field_operator}')
 
-        return self._operator_map[field_operator](field, field_value)
+        if field_operator == BETWEEN_OP:
+            return self._between_values(field, *bind_params)
 
-    def build_clause_with_multiple_values(
-        self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: any
-    ) -> sa.BinaryExpression:
-        if (
-            isinstance(field_value, str)
-            and REQUEST_QUERY_DELIMITER in field_value
-            and field_operator not in [BETWEEN_OP, IN_OP, NOT_IN_OP]
-        ):
-            values = field_value.split(REQUEST_QUERY_DELIMITER)
-            sql_clause = sa.or_(*(self.build_clause(field, field_operator, value) for value in values))
-        else:
-            sql_clause = self.build_clause(field, field_operator, field_value)
-
-        return sql_clause
+        clauses = [self._bound_operator_map[field_operator](field, bind_param) for bind_param in bind_params]
+        return sa.or_(*clauses) if len(clauses) > 1 else clauses[0]
 
 
 class QueryClauseBuilder:
@@ -244,30 +472,109 @@ class QueryClauseBuilder:
         self.string_clause_helper = StringQueryClauseBuilder()
         self.operator_clause_helper = ComparisonClauseBuilder()
 
-    def build_sql_expression(
-        self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: any
-    ) -> sa.sql.expression.ClauseElement:
+    def _get_clause_helper(
+        self, field: sa.orm.InstrumentedAttribute
+    ) -> StringQueryClauseBuilder | ComparisonClauseBuilder:
         if isinstance(field.type, (sa.String | sa.Text | sa.UUID)):
-            sql_clause = self.string_clause_helper.build_clause_with_multiple_values(field, field_operator, field_value)
-        else:
-            sql_clause = self.operator_clause_helper.build_clause_with_multiple_values(
-                field, field_operator, field_value
-            )
+            return self.string_clause_helper
+        return self.operator_clause_helper
+
+    def get_bind_values(self, field: sa.orm.InstrumentedAttribute, field_operator: str, field_value: any) -> list:
+        """Split a request value into the values bound to a search clause."""
+        return self._get_clause_helper(field).get_bind_values(field_operator, field_value)
+
+    def build_bound_sql_expression(
+        self, field: sa.orm.InstrumentedAttribute, field_operator: str, bind_params: list[sa.BindParameter]
+    ) -> sa.ColumnElement:
+        """Build a search clause with bind parameters instead of values."""
+        return self._get_clause_helper(field).build_bound_clause(field, field_operator, bind_params)
+
+
+class SearchShapeCache:
+    """LRU cache of SQL expressions keyed by search shape.
+
+    A search shape is everything of a search request except its values:
+    model, field names, operators, number of values and sorting. Requests
+    with the same shape share the same expression objects, so they skip the
+    expression construction and hit the SQLAlchemy compiled cache, only the
+    bind parameters change.
+
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: tuple, factory: callable) -> any:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+            self.misses += 1
+
+        value = factory()
 
-        return sql_clause
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def cache_info(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'maxsize': self.maxsize,
+                'currsize': len(self._entries),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+search_shape_cache = SearchShapeCache(maxsize=Config.SEARCH_SHAPE_CACHE_SIZE)
 
 
 class SQLAlchemyQueryBuilder:
-    def __init__(self, query_helper: QueryClauseBuilder = None, ordering_helper: OrderByClauseBuilder = None):
+    def __init__(
+        self,
+        query_helper: QueryClauseBuilder = None,
+        ordering_helper: OrderByClauseBuilder = None,
+        keyset_helper: KeysetClauseBuilder = None,
+        shape_cache: SearchShapeCache = None,
+    ):
         self.query_helper = query_helper or QueryClauseBuilder()
         self.ordering_helper = ordering_helper or OrderByClauseBuilder()
+        self.keyset_helper = keyset_helper or KeysetClauseBuilder()
+        self.shape_cache = search_shape_cache if shape_cache is None else shape_cache
 
     def create_search_query(self, db_model: type[db.Model], query: FlaskQuery, data: dict = None) -> FlaskQuery:
+        """Filter a query with the search criteria of a request.
+
+        The criteria are turned into a clause with named bind parameters,
+        e.g. `name LIKE :search_0_0`, which is cached by search shape. The
+        request values are bound with `Query.params`.
+
+        """
         if data is None:
             data = {}
 
         search_criteria = data.get('search', {})
-        sql_expressions = []
+        search_shape = []
+        bind_values = {}
 
         for criteria in search_criteria:
             field_name = criteria.get('field_name')
@@ -281,14 +588,48 @@ class SQLAlchemyQueryBuilder:
             if isinstance(field_value, str) and not field_value.strip():
                 continue
 
-            sql_expression = self.query_helper.build_sql_expression(field, criteria['field_operator'], field_value)
-            sql_expressions.append(sql_expression)
+            field_operator = criteria['field_operator']
+            values = self.query_helper.get_bind_values(field, field_operator, field_value)
+            param_names = tuple(f'search_{len(search_shape)}_{i}' for i in range(len(values)))
+            value_types = tuple(self._get_value_type(value) for value in values)
 
-        if sql_expressions:
-            query = query.where(*sql_expressions)
+            search_shape.append((field_name, field_operator, param_names, value_types))
+            bind_values.update(zip(param_names, values, strict=True))
+
+        if search_shape:
+            search_clause = self.shape_cache.get_or_create(
+                ('search', db_model, tuple(search_shape)),
+                lambda: self._build_search_clause(db_model, search_shape, bind_values),
+            )
+            query = query.where(search_clause).params(**bind_values)
 
         return query
 
+    @staticmethod
+    def _get_value_type(value: any) -> tuple[bool, type]:
+        if isinstance(value, list):
+            return True, type(value[0]) if value else None
+        return False, type(value)
+
+    @staticmethod
+    def _create_bind_param(field: sa.orm.InstrumentedAttribute, name: str, value: any) -> sa.BindParameter:
+        # NOTE: The bind has the type of the column, as SQLAlchemy coerces the
+        # literal values compared with a column, e.g. '2020-01-01' is bound as
+        # a date if the column is a date.
+        return sa.bindparam(name, type_=field.type, expanding=isinstance(value, list))
+
+    def _build_search_clause(
+        self, db_model: type[db.Model], search_shape: list[tuple], bind_values: dict
+    ) -> sa.ColumnElement:
+        sql_expressions = []
+
+        for field_name, field_operator, param_names, _ in search_shape:
+            field = getattr(db_model, field_name)
+            bind_params = [self._create_bind_param(field, name, bind_values[name]) for name in param_names]
+            sql_expressions.append(self.query_helper.build_bound_sql_expression(field, field_operator, bind_params))
+
+        return sa.and_(*sql_expressions)
+
     def get_request_query_fields(
         self, db_model: type[db.Model], request_data=None
     ) -> tuple[int, int, list[sa.UnaryExpression]]:
@@ -299,3 +640,43 @@ class SQLAlchemyQueryBuilder:
         order_by = self.ordering_helper.build_order_by(db_model, request_data)
 
         return page_number, items_per_page, order_by
+
+    def paginate_query(
+        self, db_model: type[db.Model], query: FlaskQuery, request_data: dict = None, lookahead: int = 0
+    ) -> FlaskQuery:
+        """Sort and limit a search query.
+
+        The query is paginated with a keyset clause if the request has an
+        `after` cursor, otherwise `page_number` is translated into an OFFSET.
+
+        `lookahead` extra rows are fetched after the page, they tell if there
+        are more records without counting them.
+
+        """
+        request_data = request_data or {}
+        page_number, items_per_page, _ = self.get_request_query_fields(db_model, request_data)
+        sort_keys = self.keyset_helper.get_sort_keys(request_data, db_model)
+        cursor = request_data.get('after')
+
+        order_by = self.shape_cache.get_or_create(
+            ('order', db_model, tuple(sort_keys)),
+            lambda: self.keyset_helper.build_order_by(db_model, sort_keys),
+        )
+        query = query.order_by(*order_by)
+
+        if cursor:
+            query = query.where(self.keyset_helper.build_clause(db_model, cursor, sort_keys))
+        else:
+            query = query.offset(page_number * items_per_page)
+
+        return query.limit(items_per_page + lookahead)
+
+    def get_next_cursor(self, db_model: type[db.Model], records: list, request_data: dict = None) -> str | None:
+        request_data = request_data or {}
+        _, items_per_page, _ = self.get_request_query_fields(db_model, request_data)
+
+        if not records or len(records) < items_per_page:
+            return None
+
+        sort_keys = self.keyset_helper.get_sort_keys(request_data, db_model)
+        return self.keyset_helper.encode_cursor(records[-1], sort_keys)
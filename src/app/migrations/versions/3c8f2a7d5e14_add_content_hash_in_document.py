@@ -0,0 +1,33 @@
+"""Add content hash in Document
+
+Revision ID: 3c8f2a7d5e14
+Revises: 9d3e4a6b2c71
+Create Date: 2026-10-18 15:21:09.648213
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c8f2a7d5e14'
+down_revision = '9d3e4a6b2c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        # NOTE: The documents stored by content share the blob of their content
+        batch_op.drop_constraint(batch_op.f('internal_filename'), type_='unique')
+        batch_op.create_index('ix_documents_internal_filename', ['internal_filename'], unique=False)
+        batch_op.create_index('ix_documents_content_hash', ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_content_hash')
+        batch_op.drop_index('ix_documents_internal_filename')
+        batch_op.create_unique_constraint(batch_op.f('internal_filename'), ['internal_filename'])
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,35 @@
+"""Add FULLTEXT indexes for the match search operator
+
+Revision ID: 5b1f0c7e9a2d
+Revises: 0869ce9d86de
+Create Date: 2026-10-18 10:12:31.517204
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5b1f0c7e9a2d'
+down_revision = '0869ce9d86de'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_name_fulltext', ['name'], unique=False, mysql_prefix='FULLTEXT')
+        batch_op.create_index('ix_users_last_name_fulltext', ['last_name'], unique=False, mysql_prefix='FULLTEXT')
+        batch_op.create_index('ix_users_email_fulltext', ['email'], unique=False, mysql_prefix='FULLTEXT')
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index('ix_documents_name_fulltext', ['name'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_name_fulltext')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_email_fulltext')
+        batch_op.drop_index('ix_users_last_name_fulltext')
+        batch_op.drop_index('ix_users_name_fulltext')
@@ -0,0 +1,45 @@
+"""Add indexes for the searchable and sortable columns
+
+Revision ID: 9d3e4a6b2c71
+Revises: 5b1f0c7e9a2d
+Create Date: 2026-10-18 11:02:47.204391
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9d3e4a6b2c71'
+down_revision = '5b1f0c7e9a2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.create_index('ix_roles_deleted_at_created_at', ['deleted_at', 'created_at'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_deleted_at_created_at', ['deleted_at', 'created_at'], unique=False)
+        batch_op.create_index('ix_users_birth_date', ['birth_date'], unique=False)
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index('ix_documents_deleted_at_created_at', ['deleted_at', 'created_at'], unique=False)
+        batch_op.create_index('ix_documents_created_by_deleted_at', ['created_by', 'deleted_at'], unique=False)
+        batch_op.create_index('ix_documents_storage_type', ['storage_type'], unique=False)
+        batch_op.create_index('ix_documents_mime_type', ['mime_type'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_mime_type')
+        batch_op.drop_index('ix_documents_storage_type')
+        batch_op.drop_index('ix_documents_created_by_deleted_at')
+        batch_op.drop_index('ix_documents_deleted_at_created_at')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_birth_date')
+        batch_op.drop_index('ix_users_deleted_at_created_at')
+
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.drop_index('ix_roles_deleted_at_created_at')
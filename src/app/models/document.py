@@ -17,6 +17,15 @@ class StorageTypes(BaseEnum):
 
 class Document(Base):
     __tablename__ = 'documents'
+    __table_args__ = (
+        sa.Index('ix_documents_name_fulltext', 'name', mysql_prefix='FULLTEXT'),
+        sa.Index('ix_documents_deleted_at_created_at', 'deleted_at', 'created_at'),
+        sa.Index('ix_documents_created_by_deleted_at', 'created_by', 'deleted_at'),
+        sa.Index('ix_documents_storage_type', 'storage_type'),
+        sa.Index('ix_documents_mime_type', 'mime_type'),
+        sa.Index('ix_documents_internal_filename', 'internal_filename'),
+        sa.Index('ix_documents_content_hash', 'content_hash'),
+    )
 
     created_by = sa.Column(sa.Integer, sa.ForeignKey('users.id'), nullable=True)
     created_by_user = relationship(User, backref='documents')
@@ -29,8 +38,10 @@ class Document(Base):
     storage_id = sa.Column(sa.String(255), nullable=True)
 
     # Local-only fields (still used if storage_type == LOCAL)
-    internal_filename = sa.Column(sa.String(255), nullable=True, unique=True)
+    # NOTE: The documents stored by content share the blob of their content, so the internal filename isn't unique
+    internal_filename = sa.Column(sa.String(255), nullable=True)
     directory_path = sa.Column(sa.String(255), nullable=True)
+    content_hash = sa.Column(sa.String(64), nullable=True)
 
     @property
     def url(self) -> str | None:
@@ -18,6 +18,7 @@ ROLES = {ADMIN_ROLE, TEAM_LEADER_ROLE, WORKER_ROLE}
 
 class Role(Base, RoleMixin):
     __tablename__ = 'roles'
+    __table_args__ = (sa.Index('ix_roles_deleted_at_created_at', 'deleted_at', 'created_at'),)
 
     name = sa.Column(sa.String(255), nullable=False, unique=True)
     description = sa.Column(sa.Text, nullable=True)
@@ -32,6 +32,13 @@ class User(Base, UserMixin):
     """
 
     __tablename__ = 'users'
+    __table_args__ = (
+        sa.Index('ix_users_name_fulltext', 'name', mysql_prefix='FULLTEXT'),
+        sa.Index('ix_users_last_name_fulltext', 'last_name', mysql_prefix='FULLTEXT'),
+        sa.Index('ix_users_email_fulltext', 'email', mysql_prefix='FULLTEXT'),
+        sa.Index('ix_users_deleted_at_created_at', 'deleted_at', 'created_at'),
+        sa.Index('ix_users_birth_date', 'birth_date'),
+    )
 
     fs_uniquifier = sa.Column(sa.String(64), unique=True, nullable=False, default=uuid.uuid4())
     created_by = sa.Column(sa.Integer, sa.ForeignKey('users.id'), nullable=True)
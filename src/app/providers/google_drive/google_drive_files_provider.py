@@ -1,13 +1,21 @@
 import io
+from collections.abc import Iterator
 from typing import IO
 
 from google.oauth2 import service_account
+from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
 
 from app.decorators.handle_gdrive_errors import handle_gdrive_errors
 from app.providers.google_drive._google_drive_base_provider import _GoogleDriveBaseProvider
 from app.utils.constants import FOLDER_MIME_TYPE
 
+# NOTE: A resumable upload sends the stream in chunks of this size (a multiple of 256 KiB), a simple upload
+#       would read the whole stream in memory.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# NOTE: A streamed download requests the file in chunks of this size, every chunk is a request to Google Drive
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 # pylint: disable=no-member
 class GoogleDriveFilesProvider(_GoogleDriveBaseProvider):
@@ -69,7 +77,9 @@ class GoogleDriveFilesProvider(_GoogleDriveBaseProvider):
             file_metadata['parents'] = [parent_id]
 
         return self.service.create(
-            body=file_metadata, media_body=MediaIoBaseUpload(file_stream, mimetype=mime_type), fields=fields
+            body=file_metadata,
+            media_body=MediaIoBaseUpload(file_stream, mimetype=mime_type, chunksize=UPLOAD_CHUNK_SIZE, resumable=True),
+            fields=fields,
         ).execute()
 
     @handle_gdrive_errors()
@@ -104,7 +114,7 @@ class GoogleDriveFilesProvider(_GoogleDriveBaseProvider):
         return self.service.update(
             fileId=file_id,
             body=file_metadata,
-            media_body=MediaIoBaseUpload(file_stream, mimetype=mime_type),
+            media_body=MediaIoBaseUpload(file_stream, mimetype=mime_type, chunksize=UPLOAD_CHUNK_SIZE, resumable=True),
             fields=fields,
         ).execute()
 
@@ -138,3 +148,72 @@ class GoogleDriveFilesProvider(_GoogleDriveBaseProvider):
 
         fh.seek(0)
         return fh
+
+    @handle_gdrive_errors()
+    def stream_file_content(
+        self, file_id: str, chunk_size: int = None, start: int = 0, end: int = None
+    ) -> Iterator[bytes]:
+        """Download the content of a file in chunks, every chunk is yielded once it's received.
+
+        Unlike `download_file_content` the file isn't kept in memory, only
+        the chunk which is being sent.
+
+        Parameters
+        ----------
+        file_id : str
+            Id of the file.
+        chunk_size : int
+            Bytes requested to Google Drive at once.
+        start : int
+            First byte of the content.
+        end : int
+            Last byte of the content (inclusive), by default the end of the file.
+
+        Yields
+        ------
+        bytes
+            Chunk of the content.
+
+        """
+        chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+        request = self.service.get_media(fileId=file_id)
+        uri = request.uri
+        headers = {
+            key: value
+            for key, value in request.headers.items()
+            if key.lower() not in ('accept', 'accept-encoding', 'user-agent')
+        }
+        offset = start
+
+        while end is None or offset <= end:
+            chunk_end = offset + chunk_size - 1 if end is None else min(offset + chunk_size - 1, end)
+            response, content = request.http.request(
+                uri, 'GET', headers={**headers, 'range': f'bytes={offset}-{chunk_end}'}
+            )
+
+            # NOTE: 416 is Range Not Satisfiable, the file is empty or shorter than the start of the range
+            if response.status == 416:
+                return
+
+            if response.status not in (200, 206):
+                raise HttpError(response, content, uri=uri)
+
+            if response.status == 200:
+                # NOTE: The range was ignored, the response has the whole file
+                content = content[offset:] if end is None else content[offset : end + 1]
+
+                if content:
+                    yield content
+
+                return
+
+            if not content:
+                return
+
+            uri = response.get('content-location', uri)
+            yield content
+            offset += len(content)
+
+            if 'content-range' in response:
+                total_size = int(response['content-range'].rsplit('/', 1)[1])
+                end = total_size - 1 if end is None else min(end, total_size - 1)
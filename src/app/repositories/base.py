@@ -1,9 +1,14 @@
+from collections.abc import Iterator
 from datetime import datetime, UTC
 
+from flask import current_app
 from flask_sqlalchemy.model import DefaultMeta
+from flask_sqlalchemy.query import Query as FlaskQuery
 
 from app.extensions import db
+from app.helpers.search_shapes import search_shape_recorder
 from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
+from app.repositories.count_strategies import get_count_strategy
 
 
 class BaseRepository:
@@ -38,22 +43,86 @@ class BaseRepository:
         args += (self.model.id == record_id,)
         return self.find(*args, **kwargs)
 
-    def get(self, **kwargs) -> dict:
+    def get(self, load_plan: list = None, **kwargs) -> dict:
+        """Search records.
+
+        Parameters
+        ----------
+        load_plan : list
+            Loader options applied to the returned records, e.g. the
+            `selectinload` of the relationships dumped by a serializer.
+        kwargs : dict
+            Search request fields.
+
+        """
         rqo = SQLAlchemyQueryBuilder()
-        page, items_per_page, order = rqo.get_request_query_fields(self.model, kwargs)
+        count_strategy = get_count_strategy(kwargs.get('count'))
 
-        query = db.session.query(self.model)
-        records_total = db.session.query(self.model).count()
+        query = rqo.create_search_query(self.model, db.session.query(self.model), kwargs)
+        search_shape_recorder.record(self.model, kwargs)
+        records_total, records_filtered = count_strategy.count(self.model, query)
 
-        query = rqo.create_search_query(self.model, query, kwargs)
-        query = query.order_by(*order).offset(page * items_per_page).limit(items_per_page)
+        _, items_per_page, _ = rqo.get_request_query_fields(self.model, kwargs)
+        records = rqo.paginate_query(self.model, query, kwargs, lookahead=1).options(*(load_plan or [])).all()
+        has_more = len(records) > items_per_page
+        records = records[:items_per_page]
 
         return {
-            'query': query,
-            'records_filtered': query.count(),
+            'records': records,
+            'records_filtered': records_filtered,
             'records_total': records_total,
+            'has_more': has_more,
+            'next_cursor': rqo.get_next_cursor(self.model, records, kwargs) if has_more else None,
         }
 
+    def stream(self, load_plan: list = None, **kwargs) -> Iterator[db.Model]:
+        """Search records and yield them one at a time.
+
+        The requested page is fetched in chunks of `SEARCH_STREAM_CHUNK_SIZE`
+        records, every chunk continues from the keyset cursor of the previous
+        one so a page of thousands of records is never loaded at once.
+
+        Parameters
+        ----------
+        load_plan : list
+            Loader options applied to the returned records.
+        kwargs : dict
+            Search request fields.
+
+        """
+        rqo = SQLAlchemyQueryBuilder()
+
+        # NOTE: The search query is built before streaming so an invalid
+        # search fails before the response starts.
+        query = rqo.create_search_query(self.model, db.session.query(self.model), kwargs)
+        search_shape_recorder.record(self.model, kwargs)
+
+        return self._stream_chunks(rqo, query.options(*(load_plan or [])), kwargs)
+
+    def _stream_chunks(self, rqo: SQLAlchemyQueryBuilder, query: FlaskQuery, request_data: dict) -> Iterator[db.Model]:
+        page_number, items_per_page, _ = rqo.get_request_query_fields(self.model, request_data)
+        chunk_size = current_app.config['SEARCH_STREAM_CHUNK_SIZE']
+        offset = 0 if request_data.get('after') else page_number * items_per_page
+        cursor = request_data.get('after')
+        remaining = items_per_page
+
+        while remaining > 0:
+            chunk_request_data = request_data | {
+                'after': cursor,
+                'page_number': 1,
+                'items_per_page': min(chunk_size, remaining),
+            }
+            chunk_query = rqo.paginate_query(self.model, query, chunk_request_data)
+            records = chunk_query.offset(offset).all() if offset else chunk_query.all()
+            yield from records
+
+            if len(records) < chunk_request_data['items_per_page']:
+                break
+
+            remaining -= len(records)
+            offset = 0
+            cursor = rqo.get_next_cursor(self.model, records, chunk_request_data)
+
     def save(self, record_id: int, **kwargs) -> db.Model:
         record = self.find_by_id(record_id)
 
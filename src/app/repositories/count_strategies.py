@@ -0,0 +1,205 @@
+"""Strategies for counting the records of a search query.
+
+Counting is usually the most expensive part of a paginated search, a
+`COUNT(*)` has to visit every matching row while the page only needs a
+few of them. The search requests choose how much they are willing to pay
+for the counters of the response:
+
+    exact: `records_total` and `records_filtered` are computed with a
+        `COUNT` query. The filtered count is skipped if the search has no
+        filters.
+
+    estimated: `records_total` is read from the table statistics, it's
+        cheap but approximate. `records_filtered` is only returned if the
+        search has no filters.
+
+    cached: same counters as `exact` but they are kept in memory until a
+        write on the table is flushed or `SEARCH_COUNT_CACHE_TTL` expires.
+        At most `SEARCH_COUNT_CACHE_SIZE` searches are kept, the least
+        recently used ones are discarded first.
+
+    none: no counters at all, the response only says if there are more
+        records with `has_more`.
+
+References
+----------
+MySQL TABLE_ROWS: https://dev.mysql.com/doc/refman/8.0/en/information-schema-tables-table.html
+
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from flask import current_app
+from flask_sqlalchemy.query import Query as FlaskQuery
+
+from app.extensions import db
+from config import Config
+
+EXACT_COUNT = 'exact'
+ESTIMATED_COUNT = 'estimated'
+CACHED_COUNT = 'cached'
+NO_COUNT = 'none'
+
+
+class BaseCountStrategy(ABC):
+    @abstractmethod
+    def count(self, db_model: type[db.Model], query: FlaskQuery) -> tuple[int | None, int | None]:
+        """Return the `records_total` and `records_filtered` of a search.
+
+        Parameters
+        ----------
+        db_model : type[db.Model]
+            Model searched.
+        query : FlaskQuery
+            Search query with its filters but without sorting or pagination.
+
+        """
+
+    @staticmethod
+    def _count_total(db_model: type[db.Model]) -> int:
+        return db.session.query(sa.func.count(db_model.id)).scalar()
+
+    @staticmethod
+    def _count_filtered(db_model: type[db.Model], query: FlaskQuery) -> int:
+        return query.order_by(None).with_entities(sa.func.count(db_model.id)).scalar()
+
+
+class ExactCountStrategy(BaseCountStrategy):
+    def count(self, db_model: type[db.Model], query: FlaskQuery) -> tuple[int, int]:
+        records_total = self._count_total(db_model)
+
+        if query.whereclause is None:
+            return records_total, records_total
+
+        return records_total, self._count_filtered(db_model, query)
+
+
+class EstimatedCountStrategy(BaseCountStrategy):
+    def count(self, db_model: type[db.Model], query: FlaskQuery) -> tuple[int, int | None]:
+        records_total = self._estimate_total(db_model)
+        records_filtered = records_total if query.whereclause is None else None
+
+        return records_total, records_filtered
+
+    def _estimate_total(self, db_model: type[db.Model]) -> int:
+        if db.session.get_bind().dialect.name != 'mysql':
+            return self._count_total(db_model)
+
+        records_total = db.session.execute(
+            sa.text(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name'
+            ),
+            {'table_name': db_model.__tablename__},
+        ).scalar()
+
+        return self._count_total(db_model) if records_total is None else records_total
+
+
+class CachedCountStrategy(BaseCountStrategy):
+    """Exact counters cached per table and search.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of cached searches, the least recently used ones are
+        discarded first.
+
+    Notes
+    -----
+    The cache lives in the process memory, so writes done by other
+    processes (e.g. Celery workers) are only seen once the TTL expires.
+
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        sa.event.listen(sa.orm.Session, 'after_flush', self._invalidate_flushed_tables)
+
+    @staticmethod
+    def _get_cache_key(db_model: type[db.Model], query: FlaskQuery) -> tuple:
+        if query.whereclause is None:
+            return db_model.__tablename__, None
+
+        compiled_query = query.statement.compile()
+        params = tuple(sorted((name, repr(value)) for name, value in compiled_query.params.items()))
+        return db_model.__tablename__, str(compiled_query), params
+
+    def count(self, db_model: type[db.Model], query: FlaskQuery) -> tuple[int, int]:
+        cache_key = self._get_cache_key(db_model, query)
+        now = time.monotonic()
+
+        with self._lock:
+            cached_value = self._cache.get(cache_key)
+
+            if cached_value and cached_value[0] > now:
+                self._cache.move_to_end(cache_key)
+                return cached_value[1]
+
+        records_total = self._count_total(db_model)
+        records_filtered = records_total if query.whereclause is None else self._count_filtered(db_model, query)
+
+        if self.maxsize <= 0:
+            return records_total, records_filtered
+
+        with self._lock:
+            expires_at = now + current_app.config['SEARCH_COUNT_CACHE_TTL']
+            self._cache[cache_key] = (expires_at, (records_total, records_filtered))
+            self._cache.move_to_end(cache_key)
+            self._purge(now)
+
+        return records_total, records_filtered
+
+    def _purge(self, now: float) -> None:
+        """Discard the expired searches and the least recently used ones over the maximum size."""
+        for cache_key in [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[cache_key]
+
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, table_name: str = None) -> None:
+        with self._lock:
+            if table_name is None:
+                self._cache.clear()
+            else:
+                for cache_key in [key for key in self._cache if key[0] == table_name]:
+                    del self._cache[cache_key]
+
+    def _invalidate_flushed_tables(self, session: sa.orm.Session, _) -> None:
+        table_names = {
+            record.__tablename__
+            for record in (*session.new, *session.dirty, *session.deleted)
+            if hasattr(record, '__tablename__')
+        }
+
+        for table_name in table_names:
+            self.invalidate(table_name)
+
+
+class NoCountStrategy(BaseCountStrategy):
+    def count(self, db_model: type[db.Model], query: FlaskQuery) -> tuple[None, None]:
+        return None, None
+
+
+COUNT_STRATEGIES = {
+    EXACT_COUNT: ExactCountStrategy(),
+    ESTIMATED_COUNT: EstimatedCountStrategy(),
+    CACHED_COUNT: CachedCountStrategy(maxsize=Config.SEARCH_COUNT_CACHE_SIZE),
+    NO_COUNT: NoCountStrategy(),
+}
+
+
+def get_count_strategy(name: str = None) -> BaseCountStrategy:
+    name = name or current_app.config['SEARCH_DEFAULT_COUNT_STRATEGY']
+
+    if name not in COUNT_STRATEGIES:
+        raise ValueError(f'Unsupported count strategy: {name}')
+
+    return COUNT_STRATEGIES[name]
@@ -24,4 +24,5 @@ from .auth import AuthUserConfirmResetPasswordSerializer, AuthUserLoginSerialize
 from .core import SearchSerializer
 from .document import DocumentAttachmentSerializer, DocumentSerializer
 from .role import RoleSerializer
+from .task import TaskStatusSerializer
 from .user import UserExportWordSerializer, UserSerializer
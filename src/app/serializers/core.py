@@ -1,8 +1,11 @@
-from marshmallow import fields, validate
+import sqlalchemy as sa
+from marshmallow import fields, validate, validates_schema, ValidationError
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.extensions import ma
-from app.helpers.sqlalchemy_query_builder import ALL_OPERATORS
+from app.extensions import db, ma
+from app.helpers.sqlalchemy_query_builder import ALL_OPERATORS, KeysetClauseBuilder
 from app.repositories.base import BaseRepository
+from app.repositories.count_strategies import COUNT_STRATEGIES
 
 
 class RepositoryMixin:
@@ -31,6 +34,51 @@ class RepositoryMixin:
         raise ValueError(f"Repository '{repository_name}' not found in {self.__class__.__name__}")
 
 
+class LoadPlanMixin:
+    """Derive the relationships to eager load from the dumped fields.
+
+    Dumping a relationship lazy loads it once per record, so a page of
+    search results runs one extra query per record and relationship. The
+    load plan loads them up-front: `selectinload` for collections and
+    `joinedload` for many-to-one relationships.
+
+    Example
+    -------
+    >>> serializer = UserSerializer(many=True)
+    >>> serializer.get_load_plan()
+    [<_AbstractLoad ... User.roles>]
+
+    """
+
+    @staticmethod
+    def _get_nested_schema(field: fields.Field) -> ma.Schema | None:
+        if isinstance(field, fields.List):
+            field = field.inner
+
+        return field.schema if isinstance(field, fields.Nested) else None
+
+    def get_load_plan(self) -> list:
+        relationships = sa.inspect(self.opts.model).relationships
+        load_plan = []
+
+        for field_name, field in self.dump_fields.items():
+            relationship = relationships.get(field.attribute or field_name)
+
+            if relationship is None or relationship.lazy == 'dynamic':
+                continue
+
+            loader = selectinload if relationship.uselist else joinedload
+            loader_option = loader(relationship.class_attribute)
+
+            nested_schema = self._get_nested_schema(field)
+            if isinstance(nested_schema, LoadPlanMixin):
+                loader_option = loader_option.options(*nested_schema.get_load_plan())
+
+            load_plan.append(loader_option)
+
+        return load_plan
+
+
 class _SearchValueSerializer(ma.Schema):
     field_name = fields.Str(required=True)
     field_operator = fields.Str(required=True, validate=validate.OneOf(sorted(ALL_OPERATORS)))
@@ -43,7 +91,40 @@ class _SearchOrderSerializer(ma.Schema):
 
 
 class SearchSerializer(ma.Schema):
+    """Deserialize the search requests.
+
+    Parameters
+    ----------
+    db_model : type[db.Model]
+        Model of the searched records. The repository skips the order fields
+        which aren't columns of the model, the keys of a cursor are compared
+        with the order without them too.
+
+    """
+
     search = fields.List(fields.Nested(_SearchValueSerializer))
     order = fields.List(fields.Nested(_SearchOrderSerializer))
     items_per_page = fields.Integer(validate=validate.Range(min=1))
     page_number = fields.Integer(validate=validate.Range(min=1))
+    after = fields.Str(validate=validate.Length(min=1))
+    count = fields.Str(validate=validate.OneOf(sorted(COUNT_STRATEGIES)))
+
+    def __init__(self, *args, db_model: type[db.Model] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.db_model = db_model
+
+    @validates_schema
+    def validate_after(self, data, **kwargs):  # pylint: disable=unused-argument
+        if 'after' not in data:
+            return
+
+        if 'page_number' in data:
+            raise ValidationError('page_number and after cannot be used together', field_name='after')
+
+        try:
+            cursor = KeysetClauseBuilder.decode_cursor(data['after'])
+        except ValueError as exc:
+            raise ValidationError(str(exc), field_name='after') from exc
+
+        if cursor['keys'] != KeysetClauseBuilder.get_sort_keys(data, self.db_model):
+            raise ValidationError("Cursor doesn't match the requested order", field_name='after')
@@ -6,11 +6,14 @@ from app.extensions import ma
 from app.models import Document
 from app.models.document import StorageTypes
 from app.repositories import DocumentRepository
-from app.serializers.core import RepositoryMixin
+from app.serializers.core import LoadPlanMixin, RepositoryMixin
 from config import Config
 
+# NOTE: The MIME type of a file is detected from its first bytes, the rest of the file isn't read
+MIME_TYPE_SNIFF_SIZE = 8192
 
-class DocumentSerializer(ma.SQLAlchemySchema, RepositoryMixin):
+
+class DocumentSerializer(ma.SQLAlchemySchema, RepositoryMixin, LoadPlanMixin):
     class Meta:
         model = Document
 
@@ -61,14 +64,25 @@ class DocumentSerializer(ma.SQLAlchemySchema, RepositoryMixin):
         data['storage_type'] = data['storage_type'].lower()
         return data
 
+    @staticmethod
+    def _read_file_head(data: dict) -> bytes:
+        if 'file_stream' not in data:
+            return (data.get('file_data') or b'')[:MIME_TYPE_SNIFF_SIZE]
+
+        file_head = data['file_stream'].read(MIME_TYPE_SNIFF_SIZE)
+        data['file_stream'].seek(0)
+        return file_head
+
     @staticmethod
     def valid_request_file(data):
-        if not data.get('file_data'):
+        file_head = DocumentSerializer._read_file_head(data)
+
+        if not file_head:
             raise ValidationError('empty file')
 
         is_valid_mime_type = data.get('mime_type') in Config.ALLOWED_MIME_TYPES
 
-        file_content_type = magic.from_buffer(data.get('file_data'), mime=True)
+        file_content_type = magic.from_buffer(file_head, mime=True)
         is_valid_file_content_type = file_content_type in Config.ALLOWED_MIME_TYPES
 
         if not is_valid_mime_type or not is_valid_file_content_type:
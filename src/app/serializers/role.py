@@ -5,10 +5,10 @@ from app.extensions import ma
 from app.models import Role
 from app.models.role import ROLE_NAME_DELIMITER
 from app.repositories import RoleRepository
-from app.serializers.core import RepositoryMixin
+from app.serializers.core import LoadPlanMixin, RepositoryMixin
 
 
-class RoleSerializer(ma.SQLAlchemySchema, RepositoryMixin):
+class RoleSerializer(ma.SQLAlchemySchema, RepositoryMixin, LoadPlanMixin):
     class Meta:
         model = Role
 
@@ -0,0 +1,13 @@
+from marshmallow import fields, validate
+
+from app.extensions import ma
+
+TASK_STATUS_MAX_TASK_IDS = 100
+
+
+class TaskStatusSerializer(ma.Schema):
+    task_ids = fields.List(
+        fields.Str(validate=validate.Regexp(r'^[\w-]+$')),
+        required=True,
+        validate=validate.Length(min=1, max=TASK_STATUS_MAX_TASK_IDS),
+    )
@@ -5,7 +5,7 @@ from app.extensions import ma
 from app.models import User
 from app.repositories import RoleRepository, UserRepository
 from app.serializers import RoleSerializer
-from app.serializers.core import RepositoryMixin
+from app.serializers.core import LoadPlanMixin, RepositoryMixin
 from config import Config
 
 
@@ -25,7 +25,7 @@ class VerifyRoleId(fields.Int, RepositoryMixin):
         return value
 
 
-class UserSerializer(ma.SQLAlchemySchema, RepositoryMixin):
+class UserSerializer(ma.SQLAlchemySchema, RepositoryMixin, LoadPlanMixin):
     class Meta:
         model = User
 
@@ -1,14 +1,18 @@
 import io
 import mimetypes
+import os
 import uuid
+from collections.abc import Iterator
+from typing import IO
 
 from flask import current_app
 from flask_login import current_user
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
 
-from app.exceptions import FileEmptyError, GoogleDriveError
+from app.exceptions import FileEmptyError, FileTooLargeError, GoogleDriveError
 from app.extensions import db
-from app.file_storages import LocalStorage
+from app.file_storages import ContentAddressedStorage, LocalStorage
+from app.helpers.gdrive_cache import GoogleDriveCache
 from app.models import Document
 from app.models.document import StorageTypes
 from app.providers.google_drive import GoogleDriveFilesProvider, GoogleDrivePermissionsProvider
@@ -25,19 +29,66 @@ class DocumentService(
         file_storage: LocalStorage = None,
         gdrive_files_provider: GoogleDriveFilesProvider = None,
         gdrive_permissions_provider: GoogleDrivePermissionsProvider = None,
+        gdrive_cache: GoogleDriveCache = None,
     ):
         super().__init__(repository=document_repository or DocumentRepository())
         self.file_storage = file_storage or LocalStorage()
         self.gdrive_files_provider = gdrive_files_provider or GoogleDriveFilesProvider()
         self.gdrive_permissions_provider = gdrive_permissions_provider or GoogleDrivePermissionsProvider()
+        self.gdrive_cache = gdrive_cache
+
+    @staticmethod
+    def _get_upload_stream(**kwargs) -> IO[bytes]:
+        """Stream of the uploaded file, the upload is sent as it is instead of being copied in memory."""
+        if 'file_stream' not in kwargs:
+            return io.BytesIO(kwargs['file_data'])
+
+        file_stream = kwargs['file_stream']
+        max_size = current_app.config['DOCUMENT_MAX_SIZE']
+
+        if file_stream.seek(0, os.SEEK_END) > max_size:
+            raise RequestEntityTooLarge(description=f'The file is larger than {max_size} bytes!')
+
+        file_stream.seek(0)
+        return file_stream
+
+    def _store_blob(self, **kwargs) -> dict:
+        """Store the file by its content, the documents with the same content share the blob."""
+        file_stream = kwargs['file_stream'] if 'file_stream' in kwargs else io.BytesIO(kwargs['file_data'])
+
+        try:
+            digest, filesize = self.file_storage.save_blob(
+                file_stream, max_size=current_app.config['DOCUMENT_MAX_SIZE']
+            )
+        except FileTooLargeError as e:
+            raise RequestEntityTooLarge(description=str(e)) from e
+        except FileEmptyError as e:
+            raise BadRequest(description=str(e)) from e
+
+        return {
+            'name': self.file_storage.get_filename(kwargs['filename']),
+            'internal_filename': digest,
+            'mime_type': kwargs['mime_type'],
+            'directory_path': self.file_storage.get_blob_directory(digest),
+            'content_hash': digest,
+            'size': filesize,
+        }
 
     def _create_local_file(self, **kwargs) -> dict:
+        if isinstance(self.file_storage, ContentAddressedStorage):
+            return self._store_blob(**kwargs)
+
         file_extension = mimetypes.guess_extension(kwargs['mime_type'])
         internal_filename = f'{uuid.uuid1().hex}{file_extension}'
         filepath = f'{current_app.config.get("STORAGE_DIRECTORY")}/{internal_filename}'
 
         try:
-            self.file_storage.save_bytes(kwargs['file_data'], filepath)
+            if 'file_stream' in kwargs:
+                self.file_storage.save_stream(
+                    kwargs['file_stream'], filepath, max_size=current_app.config['DOCUMENT_MAX_SIZE']
+                )
+            else:
+                self.file_storage.save_bytes(kwargs['file_data'], filepath)
 
             return {
                 'name': self.file_storage.get_filename(kwargs['filename']),
@@ -46,6 +97,8 @@ class DocumentService(
                 'directory_path': current_app.config.get('STORAGE_DIRECTORY'),
                 'size': self.file_storage.get_filesize(filepath),
             }
+        except FileTooLargeError as e:
+            raise RequestEntityTooLarge(description=str(e)) from e
         except (Exception, FileExistsError, FileEmptyError) as e:
             self.file_storage.delete_file(filepath)
             raise BadRequest(description=str(e)) from e
@@ -59,7 +112,7 @@ class DocumentService(
             gdrive_file = self.gdrive_files_provider.create_file_from_stream(
                 parent_id=gdrive_folder['id'],
                 file_name=self.file_storage.get_filename(kwargs['filename']),
-                file_stream=io.BytesIO(kwargs['file_data']),
+                file_stream=self._get_upload_stream(**kwargs),
                 mime_type=kwargs['mime_type'],
                 fields='id, name, mimeType, size',
             )
@@ -101,13 +154,24 @@ class DocumentService(
     def get(self, **kwargs) -> dict:
         return self.repository.get(**kwargs)
 
+    def stream(self, **kwargs) -> Iterator[Document]:
+        return self.repository.stream(**kwargs)
+
     def _save_local_file(self, **kwargs) -> dict:
+        if isinstance(self.file_storage, ContentAddressedStorage):
+            return self._store_blob(**kwargs)
+
         file_extension = mimetypes.guess_extension(kwargs['mime_type'])
         internal_filename = f'{uuid.uuid1().hex}{file_extension}'
         filepath = f'{current_app.config.get("STORAGE_DIRECTORY")}/{internal_filename}'
 
         try:
-            self.file_storage.save_bytes(kwargs.get('file_data'), filepath, override=True)
+            if 'file_stream' in kwargs:
+                self.file_storage.save_stream(
+                    kwargs['file_stream'], filepath, override=True, max_size=current_app.config['DOCUMENT_MAX_SIZE']
+                )
+            else:
+                self.file_storage.save_bytes(kwargs.get('file_data'), filepath, override=True)
 
             return {
                 'name': self.file_storage.get_filename(kwargs.get('filename')),
@@ -115,6 +179,8 @@ class DocumentService(
                 'mime_type': kwargs.get('mime_type'),
                 'size': self.file_storage.get_filesize(filepath),
             }
+        except FileTooLargeError as e:
+            raise RequestEntityTooLarge(description=str(e)) from e
         except (FileExistsError, FileEmptyError) as e:
             if isinstance(e, FileEmptyError):
                 self.file_storage.delete_file(filepath)
@@ -126,11 +192,14 @@ class DocumentService(
             gdrive_file = self.gdrive_files_provider.upload_file_from_stream(
                 file_id=kwargs['document'].storage_id,
                 file_name=self.file_storage.get_filename(kwargs['filename']),
-                file_stream=io.BytesIO(kwargs['file_data']),
+                file_stream=self._get_upload_stream(**kwargs),
                 mime_type=kwargs['mime_type'],
                 fields='name, mimeType, size',
             )
 
+            if self.gdrive_cache is not None:
+                self.gdrive_cache.invalidate(kwargs['document'].storage_id)
+
             return {
                 'name': gdrive_file['name'],
                 'mime_type': gdrive_file['mimeType'],
@@ -159,10 +228,36 @@ class DocumentService(
 
     @staticmethod
     def _get_local_document_content(document: Document) -> dict:
-        return {'path_or_file': document.get_filepath()}
+        # NOTE: The documents stored by content use their digest as ETag, the others the mtime and size of the file
+        return {'path_or_file': document.get_filepath(), 'etag': document.content_hash or True}
 
     def _get_gdrive_document_content(self, document: Document) -> dict:
-        return {'path_or_file': self.gdrive_files_provider.download_file_content(document.storage_id)}
+        def stream_content(start: int, end: int | None) -> Iterator[bytes]:
+            return self.gdrive_files_provider.stream_file_content(
+                document.storage_id, chunk_size=current_app.config['GDRIVE_DOWNLOAD_CHUNK_SIZE'], start=start, end=end
+            )
+
+        if self.gdrive_cache is None or not self.gdrive_cache.enabled:
+            return {'stream_content': stream_content, 'size': document.size}
+
+        metadata = self.gdrive_files_provider.get_file_metadata(
+            document.storage_id, fields='id, size, modifiedTime, md5Checksum'
+        )
+        revision = self.gdrive_cache.get_revision(metadata)
+        etag = metadata.get('md5Checksum', True)
+        size = int(metadata['size']) if 'size' in metadata else None
+
+        if filepath := self.gdrive_cache.get(document.storage_id, revision):
+            return {'path_or_file': filepath, 'etag': etag}
+
+        def read_through(start: int, end: int | None) -> Iterator[bytes]:
+            # NOTE: Only a whole download fills the cache, a Range request is sent to Google Drive
+            if start == 0 and end is None and self.gdrive_cache.can_store(size):
+                return self.gdrive_cache.read_through(document.storage_id, revision, lambda: stream_content(0, None))
+
+            return stream_content(start, end)
+
+        return {'stream_content': read_through, 'size': size, 'etag': etag}
 
     def get_document_content(self, document_id: int, request_args: dict) -> dict:
         as_attachment = request_args.get('as_attachment', 0)
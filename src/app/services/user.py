@@ -1,4 +1,5 @@
 import uuid
+from collections.abc import Iterator
 
 from flask_login import current_user
 
@@ -30,6 +31,9 @@ class UserService(b.BaseService, b.CreationService, b.DeletionService, b.FindByI
     def get(self, **kwargs) -> dict:
         return self.repository.get(**kwargs)
 
+    def stream(self, **kwargs) -> Iterator[User]:
+        return self.repository.stream(**kwargs)
+
     def save(self, record_id: int, **kwargs) -> User:
         user = self.repository.save(record_id, **kwargs)
         db.session.flush()
@@ -51,6 +51,8 @@ string type query operators:
 &emsp;&emsp;&emsp;&emsp; startswith: x starts with field_value.
 
 &emsp;&emsp;&emsp;&emsp; endswith: x ends with field_value.
+
+&emsp;&emsp;&emsp;&emsp; match: full-text search of field_value, falls back to contains without a FULLTEXT index.
 """
 
 _search_search_input_sw_model = api.model(
@@ -87,5 +89,19 @@ search_input_sw_model = api.model(
         ),
         'items_per_page': fields.Integer(required=True, example=10),
         'page_number': fields.Integer(required=True, example=1),
+        'after': fields.String(
+            description=(
+                'Cursor returned as next_cursor by the previous page. It replaces page_number and the order '
+                'must be the same as the one of the previous page.'
+            )
+        ),
+        'count': fields.String(
+            enum=['exact', 'estimated', 'cached', 'none'],
+            description=(
+                'How records_total and records_filtered are computed. exact: COUNT queries. estimated: table '
+                'statistics, records_filtered is null if there are filters. cached: exact counters kept until the '
+                'table changes. none: no counters, use has_more.'
+            ),
+        ),
     },
 )
@@ -27,5 +27,7 @@ role_search_output_sw_model = api.model(
         'data': fields.List(fields.Nested(role_sw_model)),
         'records_total': fields.Integer,
         'records_filtered': fields.Integer,
+        'has_more': fields.Boolean(description='Whether there are more records after this page.'),
+        'next_cursor': fields.String(description='Cursor for fetching the next page, null on the last page.'),
     },
 )
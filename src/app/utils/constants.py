@@ -4,6 +4,7 @@ import enum
 PDF_MIME_TYPE = 'application/pdf'
 MS_WORD_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
 MS_EXCEL_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DOCUMENT_DOWNLOAD_TOKEN_SALT = 'document-download'
 
 
 # Google Drive
@@ -0,0 +1,72 @@
+"""Benchmark of the per task overhead of `ContextTask`.
+
+Compares pushing a new application context per task with reusing the
+application context of the worker (`CELERY_REUSE_APP_CONTEXT`). The tasks
+run eagerly, so the overhead of the broker is not measured, and they are
+trivial: one does nothing and the other runs a query with a session.
+
+Usage:
+
+    python -m benchmarks.celery_tasks
+    python -m benchmarks.celery_tasks --tasks 10000
+
+"""
+
+import argparse
+import tempfile
+import time
+
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
+
+from app.celery import ContextTask, make_celery
+
+
+def _get_tasks(reuse_app_context: bool, database_path: str) -> dict:
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{database_path}',
+        CELERY_REUSE_APP_CONTEXT=reuse_app_context,
+        task_always_eager=True,
+    )
+    db = SQLAlchemy(app)
+    celery = make_celery(app)
+
+    @celery.task(base=ContextTask)
+    def noop_task():
+        return True
+
+    @celery.task(base=ContextTask)
+    def query_task():
+        return db.session.execute(text('SELECT 1')).scalar()
+
+    return {'noop': noop_task, 'query': query_task}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f'{"app context":<12} {"task":<6} {"tasks":>7} {"us/task":>9}')  # noqa: T201
+
+    with tempfile.NamedTemporaryFile(suffix='.db') as database:
+        for reuse_app_context in (False, True):
+            for task_name, task in _get_tasks(reuse_app_context, database.name).items():
+                # NOTE: The first task pushes the application context of the worker and opens the connection
+                task.apply()
+                start = time.perf_counter()
+
+                for _ in range(args.tasks):
+                    task.apply()
+
+                elapsed = time.perf_counter() - start
+                app_context = 'reused' if reuse_app_context else 'per task'
+                print(  # noqa: T201
+                    f'{app_context:<12} {task_name:<6} {args.tasks:>7} {elapsed * 1_000_000 / args.tasks:>9.1f}'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark of the Excel writer used by the users export.
+
+Compares the legacy writer, which created a format for every even row and
+kept every cell in memory, with `ExcelSheetWriter` in constant memory mode.
+Every case runs in a new process so the peak memory is not shared between
+cases.
+
+Usage:
+
+    python -m benchmarks.excel_writer
+    python -m benchmarks.excel_writer --rows 10000 100000 1000000 --legacy-max-rows 100000
+
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+from datetime import datetime
+from tempfile import NamedTemporaryFile
+
+import xlsxwriter
+
+from app.celery.excel.writer import ExcelSheetWriter
+
+HEADER = ['Name', 'Last Name', 'Email', 'Birth Date', 'Role', 'Created At', 'Updated At', 'Deleted At']
+
+
+def _get_rows(total_rows: int):
+    created_at = datetime(2024, 1, 1).strftime('%Y/%m/%d %H:%M:%S')
+
+    for i in range(total_rows):
+        yield [
+            f'Name {i}',
+            f'Last name {i % 1000}',
+            f'user{i}@example.com',
+            '1990-01-01',
+            'Worker',
+            created_at,
+            created_at,
+            'N/D',
+        ]
+
+
+def _write_legacy(filename: str, total_rows: int) -> None:
+    workbook = xlsxwriter.Workbook(filename)
+    worksheet = workbook.add_worksheet()
+    longest_word = ''
+
+    for i, row in enumerate([HEADER, *_get_rows(total_rows)], 1):
+        row_format = None
+
+        if i == 1:
+            row_format = workbook.add_format({'bold': True, 'bg_color': '#cccccc'})
+        elif i % 2 == 0:
+            row_format = workbook.add_format({'bg_color': '#f1f1f1'})
+
+        row_longest_word = max([str(cell) for cell in row], key=len)
+        if len(row_longest_word) > len(longest_word):
+            longest_word = row_longest_word
+
+        worksheet.write_row(f'A{i}:I10', row, row_format)
+
+    for i, _ in enumerate(HEADER):
+        worksheet.set_column(i, i + 1, len(longest_word) + 1)
+
+    workbook.close()
+
+
+def _write_streaming(filename: str, total_rows: int) -> None:
+    workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
+    writer = ExcelSheetWriter(workbook, workbook.add_worksheet())
+
+    writer.write_header(HEADER)
+    for row in _get_rows(total_rows):
+        writer.write_row(row)
+
+    writer.close()
+    workbook.close()
+
+
+WRITERS = {
+    'legacy': _write_legacy,
+    'streaming': _write_streaming,
+}
+
+
+def _run_case(writer_name: str, total_rows: int) -> tuple[float, int, int]:
+    with NamedTemporaryFile(suffix='.xlsx') as tempfile:
+        start = time.perf_counter()
+        WRITERS[writer_name](tempfile.name, total_rows)
+        elapsed = time.perf_counter() - start
+        filesize = os.path.getsize(tempfile.name)
+
+    # NOTE: ru_maxrss is in kilobytes on Linux
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, filesize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument(
+        '--legacy-max-rows',
+        type=int,
+        default=100_000,
+        help='The legacy writer keeps every cell in memory, bigger cases are skipped.',
+    )
+    args = parser.parse_args()
+
+    print(f'{"writer":<10} {"rows":>10} {"seconds":>9} {"rows/s":>10} {"peak MB":>8} {"size MB":>8}')  # noqa: T201
+    context = multiprocessing.get_context('spawn')
+
+    for total_rows in args.rows:
+        for writer_name in WRITERS:
+            if writer_name == 'legacy' and total_rows > args.legacy_max_rows:
+                continue
+
+            with context.Pool(processes=1) as pool:
+                elapsed, max_rss, filesize = pool.apply(_run_case, (writer_name, total_rows))
+
+            print(  # noqa: T201
+                f'{writer_name:<10} {total_rows:>10} {elapsed:>9.2f} {total_rows / elapsed:>10.0f} '
+                f'{max_rss / 1024:>8.1f} {filesize / 1024 / 1024:>8.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
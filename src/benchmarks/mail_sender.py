@@ -0,0 +1,96 @@
+"""Benchmark of the SMTP connection pool used by the mail tasks.
+
+Compares `Mail.send`, which opens a connection per email, with
+`SMTPConnectionPool`, sending one email per call and sending all of them
+with `send_many`. The emails are sent to a local SMTP server which waits
+`--connection-delay` seconds before greeting a new connection, it stands
+for the network round trips, the TLS handshake and the login of a real
+server.
+
+Usage:
+
+    python -m benchmarks.mail_sender
+    python -m benchmarks.mail_sender --emails 100 1000 --connection-delay 0.05
+
+"""
+
+import argparse
+import time
+
+from flask import Flask
+from flask_mail import Mail, Message
+
+from app.celery.mail import SMTPConnectionPool
+from tests.fixtures.smtp_server import LocalSMTPServer
+
+
+def _get_messages(total_emails: int) -> list:
+    return [
+        Message(
+            subject='Welcome to Flask Api!',
+            sender='hello@flaskapi.com',
+            recipients=[f'user{i}@example.com'],
+            html=f'<p>Hello user {i},</p>',
+        )
+        for i in range(total_emails)
+    ]
+
+
+def _send_with_mail(mail: Mail, messages: list) -> None:
+    for message in messages:
+        mail.send(message)
+
+
+def _send_with_pool(mail: Mail, messages: list) -> None:
+    pool = SMTPConnectionPool(mail.state)
+
+    for message in messages:
+        pool.send(message)
+
+    pool.close()
+
+
+def _send_many_with_pool(mail: Mail, messages: list) -> None:
+    pool = SMTPConnectionPool(mail.state)
+    pool.send_many(messages)
+    pool.close()
+
+
+SENDERS = {
+    'mail': _send_with_mail,
+    'pool': _send_with_pool,
+    'bulk': _send_many_with_pool,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, nargs='+', default=[100, 1_000])
+    parser.add_argument('--connection-delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    print(f'{"sender":<8} {"emails":>8} {"seconds":>9} {"emails/s":>9} {"connections":>12}')  # noqa: T201
+
+    for total_emails in args.emails:
+        for sender_name, send in SENDERS.items():
+            with LocalSMTPServer(connection_delay=args.connection_delay) as smtp_server:
+                app = Flask(__name__)
+                app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=smtp_server.port)
+                mail = Mail(app)
+                messages = _get_messages(total_emails)
+
+                with app.app_context():
+                    start = time.perf_counter()
+                    send(mail, messages)
+                    elapsed = time.perf_counter() - start
+
+                assert len(smtp_server.messages) == total_emails
+
+                print(  # noqa: T201
+                    f'{sender_name:<8} {total_emails:>8} {elapsed:>9.2f} {total_emails / elapsed:>9.0f} '
+                    f'{smtp_server.total_connections:>12}'
+                )
+
+
+if __name__ == '__main__':
+    main()
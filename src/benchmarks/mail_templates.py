@@ -0,0 +1,80 @@
+"""Benchmark of the mail template renderer used by the mail tasks.
+
+Compares `render_template` with `MailTemplateRenderer`. The first email of a
+worker process pays the compilation of its template (and of the templates
+it extends) unless they were precompiled when the process started, so
+every round uses a new Flask application, as a new worker process does.
+
+Usage:
+
+    python -m benchmarks.mail_templates
+    python -m benchmarks.mail_templates --rounds 20 --renders 1000
+
+"""
+
+import argparse
+import statistics
+import time
+
+from flask import Flask, render_template
+
+from app.celery.mail import MailTemplateRenderer
+from config import Config
+
+TEMPLATE_NAME = 'mails/new_user.html'
+CONTEXT = {'name': 'John', 'login_url': 'https://flaskapi.com/login'}
+
+
+def _render_with_render_template(app: Flask) -> tuple:
+    start = time.perf_counter()
+    render_template(TEMPLATE_NAME, **CONTEXT)
+    return time.perf_counter() - start, lambda: render_template(TEMPLATE_NAME, **CONTEXT)
+
+
+def _render_with_renderer(app: Flask) -> tuple:
+    renderer = MailTemplateRenderer(app.jinja_env)
+    renderer.precompile()
+    start = time.perf_counter()
+    renderer.render(TEMPLATE_NAME, **CONTEXT)
+    return time.perf_counter() - start, lambda: renderer.render(TEMPLATE_NAME, **CONTEXT)
+
+
+RENDERERS = {
+    'render_template': _render_with_render_template,
+    'renderer': _render_with_renderer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--renders', type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f'{"renderer":<16} {"first email ms":>15} {"next emails us":>15}')  # noqa: T201
+
+    for renderer_name, render in RENDERERS.items():
+        first_latencies, next_latencies = [], []
+
+        for _ in range(args.rounds):
+            app = Flask(__name__, template_folder=Config.TEMPLATES_FOLDER)
+
+            with app.app_context():
+                first_latency, render_next = render(app)
+                start = time.perf_counter()
+
+                for _ in range(args.renders):
+                    render_next()
+
+                next_latencies.append((time.perf_counter() - start) / args.renders)
+
+            first_latencies.append(first_latency)
+
+        print(  # noqa: T201
+            f'{renderer_name:<16} {statistics.median(first_latencies) * 1_000:>15.2f} '
+            f'{statistics.median(next_latencies) * 1_000_000:>15.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
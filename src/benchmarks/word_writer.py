@@ -0,0 +1,90 @@
+"""Benchmark of the Word table writer used by the users export.
+
+Compares the legacy writer, which filled the table through `cell.text`,
+with `WordTableWriter`. The legacy writer is quadratic on the number of
+rows, bigger cases than `--legacy-max-rows` are skipped.
+
+Usage:
+
+    python -m benchmarks.word_writer
+    python -m benchmarks.word_writer --rows 1000 10000 50000 --legacy-max-rows 50000
+
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+import docx
+
+from app.celery.word.writer import WordTableWriter
+
+HEADER = ['Name', 'Last Name', 'Email', 'Birth Date', 'Role', 'Created At', 'Updated At', 'Deleted At']
+
+
+def _get_rows(total_rows: int) -> list:
+    created_at = datetime(2024, 1, 1).strftime('%Y/%m/%d %H:%M:%S')
+
+    return [HEADER] + [
+        [
+            f'Name {i}',
+            f'Last name {i % 1000}',
+            f'user{i}@example.com',
+            '1990-01-01',
+            'worker',
+            created_at,
+            created_at,
+            'N/D',
+        ]
+        for i in range(total_rows)
+    ]
+
+
+def _write_legacy(rows: list) -> None:
+    document = docx.Document()
+    table = document.add_table(rows=len(rows), cols=len(HEADER))
+
+    for i, _ in enumerate(rows):
+        row = table.rows[i]
+        for j, table_cell in enumerate(rows[i]):
+            row.cells[j].text = str(table_cell)
+
+
+def _write_bulk(rows: list) -> None:
+    document = docx.Document()
+    writer = WordTableWriter(document, len(HEADER))
+
+    for row in rows:
+        writer.write_row(row)
+
+
+WRITERS = {
+    'legacy': _write_legacy,
+    'bulk': _write_bulk,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--legacy-max-rows', type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f'{"writer":<8} {"rows":>8} {"seconds":>9} {"rows/s":>9}')  # noqa: T201
+
+    for total_rows in args.rows:
+        rows = _get_rows(total_rows)
+
+        for writer_name, write in WRITERS.items():
+            if writer_name == 'legacy' and total_rows > args.legacy_max_rows:
+                continue
+
+            start = time.perf_counter()
+            write(rows)
+            elapsed = time.perf_counter() - start
+
+            print(f'{writer_name:<8} {total_rows:>8} {elapsed:>9.2f} {total_rows / elapsed:>9.0f}')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
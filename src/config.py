@@ -77,6 +77,14 @@ class Config(metaclass=Meta):
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_USE_TLS = _str_to_bool(os.getenv('MAIL_USE_TLS'), 'False')
     MAIL_USE_SSL = _str_to_bool(os.getenv('MAIL_USE_SSL'), 'False')
+    # NOTE: Attachments bigger than the minimum size are sent in a zip, the ones which don't fit in the
+    #       maximum size of the attachments of an email are sent as a download link.
+    MAIL_ATTACHMENT_ZIP_MIN_SIZE = _str_to_int(os.getenv('MAIL_ATTACHMENT_ZIP_MIN_SIZE'), 1_048_576)
+    MAIL_ATTACHMENTS_MAX_SIZE = _str_to_int(os.getenv('MAIL_ATTACHMENTS_MAX_SIZE'), 10_485_760)
+    # NOTE: Each process keeps up to MAIL_POOL_SIZE idle SMTP connections, the ones which have been idle
+    #       for MAIL_POOL_KEEPALIVE seconds are checked with a NOOP before they are reused.
+    MAIL_POOL_SIZE = _str_to_int(os.getenv('MAIL_POOL_SIZE'), 2)
+    MAIL_POOL_KEEPALIVE = _str_to_int(os.getenv('MAIL_POOL_KEEPALIVE'), 30)
 
     # Celery
     broker_url = os.getenv('CELERY_BROKER_URL')
@@ -97,6 +105,37 @@ class Config(metaclass=Meta):
     worker_task_log_format = '%(asctime)s - %(levelname)s - %(processName)s - %(task_name)s - %(task_id)s - %(message)s'
     result_extended = True
     task_always_eager = False
+    # NOTE: "threads" and "gevent" run the tasks of a worker process concurrently, e.g. its PDF conversions
+    worker_pool = os.getenv('CELERY_WORKER_POOL', 'prefork')
+    # NOTE: The tasks of a worker process reuse one application context instead of pushing a new one per task,
+    #       every task still gets its own SQLAlchemy session.
+    CELERY_REUSE_APP_CONTEXT = _str_to_bool(os.getenv('CELERY_REUSE_APP_CONTEXT'), 'False')
+    # NOTE: The progress of a task is reported at most once per interval and percentage step
+    TASK_PROGRESS_MIN_INTERVAL_MS = _str_to_int(os.getenv('TASK_PROGRESS_MIN_INTERVAL_MS'), 500)
+    TASK_PROGRESS_MIN_STEP = _str_to_int(os.getenv('TASK_PROGRESS_MIN_STEP'), 1)
+    # NOTE: "backend" reads the progress of the tasks from the result backend, "memory" and "file" from a store
+    #       which the tasks write in. The file store defaults to the "task_progress" folder of STORAGE_DIRECTORY.
+    TASK_PROGRESS_STORE = os.getenv('TASK_PROGRESS_STORE', 'backend')
+    TASK_PROGRESS_DIRECTORY = os.getenv('TASK_PROGRESS_DIRECTORY')
+    TASK_PROGRESS_EXPIRES = _str_to_int(os.getenv('TASK_PROGRESS_EXPIRES'), 3600)
+    # NOTE: Seconds the clients are asked to wait before polling again the status of a task which hasn't finished
+    TASK_STATUS_RETRY_AFTER = _str_to_int(os.getenv('TASK_STATUS_RETRY_AFTER'), 2)
+
+    # LibreOffice
+    LIBREOFFICE_POOL_SIZE = _str_to_int(os.getenv('LIBREOFFICE_POOL_SIZE'), 2)
+    LIBREOFFICE_PROFILES_DIRECTORY = os.getenv('LIBREOFFICE_PROFILES_DIRECTORY', '/tmp/flask_api_lo_profiles')
+    LIBREOFFICE_TIMEOUT = _str_to_int(os.getenv('LIBREOFFICE_TIMEOUT'), 120)
+    # NOTE: Every instance of the pool runs unoserver on two ports from LIBREOFFICE_PORT, the executable must run
+    #       with a Python which has the uno module (python3-uno).
+    LIBREOFFICE_PORT = _str_to_int(os.getenv('LIBREOFFICE_PORT'), 2003)
+    LIBREOFFICE_UNOSERVER_EXEC = os.getenv('LIBREOFFICE_UNOSERVER_EXEC', 'unoserver')
+    # NOTE: The conversions requested within the window are converted together, 0 disables the batches.
+    #       A prefork worker process runs one task at a time, so the batches are only enabled by default with
+    #       a pool of threads.
+    LIBREOFFICE_BATCH_WINDOW_MS = _str_to_int(
+        os.getenv('LIBREOFFICE_BATCH_WINDOW_MS'), 100 if worker_pool in ('threads', 'gevent', 'eventlet') else 0
+    )
+    LIBREOFFICE_BATCH_MAX_FILES = _str_to_int(os.getenv('LIBREOFFICE_BATCH_MAX_FILES'), 10)
 
     # Flask Swagger UI
     SWAGGER_URL = os.getenv('SWAGGER_URL', '/docs')
@@ -107,6 +146,15 @@ class Config(metaclass=Meta):
     FLASK_RESTFUL_PREFIX = '/api'
     RESTX_MASK_SWAGGER = False
 
+    # Search
+    SEARCH_DEFAULT_COUNT_STRATEGY = os.getenv('SEARCH_DEFAULT_COUNT_STRATEGY', 'exact')
+    SEARCH_COUNT_CACHE_TTL = _str_to_int(os.getenv('SEARCH_COUNT_CACHE_TTL'), 60)
+    SEARCH_COUNT_CACHE_SIZE = _str_to_int(os.getenv('SEARCH_COUNT_CACHE_SIZE'), 1024)
+    SEARCH_SHAPE_CACHE_SIZE = _str_to_int(os.getenv('SEARCH_SHAPE_CACHE_SIZE'), 256)
+    SEARCH_STREAM_CHUNK_SIZE = _str_to_int(os.getenv('SEARCH_STREAM_CHUNK_SIZE'), 1000)
+    # NOTE: Search shapes are recorded for `flask index-advisor` only if a file is set
+    SEARCH_SHAPES_FILE = os.getenv('SEARCH_SHAPES_FILE')
+
     # Mr Developer
     HOME = os.getenv('HOME')
     LOGGING_LEVEL = _str_to_int(os.getenv('LOGGING_LEVEL'), logging.INFO)
@@ -122,6 +170,25 @@ class Config(metaclass=Meta):
     TEMPLATES_FOLDER = f'{SRC_DIRECTORY}/templates'
 
     RESET_TOKEN_EXPIRES = 86_400  # 1 day = 86400
+    DOCUMENT_DOWNLOAD_TOKEN_EXPIRES = _str_to_int(os.getenv('DOCUMENT_DOWNLOAD_TOKEN_EXPIRES'), 604_800)  # 7 days
+    # NOTE: Uploaded documents are streamed to the storage, the upload is stopped once it exceeds this size
+    DOCUMENT_MAX_SIZE = _str_to_int(os.getenv('DOCUMENT_MAX_SIZE'), 524_288_000)  # 500 MiB
+    # NOTE: "local" writes every uploaded document in a new file, "content_addressed" stores every content once
+    #       under its SHA-256 digest. The blobs default to the "blobs" folder of STORAGE_DIRECTORY.
+    DOCUMENT_STORAGE = os.getenv('DOCUMENT_STORAGE', 'local')
+    DOCUMENT_BLOBS_DIRECTORY = os.getenv('DOCUMENT_BLOBS_DIRECTORY')
+    # NOTE: "x-sendfile" or "x-accel-redirect" offload the downloads of the local documents to the front server,
+    #       empty sends them from the application. nginx maps DOCUMENT_X_ACCEL_PREFIX, an internal location, to
+    #       DOCUMENT_X_ACCEL_ROOT, which defaults to STORAGE_DIRECTORY.
+    DOCUMENT_DOWNLOAD_OFFLOAD = os.getenv('DOCUMENT_DOWNLOAD_OFFLOAD', '')
+    DOCUMENT_X_ACCEL_PREFIX = os.getenv('DOCUMENT_X_ACCEL_PREFIX', '/internal-storage')
+    DOCUMENT_X_ACCEL_ROOT = os.getenv('DOCUMENT_X_ACCEL_ROOT')
+    # NOTE: The documents of Google Drive are streamed to the clients in chunks of this size
+    GDRIVE_DOWNLOAD_CHUNK_SIZE = _str_to_int(os.getenv('GDRIVE_DOWNLOAD_CHUNK_SIZE'), 1_048_576)  # 1 MiB
+    # NOTE: The downloaded Google Drive documents are cached on disk up to this size, 0 disables the cache.
+    #       The cache defaults to the "gdrive_cache" folder of STORAGE_DIRECTORY.
+    GDRIVE_CACHE_MAX_SIZE = _str_to_int(os.getenv('GDRIVE_CACHE_MAX_SIZE'), 0)
+    GDRIVE_CACHE_DIRECTORY = os.getenv('GDRIVE_CACHE_DIRECTORY')
 
     ALLOWED_CONTENT_TYPES = {
         'application/json',
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from app.helpers.otp_token import OTPTokenManager
+from app.utils.constants import DOCUMENT_DOWNLOAD_TOKEN_SALT
+from tests.factories.document_factory import LocalDocumentFactory
+
+from ._base_documents_test import _TestBaseDocumentEndpoints
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestDownloadDocumentEndpoint(_TestBaseDocumentEndpoints):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.otp_token_manager = OTPTokenManager(
+            secret_key=self.app.config.get('SECRET_KEY'),
+            salt=DOCUMENT_DOWNLOAD_TOKEN_SALT,
+            expiration=self.app.config.get('DOCUMENT_DOWNLOAD_TOKEN_EXPIRES'),
+        )
+
+    def test_download_document_with_token(self):
+        document = LocalDocumentFactory(
+            deleted_at=None,
+            created_at=datetime.now(UTC) - timedelta(days=1),
+        )
+        token = self.otp_token_manager.generate_token(document.id)
+
+        response = self.client.get(f'{self.base_path}/download/{token}', json={}, exp_code=200)
+
+        assert response.headers.get('Content-Disposition').startswith('attachment')
+        with open(document.get_filepath(), 'rb') as fp:
+            assert response.get_data() == fp.read()
+
+    def test_download_document_with_invalid_token(self):
+        document = LocalDocumentFactory(deleted_at=None)
+        reset_password_token = OTPTokenManager(
+            secret_key=self.app.config.get('SECRET_KEY'),
+            salt=self.app.config.get('SECURITY_PASSWORD_SALT'),
+            expiration=self.app.config.get('RESET_TOKEN_EXPIRES'),
+        ).generate_token(document.id)
+
+        self.client.get(f'{self.base_path}/download/{reset_password_token}', json={}, exp_code=400)
+
+    def test_download_deleted_document_with_token(self):
+        document = LocalDocumentFactory(deleted_at=datetime.now(UTC))
+        token = self.otp_token_manager.generate_token(document.id)
+
+        response = self.client.get(f'{self.base_path}/download/{token}', json={}, exp_code=404)
+
+        assert response.get_json() == {'message': 'Document not found'}
+
+    def test_download_unknown_document_with_token(self):
+        token = self.otp_token_manager.generate_token(self.faker.pyint(min_value=1_000_000))
+
+        response = self.client.get(f'{self.base_path}/download/{token}', json={}, exp_code=404)
+
+        assert response.get_json() == {'message': 'Document not found'}
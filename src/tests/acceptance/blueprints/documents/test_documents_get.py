@@ -75,6 +75,27 @@ class TestGetDocumentEndpoint(_TestBaseDocumentEndpoints):
 
         assert isinstance(response.get_data(), bytes)
 
+    def test_get_local_document_file_content_is_conditional(self):
+        document = LocalDocumentFactory(deleted_at=None, content_hash='a' * 64)
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/octet-stream'}
+
+        response = self.client.get(
+            f'{self.base_path}/{document.id}',
+            headers=self.build_headers(extra_headers={**headers, 'Range': 'bytes=0-3'}),
+        )
+
+        assert response.status_code == 206
+        assert response.get_data() == b'%PDF'
+        assert response.headers['ETag'] == f'"{document.content_hash}"'
+
+        response = self.client.get(
+            f'{self.base_path}/{document.id}',
+            headers=self.build_headers(extra_headers={**headers, 'If-None-Match': response.headers['ETag']}),
+            exp_code=304,
+        )
+
+        assert response.get_data() == b''
+
     @pytest.mark.parametrize(
         'request_args, send_file_kwargs',
         [
@@ -1,7 +1,9 @@
+import json
 from datetime import datetime, timedelta, UTC
 
 import pytest
 
+from app.extensions import db
 from tests.factories.document_factory import LocalDocumentFactory
 
 from ._base_documents_test import _TestBaseDocumentEndpoints
@@ -59,3 +61,34 @@ class TestSearchDocumentEndpoint(_TestBaseDocumentEndpoints):
         self.client.post(
             self.endpoint, json={}, headers=self.build_headers(user_email=user_email), exp_code=expected_status
         )
+
+    def test_search_query_count_does_not_depend_on_page_size(self):
+        LocalDocumentFactory.create_batch(5, deleted_at=None)
+        headers = self.build_headers()
+        payloads = [{'items_per_page': 1, 'count': 'none'}, {'items_per_page': 6, 'count': 'none'}]
+
+        query_counts = []
+        for payload in payloads:
+            db.session.expire_all()
+            with self.count_queries() as queries:
+                response = self.client.post(self.endpoint, json=payload, headers=headers, exp_code=200)
+            assert len(response.get_json()['data']) == payload['items_per_page']
+            query_counts.append(len(queries))
+
+        assert query_counts[0] == query_counts[1]
+
+    def test_search_streams_ndjson(self):
+        LocalDocumentFactory.create_batch(3, deleted_at=None)
+        payload = {'items_per_page': 4, 'order': [{'field_name': 'id', 'sorting': 'asc'}]}
+
+        json_response = self.client.post(self.endpoint, json=payload, headers=self.build_headers(), exp_code=200)
+        response = self.client.post(
+            self.endpoint,
+            json=payload,
+            headers=self.build_headers(extra_headers={'Accept': 'application/x-ndjson'}),
+            exp_code=200,
+        )
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert response.mimetype == 'application/x-ndjson'
+        assert [row['id'] for row in rows] == [row['id'] for row in json_response.get_json()['data']]
@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from celery import states
 
+from app.celery.progress_store import get_progress_store
 from tests.base.base_api_test import TestBaseApi
 
 
@@ -61,6 +62,70 @@ class TestTaskEndpoint(TestBaseApi):
         assert json_data.get('total'), mock_task_result.info.get('total')
         assert json_data.get('result') is None
 
+    @patch('app.blueprints.tasks.AsyncResult')
+    @pytest.mark.parametrize(
+        'excel_state, callback_state, expected_state, expected_current, expected_total',
+        [
+            (states.STARTED, states.PENDING, states.STARTED, 4, 7),
+            (states.FAILURE, states.PENDING, states.FAILURE, 4, 5),
+            (states.SUCCESS, states.PENDING, states.STARTED, 6, 7),
+            (states.SUCCESS, states.SUCCESS, states.SUCCESS, 7, 7),
+        ],
+    )
+    def test_check_task_status_aggregates_children(
+        self, mock_async_result, excel_state, callback_state, expected_state, expected_current, expected_total
+    ):
+        excel_current = 1 if excel_state == states.STARTED else 3
+        task_results = {
+            'parent': MagicMock(
+                state=states.SUCCESS,
+                info={'status': 'Task dispatched!', 'children': ['word', 'excel'], 'callback': 'callback'},
+            ),
+            'word': MagicMock(state=states.SUCCESS, info={'current': 3, 'total': 3, 'result': {'id': 1}}),
+            'excel': MagicMock(state=excel_state, info={'current': excel_current, 'total': 3}),
+            'callback': MagicMock(state=callback_state, info={}),
+        }
+        mock_async_result.side_effect = task_results.get
+
+        response = self.client.get(f'{self.base_path}/status/parent', json={}, headers=self.build_headers())
+        json_data = response.get_json()
+
+        assert json_data.get('state') == expected_state
+        assert json_data.get('current') == expected_current
+        assert json_data.get('total') == expected_total
+        assert json_data.get('result')[0] == {'id': 1}
+
+    @patch('app.blueprints.tasks.AsyncResult')
+    def test_check_task_status_aggregates_finished_export(self, mock_async_result):
+        task_results = {
+            'parent': MagicMock(
+                state=states.SUCCESS,
+                info={'status': 'Task dispatched!', 'children': ['word', 'excel'], 'callback': 'callback'},
+            ),
+            'word': MagicMock(
+                state=states.SUCCESS, info={'current': 3, 'total': 3, 'status': 'Task completed!', 'result': {'id': 1}}
+            ),
+            'excel': MagicMock(
+                state=states.SUCCESS, info={'current': 3, 'total': 3, 'status': 'Task completed!', 'result': {'id': 2}}
+            ),
+            # NOTE: send_email_with_attachments_task returns True
+            'callback': MagicMock(state=states.SUCCESS, info=True),
+        }
+        mock_async_result.side_effect = task_results.get
+
+        response = self.client.get(f'{self.base_path}/status/parent', json={}, headers=self.build_headers())
+
+        assert response.get_json() == {
+            'state': states.SUCCESS,
+            'current': 7,
+            'total': 7,
+            'result': [{'id': 1}, {'id': 2}],
+        }
+
+        response = self.client.get(f'{self.base_path}/status/callback', json={}, headers=self.build_headers())
+
+        assert response.get_json() == {'state': states.SUCCESS, 'current': 1, 'total': 1, 'result': True}
+
     @patch('app.blueprints.tasks.AsyncResult')
     @pytest.mark.parametrize(
         'user_email_attr, expected_status',
@@ -84,3 +149,58 @@ class TestTaskEndpoint(TestBaseApi):
             headers=self.build_headers(user_email=user_email),
             exp_code=expected_status,
         )
+
+    @patch('app.blueprints.tasks.AsyncResult')
+    def test_check_task_status_sends_polling_hints(self, mock_async_result):
+        mock_async_result.return_value = MagicMock(state=states.STARTED, info={'current': 5, 'total': 10})
+        url = f'{self.base_path}/status/{uuid.uuid4()}'
+
+        response = self.client.get(url, json={}, headers=self.build_headers())
+
+        assert response.headers['Retry-After'] == str(self.app.config['TASK_STATUS_RETRY_AFTER'])
+        assert response.headers['ETag']
+
+        response = self.client.get(
+            url,
+            json={},
+            headers=self.build_headers(extra_headers={'If-None-Match': response.headers['ETag']}),
+            exp_code=304,
+        )
+
+        assert not response.data
+
+        mock_async_result.return_value = MagicMock(state=states.SUCCESS, info={'current': 10, 'total': 10})
+        response = self.client.get(
+            url, json={}, headers=self.build_headers(extra_headers={'If-None-Match': response.headers['ETag']})
+        )
+
+        assert 'Retry-After' not in response.headers
+
+    def test_check_tasks_status_reads_the_progress_store(self):
+        self.app.config['TASK_PROGRESS_STORE'] = 'memory'
+        store = get_progress_store(self.app)
+        task_ids = [str(uuid.uuid4()) for _ in range(3)]
+        store.save(task_ids[0], {'state': states.STARTED, 'current': 5, 'total': 10})
+        store.save(task_ids[1], {'state': states.SUCCESS, 'current': 1, 'total': 1, 'result': 'task_completed'})
+
+        with patch('app.blueprints.tasks.AsyncResult') as mock_async_result:
+            response = self.client.get(
+                f'{self.base_path}/status?task_ids={task_ids[0]}&task_ids={task_ids[1]}&task_ids={task_ids[2]}',
+                json={},
+                headers=self.build_headers(),
+            )
+
+        mock_async_result.assert_not_called()
+        assert response.get_json()['data'] == [
+            {'task_id': task_ids[0], 'state': states.STARTED, 'current': 5, 'total': 10},
+            {'task_id': task_ids[1], 'state': states.SUCCESS, 'current': 1, 'total': 1, 'result': 'task_completed'},
+            {'task_id': task_ids[2], 'state': states.PENDING, 'current': 0, 'total': 1},
+        ]
+        assert response.headers['Retry-After']
+
+    def test_check_tasks_status_with_invalid_task_ids(self):
+        response = self.client.get(
+            f'{self.base_path}/status?task_ids=../tasks', json={}, headers=self.build_headers(), exp_code=422
+        )
+
+        assert response.get_json()['message'] == {'task_ids': {'0': ['String does not match expected pattern.']}}
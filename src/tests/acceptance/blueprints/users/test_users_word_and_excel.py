@@ -11,8 +11,10 @@ class TestWordAndExcelUserEndpoint(_TestBaseUserEndpointsTest):
 
     def test_export_excel_and_word_endpoint(self):
         response = self.client.post(self.endpoint, json={}, headers=self.build_headers(), exp_code=202)
+        json_response = response.get_json()
 
-        assert isinstance(response.get_json(), dict)
+        assert json_response.get('task')
+        assert json_response.get('url')
 
     @pytest.mark.parametrize(
         'user_email_attr, expected_status',
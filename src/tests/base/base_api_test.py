@@ -1,7 +1,9 @@
 import os
+from contextlib import contextmanager
 
 import pytest
 from flask import current_app
+from flask_sqlalchemy.record_queries import get_recorded_queries
 
 from tests.factories.user_factory import AdminUserFactory, TeamLeaderUserFactory, WorkerUserFactory
 
@@ -34,3 +36,14 @@ class TestBaseApi:
         token = response.get_json()['access_token']
 
         return {current_app.config['SECURITY_TOKEN_AUTHENTICATION_HEADER']: f'Bearer {token}'} | extra_headers
+
+    @staticmethod
+    @contextmanager
+    def count_queries():
+        """Collect the SQL queries executed inside the block."""
+        queries = []
+        start = len(get_recorded_queries())
+
+        yield queries
+
+        queries.extend(get_recorded_queries()[start:])
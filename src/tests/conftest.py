@@ -17,6 +17,7 @@ from werkzeug.test import TestResponse
 from app.extensions import db
 from config import TestConfig
 from tests.fixtures.gdrive_mocks import *  # pylint: disable=wildcard-import,unused-wildcard-import
+from tests.fixtures.smtp_server import smtp_server  # noqa: F401 # pylint: disable=unused-import
 
 logger = logging.getLogger(__name__)
 
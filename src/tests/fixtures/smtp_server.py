@@ -0,0 +1,161 @@
+"""Local SMTP server which stands in for the real one in tests and benchmarks.
+
+It understands the commands sent by `smtplib` (without STARTTLS and AUTH)
+and keeps the received messages in memory.
+
+"""
+
+# pylint: disable=unused-argument
+import socket
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pytest
+
+
+@dataclass
+class LocalSMTPMessage:
+    mail_from: str
+    rcpt_to: list[str] = field(default_factory=list)
+    data: bytes = b''
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    server: 'LocalSMTPServer'
+
+    def _reply(self, reply: str) -> None:
+        self.wfile.write(f'{reply}\r\n'.encode('ascii'))
+
+    def _read_data(self) -> bytes:
+        lines = []
+
+        while (line := self.rfile.readline()) not in (b'.\r\n', b''):
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+        return b''.join(lines)
+
+    def handle(self) -> None:
+        self.server.add_connection(self.connection)
+        # NOTE: Stands for the network round trips, the TLS handshake and the login of a real server
+        time.sleep(self.server.connection_delay)
+        self._reply('220 localhost Local SMTP server')
+        message = None
+
+        while line := self.rfile.readline():
+            command = line.decode('ascii', errors='replace').strip()
+            verb, argument = command[:4].upper(), command[5:]
+
+            if verb == 'EHLO':
+                self._reply('250-localhost')
+                self._reply('250 8BITMIME')
+            elif verb == 'HELO':
+                self._reply('250 localhost')
+            elif verb == 'MAIL':
+                message = LocalSMTPMessage(mail_from=argument.split(':', 1)[1].strip('<> '))
+                self._reply('250 OK')
+            elif verb == 'RCPT' and message:
+                message.rcpt_to.append(argument.split(':', 1)[1].strip('<> '))
+                self._reply('250 OK')
+            elif verb == 'DATA' and message:
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                message.data = self._read_data()
+                self.server.messages.append(message)
+                message = None
+                self._reply('250 OK')
+            elif verb == 'RSET':
+                message = None
+                self._reply('250 OK')
+            elif verb == 'NOOP':
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                break
+            else:
+                self._reply('502 Command not implemented')
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """SMTP server which runs in a thread of the current process.
+
+    Parameters
+    ----------
+    connection_delay : float
+        Seconds the server waits before greeting a new connection.
+
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, connection_delay: float = 0.0):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.connection_delay = connection_delay
+        self.messages = []
+        self.total_connections = 0
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def add_connection(self, connection: socket.socket) -> None:
+        with self._connections_lock:
+            self._connections.append(connection)
+            self.total_connections += 1
+
+    def drop_connections(self) -> None:
+        """Close the open connections as a server does with the idle ones."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def start(self) -> 'LocalSMTPServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.drop_connections()
+        self.server_close()
+
+    def __enter__(self) -> 'LocalSMTPServer':
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+@pytest.fixture
+def smtp_server(app):
+    """Send the emails of the application to a local SMTP server."""
+    mail_state = app.extensions['mail']
+
+    with LocalSMTPServer() as server:
+        local_settings = {
+            'server': '127.0.0.1',
+            'port': server.port,
+            'username': None,
+            'password': None,
+            'use_tls': False,
+            'use_ssl': False,
+            'suppress': False,
+        }
+        settings = {name: getattr(mail_state, name) for name in local_settings}
+
+        for name, value in local_settings.items():
+            setattr(mail_state, name, value)
+
+        yield server
+
+    for name, value in settings.items():
+        setattr(mail_state, name, value)
@@ -1,7 +1,11 @@
 import pytest
-from flask import current_app
+import sqlalchemy as sa
+from flask import current_app, g
+from flask.globals import app_ctx
+from sqlalchemy import text
 
 from app.celery import ContextTask
+from app.extensions import db
 
 
 # pylint: disable=attribute-defined-outside-init
@@ -25,3 +29,53 @@ class TestCeleryAppContext:
         dummy_task()
 
         assert result_holder['app_name'] == self.app.name
+
+    def test_tasks_reuse_the_worker_app_context(self):
+        self.app.config['CELERY_REUSE_APP_CONTEXT'] = True
+        app_contexts = []
+
+        @self.celery.task(base=ContextTask)
+        def dummy_task():
+            assert 'task_value' not in g
+            g.task_value = True
+            app_contexts.append(app_ctx._get_current_object())
+            return True
+
+        assert dummy_task.apply().get()
+        assert dummy_task.apply().get()
+
+        assert app_contexts[0] is app_contexts[1]
+        assert app_contexts[0].app is self.app
+        app_contexts[0].pop()
+
+    def test_session_is_removed_after_every_task(self):
+        self.app.config['CELERY_REUSE_APP_CONTEXT'] = True
+        sessions = []
+
+        @self.celery.task(base=ContextTask)
+        def dummy_task():
+            sessions.append(db.session())
+            return db.session.execute(text('SELECT 1')).scalar()
+
+        assert dummy_task.apply().get() == 1
+        assert not db.session.registry.has()
+        assert dummy_task.apply().get() == 1
+
+        assert sessions[0] is not sessions[1]
+        app_ctx._get_current_object().pop()
+
+    def test_session_is_rolled_back_after_every_task(self):
+        self.app.config['CELERY_REUSE_APP_CONTEXT'] = True
+        session_events = []
+
+        @self.celery.task(base=ContextTask)
+        def dummy_task():
+            session = db.session()
+            sa.event.listen(session, 'after_commit', lambda _: session_events.append('commit'))
+            sa.event.listen(session, 'after_rollback', lambda _: session_events.append('rollback'))
+            return db.session.execute(text('SELECT 1')).scalar()
+
+        assert dummy_task.apply().get() == 1
+
+        assert session_events == ['rollback']
+        app_ctx._get_current_object().pop()
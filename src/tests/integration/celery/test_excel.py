@@ -63,3 +63,27 @@ class TestExcelTask:
         assert len(query.filter().all()) == 1
         assert os.path.exists(query.first().get_filepath())
         assert self.local_storage.get_filesize(query.first().get_filepath()) > 0
+
+    def test_export_user_data_in_excel_task_exports_requested_page(self):
+        users = UserFactory.create_batch(5)
+        request_data = {
+            'search': [],
+            'order': [
+                {'field_name': 'id', 'sorting': 'asc'},
+            ],
+            'items_per_page': 2,
+            'page_number': 2,
+        }
+        kwargs = {'created_by': users[0].id, 'request_data': request_data}
+
+        @self.celery.task(bind=True, base=ContextTask)
+        def test_task(self, created_by, request_data):
+            return export_user_data_in_excel_task_logic(self, created_by, request_data)
+
+        task_result = test_task.apply(kwargs=kwargs).get()
+        db.session.commit()
+
+        # NOTE: 2 users + Excel header row + save data in database
+        assert task_result.get('current') == 4, task_result
+        assert task_result.get('total') == 4, task_result
+        assert task_result.get('status') == 'Task completed!', task_result
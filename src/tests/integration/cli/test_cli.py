@@ -24,3 +24,29 @@ class TestCli:
         assert isinstance(resources['Role'], DefaultMeta)
         assert isinstance(resources['User'], DefaultMeta)
         assert isinstance(resources['UsersRolesThrough'], DefaultMeta)
+
+    def test_index_advisor_reports_suggested_indexes(self, runner, tmp_path):
+        shapes_file = tmp_path / 'search_shapes.jsonl'
+        shapes_file.write_text(
+            '{"order": [["created_at", "desc"], ["id", "asc"]], "search": [["name", "eq"]], "table": "users"}\n'
+            '{"order": [["id", "asc"]], "search": [["created_by", "eq"]], "table": "documents"}\n'
+        )
+
+        result = runner.invoke(args=['index-advisor', '--shapes-file', str(shapes_file)])
+
+        assert result.exit_code == 0, result.exception
+        assert 'suggested index: (name, created_at)' in result.output
+        assert 'served by an existing index' in result.output
+
+    def test_index_advisor_explains_date_and_boolean_filters(self, runner, tmp_path):
+        shapes_file = tmp_path / 'search_shapes.jsonl'
+        shapes_file.write_text(
+            '{"order": [["id", "asc"]], "search": [["birth_date", "gte"], ["active", "eq"]], "table": "users"}\n'
+            '{"order": [["id", "asc"]], "search": [["created_at", "between"], ["deleted_at", "in"]], "table": "roles"}\n'
+        )
+
+        result = runner.invoke(args=['index-advisor', '--shapes-file', str(shapes_file)])
+
+        assert result.exit_code == 0, result.exception
+        assert 'suggested index: (active, birth_date)' in result.output
+        assert 'explain: ' in result.output
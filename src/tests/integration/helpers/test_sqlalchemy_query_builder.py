@@ -36,6 +36,15 @@ class _TestBaseCreateSearchQuery:
         return {item[0] for item in query.all()}
 
 
+def _build_bound_clause(clause_helper, field: sa.orm.InstrumentedAttribute, operator: str, value: any):
+    bind_values = clause_helper.get_bind_values(operator, value)
+    bind_params = [
+        sa.bindparam(f'search_0_{i}', bind_value, type_=field.type, expanding=isinstance(bind_value, list))
+        for i, bind_value in enumerate(bind_values)
+    ]
+    return clause_helper.build_bound_clause(field, operator, bind_params)
+
+
 class TestOrderByClauseBuilder:
     @pytest.fixture(autouse=True)
     def setup(self, app):
@@ -82,6 +91,54 @@ class TestOrderByClauseBuilder:
         assert query.first().name == expected_name
 
 
+class TestKeysetPagination:
+    @pytest.fixture(autouse=True)
+    def setup(self, app):
+        self.query_builder = rqo.SQLAlchemyQueryBuilder()
+        self.docs = LocalDocumentFactory.create_batch(7, name='Invoice')
+        self.docs.extend(LocalDocumentFactory.create_batch(3, name='Contract'))
+        db.session.flush()
+
+    def _walk_pages(self, request_data: dict) -> list[int]:
+        ids, cursor = [], None
+
+        while True:
+            page_request = {**request_data, 'after': cursor} if cursor else request_data
+            query = self.query_builder.paginate_query(Document, db.session.query(Document), page_request)
+            records = query.all()
+            ids.extend(record.id for record in records)
+
+            cursor = self.query_builder.get_next_cursor(Document, records, page_request)
+            if cursor is None:
+                return ids
+
+    @pytest.mark.parametrize(
+        'order',
+        [
+            [{'field_name': 'id', 'sorting': 'asc'}],
+            [{'field_name': 'name', 'sorting': 'asc'}],
+            [{'field_name': 'name', 'sorting': 'desc'}, {'field_name': 'id', 'sorting': 'desc'}],
+            [{'field_name': 'deleted_at', 'sorting': 'desc'}],
+        ],
+        ids=['id asc', 'name asc', 'name desc/id desc', 'nullable column'],
+    )
+    def test_cursor_pages_match_full_ordering(self, order):
+        sort_keys = rqo.KeysetClauseBuilder.get_sort_keys({'order': order}, Document)
+        expected_ids = [
+            doc.id
+            for doc in db.session.query(Document).order_by(*rqo.KeysetClauseBuilder.build_order_by(Document, sort_keys))
+        ]
+
+        assert self._walk_pages({'order': order, 'items_per_page': 3}) == expected_ids
+
+    def test_cursor_does_not_match_order_raises_value_error(self):
+        cursor = rqo.KeysetClauseBuilder().encode_cursor(self.docs[0], [('id', 'asc')])
+        request_data = {'order': [{'field_name': 'name', 'sorting': 'asc'}], 'after': cursor}
+
+        with pytest.raises(ValueError, match="Cursor doesn't match the requested order"):
+            self.query_builder.paginate_query(Document, db.session.query(Document), request_data)
+
+
 class TestStringQueryClauseBuilder:
     @pytest.fixture(autouse=True)
     def setup(self, app):
@@ -143,7 +200,7 @@ class TestStringQueryClauseBuilder:
         field, operator, value = test_case_builder(user, user_2, user_3)
         expected = expected_clause_builder(user, user_2, user_3)
 
-        clause = self.string_clause_helper.build_clause_with_multiple_values(field, operator, value)
+        clause = _build_bound_clause(self.string_clause_helper, field, operator, value)
 
         assert clause.operator == expected.operator, f'Operator mismatch for: {description}'
 
@@ -283,7 +340,7 @@ class TestComparisonClauseBuilder:
         field, operator, value = test_case_builder(doc, doc_2, doc_3)
         expected = expected_clause_builder(doc, doc_2, doc_3)
 
-        clause = self.operator_clause_helper.build_clause_with_multiple_values(field, operator, value)
+        clause = _build_bound_clause(self.operator_clause_helper, field, operator, value)
         assert clause.operator == expected.operator, f'Operator mismatch for: {description}'
 
         if description == 'multiple values':
@@ -389,7 +446,7 @@ class TestComparisonClauseBuilder:
         field, operator, value = test_case_builder(doc, doc_2, doc_3)
         expected = expected_clause_builder(doc, doc_2, doc_3)
 
-        clause = self.operator_clause_helper.build_clause_with_multiple_values(field, operator, value)
+        clause = _build_bound_clause(self.operator_clause_helper, field, operator, value)
         assert clause.operator == expected.operator, f'Operator mismatch for: {description}'
 
         if description == 'multiple values':
@@ -691,3 +748,37 @@ class TestSQLAlchemyQueryBuilderNoStrings(_TestBaseCreateSearchQuery):
         expected_ids = expected_ids_fn(self, doc, doc_2, doc_3)
         query = self.rqo.create_search_query(Document, db.session.query(Document.id), request_data)
         assert self._get_values(query) == expected_ids, description
+
+
+class TestSearchShapeCache(_TestBaseCreateSearchQuery):
+    @pytest.fixture(autouse=True)
+    def setup(self, app):
+        self.shape_cache = rqo.SearchShapeCache()
+        self.rqo = rqo.SQLAlchemyQueryBuilder(shape_cache=self.shape_cache)
+
+    def test_same_search_shape_reuses_clause_with_new_values(self):
+        user = UserFactory(name='Alice')
+        user_2 = UserFactory(name='John')
+
+        query = self.rqo.create_search_query(
+            User, db.session.query(User.id), self._search_request('name', 'eq', 'Alice')
+        )
+        query_2 = self.rqo.create_search_query(
+            User, db.session.query(User.id), self._search_request('name', 'eq', 'John')
+        )
+
+        assert self._get_values(query) == {user.id}
+        assert self._get_values(query_2) == {user_2.id}
+        assert self.shape_cache.cache_info()['hits'] == 1
+        assert self.shape_cache.cache_info()['misses'] == 1
+
+    def test_different_value_arity_is_a_different_shape(self):
+        user = UserFactory(name='Alice')
+        user_2 = UserFactory(name='John')
+        request_data = self._search_request('name', 'eq', f'Alice{rqo.REQUEST_QUERY_DELIMITER}John')
+
+        self.rqo.create_search_query(User, db.session.query(User.id), self._search_request('name', 'eq', 'Alice'))
+        query = self.rqo.create_search_query(User, db.session.query(User.id), request_data)
+
+        assert self._get_values(query) == {user.id, user_2.id}
+        assert self.shape_cache.cache_info()['misses'] == 2
@@ -0,0 +1,106 @@
+import pytest
+from flask_sqlalchemy.query import Query as FlaskQuery
+
+from app.extensions import db
+from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
+from app.models import Document
+from app.repositories.count_strategies import (
+    CACHED_COUNT,
+    CachedCountStrategy,
+    COUNT_STRATEGIES,
+    ESTIMATED_COUNT,
+    EXACT_COUNT,
+    get_count_strategy,
+    NO_COUNT,
+)
+from app.repositories.document import DocumentRepository
+from tests.factories.document_factory import LocalDocumentFactory
+
+
+# pylint: disable=attribute-defined-outside-init, unused-argument
+class TestCountStrategies:
+    @pytest.fixture(autouse=True)
+    def setup(self, app):
+        self.repository = DocumentRepository()
+        LocalDocumentFactory.create_batch(4, name='Invoice', deleted_at=None)
+        LocalDocumentFactory.create_batch(2, name='Contract', deleted_at=None)
+        db.session.flush()
+        COUNT_STRATEGIES[CACHED_COUNT].invalidate()
+
+        self.search = [{'field_name': 'name', 'field_operator': 'eq', 'field_value': 'Invoice'}]
+        self.records_total = db.session.query(Document).count()
+
+    @staticmethod
+    def _build_query(search: list = None) -> FlaskQuery:
+        return SQLAlchemyQueryBuilder().create_search_query(
+            Document, db.session.query(Document), {'search': search or []}
+        )
+
+    def test_exact_count(self):
+        result = self.repository.get(search=self.search, count=EXACT_COUNT)
+
+        assert result['records_total'] == self.records_total
+        assert result['records_filtered'] == 4
+
+    def test_exact_count_without_filters_reuses_total(self):
+        result = self.repository.get(count=EXACT_COUNT)
+
+        assert result['records_total'] == result['records_filtered'] == self.records_total
+
+    def test_estimated_count(self):
+        result = self.repository.get(search=self.search, count=ESTIMATED_COUNT)
+
+        assert isinstance(result['records_total'], int)
+        assert result['records_filtered'] is None
+
+    def test_cached_count_is_invalidated_on_flush(self):
+        result = self.repository.get(search=self.search, count=CACHED_COUNT)
+        assert result['records_filtered'] == 4
+
+        LocalDocumentFactory(name='Invoice', deleted_at=None)
+        db.session.flush()
+
+        result = self.repository.get(search=self.search, count=CACHED_COUNT)
+        assert result['records_total'] == self.records_total + 1
+        assert result['records_filtered'] == 5
+
+    def test_cached_count_discards_least_recently_used_searches(self):
+        count_strategy = CachedCountStrategy(maxsize=2)
+        contract_search = [{'field_name': 'name', 'field_operator': 'eq', 'field_value': 'Contract'}]
+
+        count_strategy.count(Document, self._build_query(self.search))
+        count_strategy.count(Document, self._build_query(contract_search))
+        count_strategy.count(Document, self._build_query(self.search))
+        count_strategy.count(Document, self._build_query())
+
+        assert list(count_strategy._cache) == [
+            count_strategy._get_cache_key(Document, self._build_query(self.search)),
+            count_strategy._get_cache_key(Document, self._build_query()),
+        ]
+
+    def test_cached_count_purges_expired_searches(self, app):
+        count_strategy = CachedCountStrategy()
+        app.config['SEARCH_COUNT_CACHE_TTL'] = 0
+
+        count_strategy.count(Document, self._build_query(self.search))
+        count_strategy.count(Document, self._build_query())
+
+        assert len(count_strategy._cache) == 0
+
+    def test_no_count_uses_has_more(self):
+        first_page = self.repository.get(search=self.search, count=NO_COUNT, items_per_page=3)
+        second_page = self.repository.get(
+            search=self.search, count=NO_COUNT, items_per_page=3, after=first_page['next_cursor']
+        )
+
+        assert first_page['records_total'] is None
+        assert first_page['records_filtered'] is None
+        assert len(first_page['records']) == 3
+        assert first_page['has_more'] is True
+        assert len(second_page['records']) == 1
+        assert second_page['has_more'] is False
+        assert second_page['next_cursor'] is None
+
+    def test_unknown_count_strategy_raises_value_error(self):
+        with pytest.raises(ValueError, match='Unsupported count strategy: fake'):
+            get_count_strategy('fake')
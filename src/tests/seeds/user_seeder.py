@@ -51,7 +51,7 @@ class Seeder(FactorySeeder, RepositorySeeder):
     def seed(self, rows: int = None) -> None:
         rows = rows or self._default_rows
         self._create_admin_user()
-        roles = {role.name: role for role in self.role_repository.get()['query']}
+        roles = {role.name: role for role in self.role_repository.get()['records']}
 
         for _ in range(rows):
             user_role = roles.get(choice(list(ROLES)))
@@ -0,0 +1,71 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.celery.dataset import get_user_export_record, get_user_export_records, UserExportDataset
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestUserExportDataset(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.directory_path = str(tmp_path)
+        self.user_data = {
+            'id': self.faker.pyint(),
+            'name': self.faker.first_name(),
+            'last_name': self.faker.last_name(),
+            'email': self.faker.email(),
+            'birth_date': self.faker.date(),
+            'roles': [{'name': 'team_leader', 'label': 'Team leader'}],
+            'created_at': self.faker.iso8601(),
+            'updated_at': self.faker.iso8601(),
+            'deleted_at': None,
+        }
+
+    def test_user_data_is_flattened_in_a_record(self):
+        record = get_user_export_record(self.user_data)
+
+        assert 'id' not in record
+        assert 'roles' not in record
+        assert record['role_name'] == 'team_leader'
+        assert record['role_label'] == 'Team leader'
+        assert record['email'] == self.user_data['email']
+        assert record['deleted_at'] is None
+
+    def test_records_are_read_as_they_were_written(self):
+        records = [get_user_export_record(dict(self.user_data, email=self.faker.email())) for _ in range(3)]
+
+        dataset = UserExportDataset.create(iter(records), self.directory_path)
+
+        assert dataset.total_rows == 3
+        assert os.listdir(self.directory_path) == [os.path.basename(dataset.filepath)]
+        assert list(UserExportDataset.from_dict(dataset.to_dict())) == records
+
+        dataset.delete()
+
+        assert not os.path.exists(dataset.filepath)
+
+    def test_temporary_file_is_deleted_if_the_records_fail(self):
+        def records():
+            yield get_user_export_record(self.user_data)
+            raise RuntimeError('Lost connection to the database')
+
+        with pytest.raises(RuntimeError):
+            UserExportDataset.create(records(), self.directory_path)
+
+        assert os.listdir(self.directory_path) == []
+
+    @patch('app.celery.dataset.iter_user_export_records', autospec=True)
+    @patch('app.celery.dataset.count_user_export_records', autospec=True)
+    def test_records_of_a_dataset_do_not_run_the_search(self, mock_count_records, mock_iter_records):
+        record = get_user_export_record(self.user_data)
+        dataset = UserExportDataset.create([record], self.directory_path)
+
+        total_rows, records = get_user_export_records({}, dataset.to_dict())
+
+        assert total_rows == 1
+        assert list(records) == [record]
+        mock_count_records.assert_not_called()
+        mock_iter_records.assert_not_called()
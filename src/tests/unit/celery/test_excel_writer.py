@@ -0,0 +1,47 @@
+from unittest.mock import call, MagicMock
+
+import pytest
+
+from app.celery.excel.writer import DEFAULT_FORMATS, ExcelSheetWriter, MAX_COLUMN_WIDTH
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestExcelSheetWriter(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.workbook = MagicMock()
+        self.workbook.add_format.side_effect = lambda properties: properties
+        self.worksheet = MagicMock()
+        self.writer = ExcelSheetWriter(self.workbook, self.worksheet)
+
+    def test_formats_are_declared_once(self):
+        self.writer.write_header(['Name', 'Email'])
+        for _ in range(10):
+            self.writer.write_row(['John', 'john@example.com'])
+
+        assert self.workbook.add_format.call_count == len(DEFAULT_FORMATS)
+        assert self.writer.total_rows == 11
+
+    def test_rows_are_zebra_striped_after_the_header(self):
+        self.writer.write_header(['Name'])
+        self.writer.write_row(['John'])
+        self.writer.write_row(['Jane'])
+
+        assert self.worksheet.write_row.call_args_list == [
+            call(0, 0, ['Name'], DEFAULT_FORMATS['header']),
+            call(1, 0, ['John'], DEFAULT_FORMATS['zebra']),
+            call(2, 0, ['Jane'], None),
+        ]
+
+    def test_close_fits_each_column_to_its_longest_cell(self):
+        self.writer.write_header(['Name', 'Email', 'Bio'])
+        self.writer.write_row(['John', 'john@example.com', 'x' * 300])
+        self.writer.write_row(['Alexandra', None, 1])
+        self.writer.close()
+
+        assert self.worksheet.set_column.call_args_list == [
+            call(0, 0, len('Alexandra') + 1),
+            call(1, 1, len('john@example.com') + 1),
+            call(2, 2, MAX_COLUMN_WIDTH),
+        ]
@@ -0,0 +1,53 @@
+import pytest
+from flask_mail import Message
+
+from app.celery.mail import SMTPConnectionPool
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestSMTPConnectionPool(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, app, smtp_server):
+        self.now = 0.0
+        self.smtp_server = smtp_server
+        self.pool = SMTPConnectionPool(app.extensions['mail'], size=1, keepalive=30, clock=lambda: self.now)
+        yield
+        self.pool.close()
+
+    def _get_message(self) -> Message:
+        return Message(
+            subject=self.faker.sentence(), sender=self.faker.email(), recipients=[self.faker.email()], body='Hello'
+        )
+
+    def test_messages_are_sent_over_one_connection(self):
+        messages = [self._get_message() for _ in range(5)]
+
+        assert self.pool.send_many(messages) == 5
+        self.pool.send(self._get_message())
+
+        assert len(self.smtp_server.messages) == 6
+        assert self.smtp_server.total_connections == 1
+        assert [message.rcpt_to for message in self.smtp_server.messages[:5]] == [
+            message.recipients for message in messages
+        ]
+
+    def test_idle_connection_closed_by_the_server_is_replaced(self):
+        self.pool.send(self._get_message())
+        self.smtp_server.drop_connections()
+        self.now = 30
+
+        self.pool.send(self._get_message())
+
+        assert len(self.smtp_server.messages) == 2
+        assert self.smtp_server.total_connections == 2
+
+    def test_message_is_sent_again_if_the_server_closes_the_connection(self):
+        self.pool.send(self._get_message())
+        self.smtp_server.drop_connections()
+
+        self.pool.send(self._get_message())
+
+        assert len(self.smtp_server.messages) == 2
+        assert self.smtp_server.total_connections == 2
+        assert self.pool.total_connections == 2
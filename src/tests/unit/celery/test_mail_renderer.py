@@ -0,0 +1,51 @@
+import pytest
+from flask import Flask, render_template
+
+from app.celery.mail import MailTemplateRenderer
+from config import Config
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestMailTemplateRenderer(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.app = Flask(__name__, template_folder=Config.TEMPLATES_FOLDER)
+        self.renderer = MailTemplateRenderer(self.app.jinja_env)
+
+        with self.app.app_context():
+            yield
+
+    def test_every_mail_template_is_precompiled(self):
+        assert self.renderer.precompile() == 4
+        assert set(self.renderer._templates) == {  # pylint: disable=protected-access
+            'mails/attachments.html',
+            'mails/base.html',
+            'mails/new_user.html',
+            'mails/reset_password.html',
+        }
+
+    def test_render_is_the_same_as_render_template(self):
+        context = {'name': self.faker.first_name(), 'login_url': self.faker.url()}
+        self.renderer.precompile()
+
+        assert self.renderer.render('mails/new_user.html', **context) == render_template(
+            'mails/new_user.html', **context
+        )
+
+    def test_text_only_blocks_are_rendered_once(self):
+        template = self.renderer.get_template('mails/new_user.html')
+
+        assert list(template.blocks['title'](template.new_context())) == ['Welcome to flask_api!']
+        assert template.blocks['title'].__name__ == '<lambda>'
+        assert template.blocks['body'].__name__ != '<lambda>'
+
+    def test_render_latency_is_recorded_per_template(self):
+        for _ in range(3):
+            self.renderer.render('mails/new_user.html', name=self.faker.first_name(), login_url=self.faker.url())
+
+        stats = self.renderer.get_stats()
+
+        assert list(stats) == ['mails/new_user.html']
+        assert stats['mails/new_user.html']['renders'] == 3
+        assert 0 < stats['mails/new_user.html']['mean_ms'] <= stats['mails/new_user.html']['max_ms']
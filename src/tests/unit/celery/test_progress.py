@@ -0,0 +1,66 @@
+from unittest.mock import call, MagicMock
+
+import pytest
+from celery import states
+
+from app.celery.progress import ProgressReporter
+from app.celery.progress_store import MemoryProgressStore
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestProgressReporter(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.now = 0.0
+        self.task = MagicMock()
+        self.progress = ProgressReporter(self.task, total=1000, min_interval=0.5, min_step=1, clock=lambda: self.now)
+
+    def _get_reported_progress(self) -> list[int]:
+        return [kwargs['meta']['current'] for _, kwargs in self.task.update_state.call_args_list]
+
+    def test_updates_are_coalesced_by_time(self):
+        for current in range(100):
+            self.progress.update(current)
+
+        assert self._get_reported_progress() == [0]
+
+        self.now = 0.5
+        self.progress.update(100)
+
+        assert self._get_reported_progress() == [0, 100]
+
+    def test_updates_are_coalesced_by_percentage_step(self):
+        self.progress.update(0)
+        self.now = 10
+        self.progress.update(5)
+        self.now = 20
+        self.progress.update(10)
+
+        assert self._get_reported_progress() == [0, 10]
+
+    def test_final_progress_is_always_reported(self):
+        self.progress.update(0)
+        self.progress.update(1000)
+
+        assert self.task.update_state.call_args_list[-1] == call(
+            state=states.STARTED, meta={'current': 1000, 'total': 1000}
+        )
+
+    def test_flush_reports_the_coalesced_progress(self):
+        self.progress.update(0)
+        self.progress.update(999)
+
+        assert self.progress.flush() is True
+        assert self.progress.flush() is False
+        assert self._get_reported_progress() == [0, 999]
+        assert self.progress.total_updates == 2
+
+    def test_progress_is_written_in_the_store(self):
+        store = MemoryProgressStore()
+        progress = ProgressReporter(self.task, total=10, store=store)
+
+        progress.update(10)
+
+        self.task.update_state.assert_not_called()
+        assert store.get(self.task.request.id) == {'state': states.STARTED, 'current': 10, 'total': 10}
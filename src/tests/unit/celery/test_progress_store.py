@@ -0,0 +1,88 @@
+import os
+import time
+
+import pytest
+from celery import states
+
+from app.celery.progress_store import FileProgressStore, get_finished_task_status, MemoryProgressStore
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestProgressStores(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.now = 0.0
+        self.directory_path = str(tmp_path)
+        self.stores = {
+            'memory': MemoryProgressStore(expires=60, clock=lambda: self.now),
+            'file': FileProgressStore(self.directory_path, expires=60, clock=lambda: self.now),
+        }
+
+    @pytest.mark.parametrize('store_name', ['memory', 'file'])
+    def test_statuses_are_read_in_one_call(self, store_name):
+        store = self.stores[store_name]
+        task_ids = [self.faker.uuid4() for _ in range(3)]
+
+        for current, task_id in enumerate(task_ids[:2]):
+            store.save(task_id, {'state': states.STARTED, 'current': current, 'total': 2})
+
+        assert store.get_many(task_ids) == {
+            task_ids[0]: {'state': states.STARTED, 'current': 0, 'total': 2},
+            task_ids[1]: {'state': states.STARTED, 'current': 1, 'total': 2},
+            task_ids[2]: None,
+        }
+
+    @pytest.mark.parametrize('store_name', ['memory', 'file'])
+    def test_expired_statuses_are_not_read(self, store_name):
+        store = self.stores[store_name]
+        task_id = self.faker.uuid4()
+        store.save(task_id, {'state': states.SUCCESS, 'current': 1, 'total': 1})
+
+        # NOTE: The file store compares the modification time of the file with its clock
+        self.now = time.time() + 60
+
+        assert store.get(task_id) is None
+
+    @pytest.mark.parametrize('store_name', ['memory', 'file'])
+    def test_unknown_statuses_are_not_read_without_expiration(self, store_name):
+        store = self.stores[store_name]
+        store.expires = 0
+        task_id = self.faker.uuid4()
+
+        assert store.get_many([task_id, task_id]) == {task_id: None}
+
+    def test_file_store_deletes_expired_statuses(self):
+        store = self.stores['file']
+        task_ids = [self.faker.uuid4() for _ in range(2)]
+
+        for task_id in task_ids:
+            store.save(task_id, {'state': states.SUCCESS, 'current': 1, 'total': 1})
+
+        os.utime(os.path.join(self.directory_path, f'{task_ids[0]}.json'), (0, 0))
+        self.now = 60
+
+        assert store.delete_expired() == 1
+        assert os.listdir(self.directory_path) == [f'{task_ids[1]}.json']
+
+    def test_file_store_ignores_task_ids_which_are_not_filenames(self):
+        store = self.stores['file']
+
+        assert store.get('../tasks') is None
+
+        with pytest.raises(ValueError):
+            store.save('../tasks', {'state': states.STARTED})
+
+    @pytest.mark.parametrize(
+        'result, state, expected_status',
+        [
+            ({'current': 5, 'total': 5, 'result': {'id': 1}}, states.SUCCESS, {'current': 5, 'total': 5}),
+            (3, states.SUCCESS, {'current': 1, 'total': 1, 'result': 3}),
+            (ValueError(), states.FAILURE, {'current': 1, 'total': 1}),
+        ],
+    )
+    def test_finished_task_status_is_built_from_its_result(self, result, state, expected_status):
+        task_status = get_finished_task_status(result, state)
+
+        assert task_status['state'] == state
+        assert expected_status.items() <= task_status.items()
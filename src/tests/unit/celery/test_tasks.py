@@ -2,7 +2,11 @@
 
 from unittest.mock import MagicMock, patch
 
+from celery.backends.cache import CacheBackend
+from flask import Flask
+
 from app.celery.tasks import create_word_and_excel_documents_task
+from app.extensions import celery
 from tests.base.base_unit_test import TestBaseUnit
 
 
@@ -11,11 +15,21 @@ class TestCeleryTasks(TestBaseUnit):
     @patch('app.celery.tasks.export_user_data_in_word_task.s', autospec=True)
     @patch('app.celery.tasks.export_user_data_in_excel_task.s', autospec=True)
     @patch('app.celery.tasks.send_email_with_attachments_task.s', autospec=True)
+    @patch('app.celery.tasks.delete_user_export_dataset_task.si', autospec=True)
     @patch('app.celery.tasks.chord', autospec=True)
-    @patch('app.celery.tasks.chain', autospec=True)
-    @patch('app.celery.tasks.db.session')
+    @patch('app.celery.tasks.group', autospec=True)
+    @patch('app.celery.tasks.iter_user_export_records', autospec=True)
+    @patch('app.celery.tasks.UserExportDataset', autospec=True)
     def test_unit_create_word_and_excel_documents_tasks_are_called(
-        self, mock_session, mock_chain, mock_chord, mock_callback_sig, mock_excel_task_sig, mock_word_task_sig
+        self,
+        mock_dataset_class,
+        mock_iter_records,
+        mock_group,
+        mock_chord,
+        mock_delete_dataset_sig,
+        mock_callback_sig,
+        mock_excel_task_sig,
+        mock_word_task_sig,
     ):
         user_id = 1
         request_data = {
@@ -27,33 +41,73 @@ class TestCeleryTasks(TestBaseUnit):
             'page_number': 1,
         }
         kwargs = {'created_by': user_id, 'request_data': request_data, 'to_pdf': 1}
+        dataset = {'filepath': '/tmp/dataset.jsonl', 'total_rows': 1}
+        mock_dataset_class.create.return_value.to_dict.return_value = dataset
 
-        mock_chain_sig = MagicMock()
-        mock_chain.return_value = mock_chain_sig
+        mock_group_sig = MagicMock()
+        mock_group.return_value = mock_group_sig
 
         mock_chord_instance = MagicMock()
         mock_chord.return_value = mock_chord_instance
 
-        mock_callback_result = MagicMock()
-        mock_callback_result.successful.return_value = True
-        mock_callback_result.get.return_value = 'Success'
-        mock_callback_result.result = 'Success'
-        mock_callback_result.traceback = None
-        mock_chord_instance.return_value = mock_callback_result
+        mock_word_task_sig.return_value.freeze.return_value.id = 'word-task-id'
+        mock_excel_task_sig.return_value.freeze.return_value.id = 'excel-task-id'
+        mock_callback_sig.return_value.freeze.return_value.id = 'callback-task-id'
+
+        app = Flask(__name__)
+        app.config['STORAGE_DIRECTORY'] = '/tmp/storage'
 
-        create_word_and_excel_documents_task.apply(kwargs=kwargs).get()
+        # NOTE: The task reads the storage directory from the application context pushed by the worker
+        with app.app_context():
+            result = create_word_and_excel_documents_task.apply(kwargs=kwargs).get()
 
-        mock_word_task_sig.assert_called_once_with(user_id, request_data, 1)
-        mock_excel_task_sig.assert_called_once_with(user_id, request_data)
+        mock_iter_records.assert_called_once_with(request_data)
+        mock_dataset_class.create.assert_called_once_with(mock_iter_records.return_value, '/tmp/storage')
+        mock_word_task_sig.assert_called_once_with(user_id, request_data, 1, dataset)
+        mock_excel_task_sig.assert_called_once_with(user_id, request_data, dataset)
         mock_callback_sig.assert_called_once_with()
+        assert mock_delete_dataset_sig.call_count == 2
+        mock_delete_dataset_sig.assert_called_with(dataset)
+        mock_callback_sig.return_value.link.assert_called_once_with(mock_delete_dataset_sig.return_value)
+        mock_callback_sig.return_value.link_error.assert_called_once_with(mock_delete_dataset_sig.return_value)
 
-        mock_chain.assert_called_once_with(
+        mock_group.assert_called_once_with(
             mock_word_task_sig.return_value,
             mock_excel_task_sig.return_value,
         )
-        mock_chord.assert_called_once_with(mock_chain_sig)
+        mock_chord.assert_called_once_with(mock_group_sig)
         mock_chord_instance.assert_called_once_with(mock_callback_sig.return_value)
 
-        assert mock_callback_result.successful.called
-        mock_session.commit.assert_called_once()
-        mock_session.close.assert_called_once()
+        mock_chord_instance.return_value.get.assert_not_called()
+        assert result == {
+            'status': 'Task dispatched!',
+            'children': ['word-task-id', 'excel-task-id'],
+            'callback': 'callback-task-id',
+        }
+
+    @patch('app.celery.tasks.delete_user_export_dataset_task.apply_async', autospec=True)
+    @patch('app.celery.tasks.chord', autospec=True)
+    @patch('app.celery.tasks.iter_user_export_records', autospec=True)
+    @patch('app.celery.tasks.UserExportDataset', autospec=True)
+    def test_unit_dataset_is_deleted_when_a_document_fails(
+        self, mock_dataset_class, mock_iter_records, mock_chord, mock_delete_dataset_apply_async
+    ):
+        dataset = {'filepath': '/tmp/dataset.jsonl', 'total_rows': 1}
+        mock_dataset_class.create.return_value.to_dict.return_value = dataset
+        app = Flask(__name__)
+        app.config['STORAGE_DIRECTORY'] = '/tmp/storage'
+
+        with app.app_context():
+            create_word_and_excel_documents_task.apply(args=[1, {}, 0]).get()
+
+        callback_task = mock_chord.return_value.call_args.args[0]
+        backend = CacheBackend(app=celery, backend='memory')
+
+        # NOTE: The chord fails its callback when a document fails, so the errbacks of the callback are called
+        try:
+            raise RuntimeError('The Word document failed')
+        except RuntimeError as exc:
+            backend.chord_error_from_stack(callback_task, exc)
+
+        mock_delete_dataset_apply_async.assert_called_once()
+        assert mock_delete_dataset_apply_async.call_args.args[0] == (dataset,)
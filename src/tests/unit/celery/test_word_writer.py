@@ -0,0 +1,47 @@
+import io
+import zipfile
+
+import docx
+import pytest
+
+from app.celery.word.writer import WordTableWriter
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestWordTableWriter(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.rows = [
+            ['Name', 'Last Name', 'Email', 'Notes'],
+            [self.faker.first_name(), self.faker.last_name(), self.faker.email(), 'N/D'],
+            [' leading space', 'tab\tseparated', 'line\nbreak', ''],
+            ['<&>', None, 1, 2.5],
+        ]
+
+    @staticmethod
+    def _get_document_xml(document: docx.Document) -> bytes:
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return zipfile.ZipFile(buffer).read('word/document.xml')
+
+    def test_document_is_the_same_as_writing_cell_by_cell(self):
+        expected_document = docx.Document()
+        table = expected_document.add_table(rows=len(self.rows), cols=len(self.rows[0]))
+        for i, row in enumerate(self.rows):
+            for j, cell in enumerate(row):
+                table.rows[i].cells[j].text = str(cell)
+
+        document = docx.Document()
+        writer = WordTableWriter(document, len(self.rows[0]))
+        for row in self.rows:
+            writer.write_row(row)
+
+        assert writer.total_rows == len(self.rows)
+        assert self._get_document_xml(document) == self._get_document_xml(expected_document)
+
+    def test_row_with_wrong_number_of_cells_raises_value_error(self):
+        writer = WordTableWriter(docx.Document(), 4)
+
+        with pytest.raises(ValueError, match='The row has 2 cells but the table has 4 columns'):
+            writer.write_row(['John', 'Doe'])
@@ -0,0 +1,61 @@
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, sqlite
+
+from app.cli.index_advisor_cli import IndexAdvisorCli
+from app.helpers.sqlalchemy_query_builder import SQLAlchemyQueryBuilder
+from app.models import Document, Role, User
+from tests.base.base_unit_test import TestBaseUnit
+
+
+class TestIndexAdvisorCli(TestBaseUnit):
+    @pytest.mark.parametrize(
+        'db_model, shape, expected_columns',
+        [
+            (
+                User,
+                {'search': [['name', 'eq']], 'order': [['created_at', 'desc'], ['id', 'asc']]},
+                ('name', 'created_at'),
+            ),
+            (
+                User,
+                {'search': [['birth_date', 'gte'], ['genre', 'in']], 'order': [['id', 'asc']]},
+                ('genre', 'birth_date'),
+            ),
+            (
+                Document,
+                {'search': [['name', 'contains'], ['storage_type', 'eq']], 'order': [['id', 'asc']]},
+                ('storage_type',),
+            ),
+            (
+                Role,
+                {'search': [['description', 'eq']], 'order': [['id', 'asc']]},
+                (),
+            ),
+        ],
+        ids=['equality and sort', 'equality before range', 'like is not indexable', 'text is not indexable'],
+    )
+    def test_suggest_index(self, db_model, shape, expected_columns):
+        assert IndexAdvisorCli.suggest_index(db_model, shape) == expected_columns
+
+    @pytest.mark.parametrize('dialect', [mysql.dialect(), sqlite.dialect()], ids=['mysql', 'sqlite'])
+    def test_sample_values_are_rendered_as_literals(self, dialect):
+        search = [['birth_date', 'gte'], ['created_at', 'between'], ['deleted_at', 'in'], ['active', 'eq']]
+        request_data = {
+            'search': [
+                {
+                    'field_name': field_name,
+                    'field_operator': field_operator,
+                    'field_value': IndexAdvisorCli._get_sample_value(getattr(User, field_name), field_operator),
+                }
+                for field_name, field_operator in search
+            ],
+        }
+
+        query = SQLAlchemyQueryBuilder().create_search_query(User, sa.select(User), request_data)
+        sql = str(query.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+        assert "users.birth_date >= '2000-01-01'" in sql
+        assert "users.created_at BETWEEN '2000-01-01 00:00:00" in sql
+        assert "users.deleted_at IN ('2000-01-01 00:00:00" in sql
+        assert 'users.active = ' in sql
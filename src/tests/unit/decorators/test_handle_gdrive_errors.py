@@ -51,3 +51,22 @@ class TestHandleGDriveErrors(TestBaseUnit):
             return 'OK'
 
         assert fake_method() == 'OK'
+
+    def test_generator_error_raises_while_it_is_iterated(self):
+        @handle_gdrive_errors()
+        def fake_generator():
+            yield b'chunk'
+            raise mock_http_error(404)
+
+        chunks = fake_generator()
+
+        assert next(chunks) == b'chunk'
+        with pytest.raises(GoogleDriveNotFoundError):
+            next(chunks)
+
+    def test_successful_generator_yields_values(self):
+        @handle_gdrive_errors()
+        def fake_generator():
+            yield from [b'a', b'b']
+
+        assert list(fake_generator()) == [b'a', b'b']
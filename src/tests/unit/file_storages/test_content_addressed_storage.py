@@ -0,0 +1,83 @@
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from app.exceptions import FileEmptyError, FileTooLargeError
+from app.file_storages import ContentAddressedStorage
+from tests.base.base_unit_test import TestBaseUnit
+
+
+class _UnseekableStream(io.BytesIO):
+    def seekable(self):
+        return False
+
+
+# pylint: disable=attribute-defined-outside-init, unused-argument
+class TestContentAddressedStorage(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.storage = ContentAddressedStorage(str(tmp_path / 'blobs'))
+        self.storage.chunk_size = 4
+        self.content = os.urandom(10)
+        self.digest = hashlib.sha256(self.content).hexdigest()
+
+    def _get_stored_files(self) -> list:
+        return sorted(
+            os.path.relpath(os.path.join(dirpath, filename), self.storage.directory_path)
+            for dirpath, _, filenames in os.walk(self.storage.directory_path)
+            for filename in filenames
+        )
+
+    @pytest.mark.parametrize('stream_class', [io.BytesIO, _UnseekableStream], ids=['seekable', 'unseekable'])
+    def test_save_blob_stores_the_content_under_its_digest(self, stream_class):
+        assert self.storage.save_blob(stream_class(self.content)) == (self.digest, 10)
+
+        assert self._get_stored_files() == [f'{self.digest[:2]}/{self.digest}']
+        with open(self.storage.get_blob_path(self.digest), 'rb') as f:
+            assert f.read() == self.content
+
+    @pytest.mark.parametrize('stream_class', [io.BytesIO, _UnseekableStream], ids=['seekable', 'unseekable'])
+    def test_save_blob_does_not_write_a_known_content_again(self, stream_class):
+        self.storage.save_blob(io.BytesIO(self.content))
+        blob_path = self.storage.get_blob_path(self.digest)
+        os.utime(blob_path, (0, 0))
+        inode = os.stat(blob_path).st_ino
+
+        assert self.storage.save_blob(stream_class(self.content)) == (self.digest, 10)
+
+        assert self._get_stored_files() == [f'{self.digest[:2]}/{self.digest}']
+        assert os.stat(blob_path).st_ino == inode
+        assert os.stat(blob_path).st_mtime > 0
+
+    @pytest.mark.parametrize('stream_class', [io.BytesIO, _UnseekableStream], ids=['seekable', 'unseekable'])
+    def test_save_blob_stops_once_the_file_is_too_large(self, stream_class):
+        with pytest.raises(FileTooLargeError):
+            self.storage.save_blob(stream_class(self.content), max_size=8)
+
+        assert not self._get_stored_files()
+
+    def test_save_blob_raises_if_the_stream_is_empty(self):
+        with pytest.raises(FileEmptyError):
+            self.storage.save_blob(_UnseekableStream())
+
+        assert not self._get_stored_files()
+
+    def test_delete_orphan_blobs(self):
+        orphan_digest, _ = self.storage.save_blob(io.BytesIO(b'orphan'))
+        recent_digest, _ = self.storage.save_blob(io.BytesIO(b'recent'))
+        self.storage.save_blob(io.BytesIO(self.content))
+        expired_at = time.time() - 7200
+
+        for digest in (orphan_digest, self.digest):
+            os.utime(self.storage.get_blob_path(digest), (expired_at, expired_at))
+
+        assert self.storage.delete_orphan_blobs({self.digest}, min_age=3600, dry_run=True) == [orphan_digest]
+        assert self.storage.blob_exists(orphan_digest)
+
+        assert self.storage.delete_orphan_blobs({self.digest}, min_age=3600) == [orphan_digest]
+        assert not self.storage.blob_exists(orphan_digest)
+        assert self.storage.blob_exists(recent_digest)
+        assert self.storage.blob_exists(self.digest)
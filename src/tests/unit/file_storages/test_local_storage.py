@@ -1,8 +1,9 @@
+import io
 import os
 
 import pytest
 
-from app.exceptions import FileEmptyError
+from app.exceptions import FileEmptyError, FileTooLargeError
 from app.file_storages import LocalStorage
 from config import TestConfig
 from tests.base.base_unit_test import TestBaseUnit
@@ -35,6 +36,41 @@ class TestLocalStorage(TestBaseUnit):
 
         assert not os.path.exists(self.file_path)
 
+    def test_save_stream_writes_the_file_in_chunks(self):
+        self.local_storage.chunk_size = 4
+        content = os.urandom(10)
+
+        assert self.local_storage.save_stream(io.BytesIO(content), str(self.file_path), max_size=10) == 10
+        assert os.listdir(self.file_path.parent) == [self.file_path.name]
+        with open(self.file_path, 'rb') as f:
+            assert f.read() == content
+
+    def test_save_stream_stops_once_the_file_is_too_large(self):
+        self.local_storage.chunk_size = 4
+
+        with pytest.raises(FileTooLargeError):
+            self.local_storage.save_stream(io.BytesIO(os.urandom(10)), str(self.file_path), max_size=8)
+
+        assert not os.listdir(self.file_path.parent)
+
+    def test_save_stream_does_not_replace_the_file_if_the_stream_is_empty(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(b'data')
+
+        with pytest.raises(FileEmptyError):
+            self.local_storage.save_stream(io.BytesIO(), str(self.file_path), override=True)
+
+        assert os.listdir(self.file_path.parent) == [self.file_path.name]
+        with open(self.file_path, 'rb') as f:
+            assert f.read() == b'data'
+
+    def test_save_stream_raises_if_file_exists_and_no_override(self):
+        with open(self.file_path, 'wb') as f:
+            f.write(b'data')
+
+        with pytest.raises(FileExistsError):
+            self.local_storage.save_stream(io.BytesIO(b'other'), str(self.file_path))
+
     def test_copy_file(self):
         src = str(self.file_path)
         dst = str(self.file_path) + '_copy'
@@ -0,0 +1,149 @@
+import io
+
+import pytest
+from flask import Flask
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+
+from app.helpers.document_download import send_document
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestSendDocument(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.app = Flask(__name__)
+        self.app.config.update(
+            STORAGE_DIRECTORY=str(tmp_path),
+            DOCUMENT_DOWNLOAD_OFFLOAD='',
+            DOCUMENT_X_ACCEL_PREFIX='/internal-storage',
+            DOCUMENT_X_ACCEL_ROOT=None,
+        )
+        self.filepath = tmp_path / 'documents' / 'example 1.pdf'
+        self.filepath.parent.mkdir()
+        self.filepath.write_bytes(b'0123456789')
+
+    def _send_document(self, headers: dict = None, path_or_file=None, **kwargs):
+        with self.app.test_request_context(headers=headers or {}):
+            response = send_document(path_or_file or str(self.filepath), 'application/pdf', **kwargs)
+            response.direct_passthrough = False
+            return response
+
+    def test_send_document_with_its_etag(self):
+        response = self._send_document(etag='digest')
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] == '"digest"'
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        assert response.get_data() == b'0123456789'
+
+    def test_send_document_not_modified(self):
+        response = self._send_document({'If-None-Match': '"digest"'}, etag='digest')
+
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize(
+        'headers, expected_status, expected_data',
+        [
+            ({'Range': 'bytes=2-4'}, 206, b'234'),
+            ({'Range': 'bytes=2-4', 'If-Range': '"digest"'}, 206, b'234'),
+            ({'Range': 'bytes=2-4', 'If-Range': '"old_digest"'}, 200, b'0123456789'),
+        ],
+        ids=['range', 'range of the same document', 'range of a document which changed'],
+    )
+    def test_send_document_range(self, headers, expected_status, expected_data):
+        response = self._send_document(headers, etag='digest')
+
+        assert response.status_code == expected_status
+        assert response.get_data() == expected_data
+
+    def test_send_file_object_range(self):
+        response = self._send_document({'Range': 'bytes=0-1'}, path_or_file=io.BytesIO(b'hello'))
+
+        assert response.status_code == 206
+        assert response.get_data() == b'he'
+
+    @pytest.mark.parametrize(
+        'offload, expected_header, expected_value',
+        [
+            ('x-sendfile', 'X-Sendfile', lambda filepath: str(filepath)),
+            ('x-accel-redirect', 'X-Accel-Redirect', lambda filepath: '/internal-storage/documents/example%201.pdf'),
+        ],
+    )
+    def test_send_document_offloaded(self, offload, expected_header, expected_value):
+        self.app.config['DOCUMENT_DOWNLOAD_OFFLOAD'] = offload
+
+        response = self._send_document({'Range': 'bytes=2-4'}, etag='digest', as_attachment=1, download_name='a.pdf')
+
+        assert response.status_code == 200
+        assert response.headers[expected_header] == expected_value(self.filepath)
+        assert response.headers['ETag'] == '"digest"'
+        assert response.headers['Content-Disposition'] == 'attachment; filename=a.pdf'
+        assert response.get_data() == b''
+
+        response = self._send_document({'If-None-Match': '"digest"'}, etag='digest')
+
+        assert response.status_code == 304
+        assert expected_header not in response.headers
+
+    def test_send_document_outside_of_the_x_accel_root(self, tmp_path):
+        self.app.config.update(
+            DOCUMENT_DOWNLOAD_OFFLOAD='x-accel-redirect', DOCUMENT_X_ACCEL_ROOT=str(tmp_path / 'blobs')
+        )
+
+        response = self._send_document(etag='digest')
+
+        assert 'X-Accel-Redirect' not in response.headers
+        assert response.get_data() == b'0123456789'
+
+    def _stream_content(self, start: int, end: int | None):
+        self.streamed_ranges.append((start, end))
+        content = b'0123456789'[start : None if end is None else end + 1]
+
+        for i in range(0, len(content), 4):
+            yield content[i : i + 4]
+
+    @pytest.mark.parametrize(
+        'headers, expected_status, expected_range, expected_data',
+        [
+            ({}, 200, (0, None), b'0123456789'),
+            ({'Range': 'bytes=2-4'}, 206, (2, 4), b'234'),
+            ({'Range': 'bytes=2-4', 'If-Range': '"digest"'}, 206, (2, 4), b'234'),
+            ({'Range': 'bytes=2-4', 'If-Range': '"old_digest"'}, 200, (0, None), b'0123456789'),
+        ],
+        ids=['whole document', 'range', 'range of the same document', 'range of a document which changed'],
+    )
+    def test_send_stream(self, headers, expected_status, expected_range, expected_data):
+        self.streamed_ranges = []
+
+        with self.app.test_request_context(headers=headers):
+            response = send_document(
+                mimetype='application/pdf', etag='digest', stream_content=self._stream_content, size=10
+            )
+            data = b''.join(response.response)
+
+        assert response.status_code == expected_status
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        assert response.content_length == len(expected_data)
+        assert self.streamed_ranges == [expected_range]
+        assert data == expected_data
+
+    def test_send_stream_not_modified(self):
+        self.streamed_ranges = []
+
+        with self.app.test_request_context(headers={'If-None-Match': '"digest"'}):
+            response = send_document(
+                mimetype='application/pdf', etag='digest', stream_content=self._stream_content, size=10
+            )
+
+        assert response.status_code == 304
+        assert not self.streamed_ranges
+
+    def test_send_stream_range_not_satisfiable(self):
+        self.streamed_ranges = []
+
+        with self.app.test_request_context(headers={'Range': 'bytes=20-'}):
+            with pytest.raises(RequestedRangeNotSatisfiable):
+                send_document(mimetype='application/pdf', stream_content=self._stream_content, size=10)
+
+        assert not self.streamed_ranges
@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.exceptions import GoogleDriveError
+from app.helpers.gdrive_cache import GoogleDriveCache
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestGoogleDriveCache(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.cache = GoogleDriveCache(str(tmp_path), max_size=250)
+        self.revision = self.cache.get_revision({'modifiedTime': '2026-10-18T10:00:00.000Z', 'md5Checksum': 'md5'})
+        self.total_downloads = 0
+
+    def _get_download(self, content: bytes, delay: float = 0):
+        def download():
+            self.total_downloads += 1
+
+            for i in range(0, len(content), 10):
+                time.sleep(delay)
+                yield content[i : i + 10]
+
+        return download
+
+    def _read_through(self, storage_id: str, content: bytes) -> bytes:
+        return b''.join(self.cache.read_through(storage_id, self.revision, self._get_download(content)))
+
+    def test_read_through_downloads_the_file_once(self):
+        assert self._read_through('file_id', b'a' * 100) == b'a' * 100
+        assert self._read_through('file_id', b'a' * 100) == b'a' * 100
+
+        assert self.total_downloads == 1
+        with open(self.cache.get('file_id', self.revision), 'rb') as f:
+            assert f.read() == b'a' * 100
+
+    def test_new_revision_is_not_read_from_the_cache(self):
+        self._read_through('file_id', b'a' * 100)
+        new_revision = self.cache.get_revision({'modifiedTime': '2026-10-18T11:00:00.000Z', 'md5Checksum': 'new_md5'})
+
+        assert self.cache.get('file_id', new_revision) is None
+
+    def test_concurrent_misses_download_the_file_once(self):
+        contents = []
+
+        def read_through():
+            chunks = self.cache.read_through('file_id', self.revision, self._get_download(b'a' * 100, delay=0.005))
+            contents.append(b''.join(chunks))
+
+        threads = [threading.Thread(target=read_through) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert contents == 4 * [b'a' * 100]
+        assert self.total_downloads == 1
+
+    def test_slow_client_does_not_block_the_other_downloads(self):
+        slow_chunks = self.cache.read_through('file_id', self.revision, self._get_download(b'a' * 100))
+        first_chunk = next(slow_chunks)
+
+        assert self._read_through('file_id', b'a' * 100) == b'a' * 100
+        assert self.total_downloads == 1
+        assert first_chunk + b''.join(slow_chunks) == b'a' * 100
+
+    def test_interrupted_client_does_not_interrupt_the_download(self):
+        chunks = self.cache.read_through('file_id', self.revision, self._get_download(b'a' * 100, delay=0.005))
+        next(chunks)
+        chunks.close()
+
+        assert self._read_through('file_id', b'a' * 100) == b'a' * 100
+        assert self.total_downloads == 1
+
+    def test_failed_download_is_not_cached(self):
+        def download():
+            self.total_downloads += 1
+            yield b'a' * 10
+            time.sleep(0.05)
+            raise GoogleDriveError('Unexpected error')
+
+        chunks = self.cache.read_through('file_id', self.revision, download)
+        waiting_chunks = self.cache.read_through('file_id', self.revision, download)
+
+        assert next(chunks) == b'a' * 10
+        with pytest.raises(GoogleDriveError):
+            b''.join(waiting_chunks)
+        with pytest.raises(GoogleDriveError):
+            b''.join(chunks)
+
+        assert self.total_downloads == 1
+        assert self.cache.get('file_id', self.revision) is None
+        assert not [filename for _, _, filenames in os.walk(self.cache.files_directory) for filename in filenames]
+
+    def test_least_recently_read_files_are_evicted(self):
+        self._read_through('file_1', b'a' * 100)
+        self._read_through('file_2', b'b' * 100)
+        os.utime(self.cache.get_filepath('file_1', self.revision), (1, 1))
+        os.utime(self.cache.get_filepath('file_2', self.revision), (2, 2))
+        self.cache.get('file_1', self.revision)
+
+        self._read_through('file_3', b'c' * 100)
+
+        assert self.cache.get('file_1', self.revision) is not None
+        assert self.cache.get('file_2', self.revision) is None
+        assert self.cache.get('file_3', self.revision) is not None
+
+    def test_invalidate(self):
+        self._read_through('file_id', b'a' * 100)
+
+        self.cache.invalidate('file_id')
+
+        assert self.cache.get('file_id', self.revision) is None
+
+    def test_storage_id_not_valid(self):
+        with pytest.raises(ValueError):
+            self.cache.get('../file_id', self.revision)
@@ -0,0 +1,264 @@
+import os
+import signal
+import socket
+import sys
+import textwrap
+import threading
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.helpers.libreoffice import (
+    LibreOfficeBatchConverter,
+    LibreOfficeCrashError,
+    LibreOfficeError,
+    LibreOfficeInstance,
+    LibreOfficePool,
+)
+from tests.base.base_unit_test import TestBaseUnit
+
+_FAKE_UNOSERVER = """\
+import argparse
+from xmlrpc.server import SimpleXMLRPCServer
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--port', type=int)
+args, _ = parser.parse_known_args()
+
+
+def convert(inpath, indata, outpath, *args):
+    if 'broken' in inpath:
+        raise ValueError(f'{inpath} is broken')
+
+    with open(outpath, 'wb') as f:
+        f.write(b'%PDF')
+
+
+with SimpleXMLRPCServer(('127.0.0.1', args.port), allow_none=True, logRequests=False) as server:
+    server.register_function(lambda: {'api': '3'}, 'info')
+    server.register_function(convert, 'convert')
+    server.serve_forever()
+"""
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestLibreOfficePool(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.folder = str(tmp_path)
+        self.source = str(tmp_path / 'users.docx')
+        (tmp_path / 'users.docx').write_bytes(b'docx')
+        self.pool = LibreOfficePool(size=1, profiles_directory=str(tmp_path / 'profiles'), timeout=1)
+
+        yield
+
+        self.pool.close()
+
+    @patch.object(LibreOfficeInstance, 'convert', autospec=True)
+    def test_conversions_reuse_the_idle_instance(self, mock_convert):
+        mock_convert.return_value = f'{self.folder}/users.pdf'
+
+        self.pool.convert_to(self.folder, self.source)
+        self.pool.convert_to(self.folder, self.source)
+
+        instances = {call.args[0] for call in mock_convert.call_args_list}
+        assert len(instances) == 1
+        assert mock_convert.call_count == 2
+
+    @patch.object(LibreOfficeInstance, 'reset', autospec=True)
+    @patch.object(LibreOfficeInstance, 'convert', autospec=True)
+    def test_crashed_conversion_resets_the_instance_and_is_retried(self, mock_convert, mock_reset):
+        mock_convert.side_effect = [LibreOfficeCrashError('crash'), f'{self.folder}/users.pdf']
+
+        assert self.pool.convert_to(self.folder, self.source) == f'{self.folder}/users.pdf'
+        mock_reset.assert_called_once()
+        assert mock_convert.call_count == 2
+
+    def test_missing_source_raises_file_not_found_error(self):
+        with pytest.raises(FileNotFoundError):
+            self.pool.convert_to(self.folder, f'{self.folder}/missing.docx')
+
+    def test_profile_directories_are_not_shared_between_pools(self):
+        other_pool = LibreOfficePool(size=1, profiles_directory=self.pool.profiles_directory)
+
+        try:
+            instances = [
+                self.pool._create_instance(),  # pylint: disable=protected-access
+                other_pool._create_instance(),  # pylint: disable=protected-access
+            ]
+        finally:
+            other_pool.close()
+
+        assert len({instance.profile_directory for instance in instances}) == 2
+        assert abs(instances[0].port - instances[1].port) >= 2
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestLibreOfficeInstances(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.folder = str(tmp_path)
+        executable = tmp_path / 'unoserver'
+        executable.write_text(f'#!{sys.executable}\n{textwrap.dedent(_FAKE_UNOSERVER)}')
+        executable.chmod(0o755)
+
+        self.sources = []
+        for name in ('first', 'second', 'broken'):
+            (tmp_path / f'{name}.docx').write_bytes(b'docx')
+            self.sources.append(str(tmp_path / f'{name}.docx'))
+
+        self.pool = LibreOfficePool(
+            size=1,
+            profiles_directory=str(tmp_path / 'profiles'),
+            timeout=10,
+            port=_get_free_port(),
+            executable=str(executable),
+        )
+
+        yield
+
+        self.pool.close()
+
+    def test_conversions_reuse_the_running_process(self):
+        self.pool.convert_to(self.folder, self.sources[0])
+        instance = self.pool._instances[0]  # pylint: disable=protected-access
+        pid = instance._process.pid  # pylint: disable=protected-access
+
+        assert self.pool.convert_to(self.folder, self.sources[1]) == f'{self.folder}/second.pdf'
+        assert instance._process.pid == pid  # pylint: disable=protected-access
+        with open(f'{self.folder}/second.pdf', 'rb') as f:
+            assert f.read() == b'%PDF'
+
+    def test_dead_process_is_started_again(self):
+        self.pool.convert_to(self.folder, self.sources[0])
+        instance = self.pool._instances[0]  # pylint: disable=protected-access
+        process = instance._process  # pylint: disable=protected-access
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+        assert self.pool.convert_to(self.folder, self.sources[1]) == f'{self.folder}/second.pdf'
+        assert instance._process.pid != process.pid  # pylint: disable=protected-access
+
+    def test_failed_document_only_fails_its_own_conversion(self):
+        results = self.pool.convert_many(self.folder, self.sources)
+
+        assert results[self.sources[0]] == f'{self.folder}/first.pdf'
+        assert results[self.sources[1]] == f'{self.folder}/second.pdf'
+        assert isinstance(results[self.sources[2]], LibreOfficeError)
+        assert not isinstance(results[self.sources[2]], LibreOfficeCrashError)
+
+    def test_close_stops_the_processes(self):
+        self.pool.convert_to(self.folder, self.sources[0])
+        process = self.pool._instances[0]._process  # pylint: disable=protected-access
+
+        self.pool.close()
+
+        assert process.poll() is not None
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestLibreOfficeBatchConverter(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, tmp_path):
+        self.folder = str(tmp_path)
+        self.sources = []
+        for name in ('first', 'second', 'broken'):
+            (tmp_path / f'{name}.docx').write_bytes(b'docx')
+            self.sources.append(str(tmp_path / f'{name}.docx'))
+
+        self.pool = MagicMock(size=1, timeout=1)
+        self.pool.convert_many.side_effect = lambda folder, sources: {
+            source: LibreOfficeError('broken') if 'broken' in source else source.replace('.docx', '.pdf')
+            for source in sources
+        }
+
+    def _convert_concurrently(self, converter: LibreOfficeBatchConverter) -> dict:
+        results = {}
+
+        def convert(source):
+            try:
+                results[source] = converter.convert_to(self.folder, source)
+            except LibreOfficeError as exc:
+                results[source] = exc
+
+        threads = [threading.Thread(target=convert, args=(source,)) for source in self.sources]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_concurrent_conversions_are_converted_in_one_batch(self):
+        converter = LibreOfficeBatchConverter(self.pool, window=0.5, max_files=len(self.sources))
+
+        results = self._convert_concurrently(converter)
+
+        self.pool.convert_many.assert_called_once()
+        assert sorted(self.pool.convert_many.call_args.args[1]) == sorted(self.sources)
+        assert results[self.sources[0]] == self.sources[0].replace('.docx', '.pdf')
+        assert results[self.sources[1]] == self.sources[1].replace('.docx', '.pdf')
+        assert isinstance(results[self.sources[2]], LibreOfficeError)
+
+    def test_documents_with_the_same_name_are_converted_in_different_groups(self):
+        batch = [
+            (self.folder, '/tmp/a/users.docx', MagicMock()),
+            (self.folder, '/tmp/b/users.docx', MagicMock()),
+            (self.folder, '/tmp/b/roles.docx', MagicMock()),
+        ]
+
+        groups = LibreOfficeBatchConverter._group_batch(batch)  # pylint: disable=protected-access
+
+        assert [list(futures) for _, futures in groups] == [
+            ['/tmp/a/users.docx', '/tmp/b/roles.docx'],
+            ['/tmp/b/users.docx'],
+        ]
+
+    def test_batches_are_disabled_without_window(self):
+        converter = LibreOfficeBatchConverter(self.pool, window=0, max_files=10)
+
+        converter.convert_to(self.folder, self.sources[0])
+
+        self.pool.convert_to.assert_called_once_with(self.folder, self.sources[0])
+        self.pool.convert_many.assert_not_called()
+
+    def test_conversion_which_takes_too_long_raises_libreoffice_error(self):
+        self.pool.timeout = 0.1
+        converted = threading.Event()
+        self.pool.convert_many.side_effect = lambda folder, sources: converted.wait(1) and {}
+        converter = LibreOfficeBatchConverter(self.pool, window=0.01, max_files=10)
+
+        try:
+            with pytest.raises(LibreOfficeError, match='did not convert'):
+                converter.convert_to(self.folder, self.sources[0])
+        finally:
+            converted.set()
+            converter.close()
+
+    def test_cancelled_conversions_are_skipped(self):
+        future = Future()
+        future.cancel()
+        converter = LibreOfficeBatchConverter(self.pool, window=0.01, max_files=10)
+
+        converter._convert_batch([(self.folder, self.sources[0], future)])  # pylint: disable=protected-access
+
+        self.pool.convert_many.assert_not_called()
+
+    def test_executor_is_reused_when_the_collector_is_restarted(self):
+        converter = LibreOfficeBatchConverter(self.pool, window=0.01, max_files=10)
+        converter._ensure_collector()  # pylint: disable=protected-access
+        executor = converter._executor  # pylint: disable=protected-access
+
+        converter._collector = None  # pylint: disable=protected-access
+        converter._ensure_collector()  # pylint: disable=protected-access
+
+        assert converter._executor is executor  # pylint: disable=protected-access
+        converter.close()
+        assert converter._executor is None  # pylint: disable=protected-access
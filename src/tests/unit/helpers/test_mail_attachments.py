@@ -0,0 +1,53 @@
+import base64
+import email
+import zipfile
+
+import pytest
+
+from app.helpers.mail_attachments import encode_file, FileAttachmentsMessage, zip_file
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init, unused-argument
+class TestMailAttachments(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self, app, tmp_path):
+        self.tmp_path = tmp_path
+        self.content = self.faker.binary(length=200_000)
+        self.filepath = str(tmp_path / 'users.pdf')
+
+        with open(self.filepath, 'wb') as fp:
+            fp.write(self.content)
+
+    def test_file_is_encoded_in_lines_of_76_characters(self):
+        encoded = encode_file(self.filepath)
+
+        assert encoded == base64.encodebytes(self.content).decode('ascii')
+        assert max(len(line) for line in encoded.splitlines()) == 76
+
+    def test_file_is_compressed_in_a_zip(self):
+        dst = str(self.tmp_path / 'users.zip')
+
+        zip_file(self.filepath, 'users.pdf', dst)
+
+        with zipfile.ZipFile(dst) as zip_fp:
+            assert zip_fp.read('users.pdf') == self.content
+
+    @pytest.mark.parametrize('html', [None, '<p>Hello</p>'])
+    def test_files_are_attached_to_the_email(self, html):
+        msg = FileAttachmentsMessage(
+            subject=self.faker.sentence(), sender=self.faker.email(), recipients=[self.faker.email()], body='Hello'
+        )
+        msg.html = html
+        msg.attach_file(self.filepath, 'users.pdf', 'application/pdf')
+
+        parsed_msg = email.message_from_bytes(msg.as_bytes())
+        attachments = [part for part in parsed_msg.walk() if part.get_filename()]
+
+        assert parsed_msg.is_multipart()
+        assert parsed_msg['Subject'] == msg.subject
+        assert len(parsed_msg.get_all('MIME-Version')) == 1
+        assert 'Hello' in parsed_msg.get_payload()[0].as_string()
+        assert len(attachments) == 1
+        assert attachments[0].get_content_type() == 'application/pdf'
+        assert attachments[0].get_payload(decode=True) == self.content
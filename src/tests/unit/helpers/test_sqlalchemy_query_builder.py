@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, sqlite
+
+from app.helpers.sqlalchemy_query_builder import FullTextMatch, SearchShapeCache
+from app.models import Role, User
+from tests.base.base_unit_test import TestBaseUnit
+
+
+# pylint: disable=attribute-defined-outside-init
+class TestSearchShapeCache(TestBaseUnit):
+    @pytest.fixture(autouse=True)
+    def setup_extra(self):
+        self.cache = SearchShapeCache(maxsize=2)
+
+    def test_get_or_create_counts_hits_and_misses(self):
+        factory = MagicMock(return_value='clause')
+
+        assert self.cache.get_or_create(('search', 'a'), factory) == 'clause'
+        assert self.cache.get_or_create(('search', 'a'), factory) == 'clause'
+
+        factory.assert_called_once()
+        assert self.cache.cache_info() == {'hits': 1, 'misses': 1, 'maxsize': 2, 'currsize': 1}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.get_or_create('a', lambda: 'a')
+        self.cache.get_or_create('b', lambda: 'b')
+        self.cache.get_or_create('a', lambda: 'a')
+        self.cache.get_or_create('c', lambda: 'c')
+
+        factory = MagicMock(return_value='b')
+        self.cache.get_or_create('b', factory)
+        self.cache.get_or_create('a', factory)
+
+        assert factory.call_count == 2
+        assert self.cache.cache_info()['currsize'] == 2
+
+    def test_zero_maxsize_disables_the_cache(self):
+        cache = SearchShapeCache(maxsize=0)
+        factory = MagicMock(return_value='clause')
+
+        cache.get_or_create('a', factory)
+        cache.get_or_create('a', factory)
+
+        assert factory.call_count == 2
+        assert cache.cache_info() == {'hits': 0, 'misses': 2, 'maxsize': 0, 'currsize': 0}
+
+    def test_clear(self):
+        self.cache.get_or_create('a', lambda: 'a')
+        self.cache.clear()
+
+        assert self.cache.cache_info() == {'hits': 0, 'misses': 0, 'maxsize': 2, 'currsize': 0}
+
+
+class TestFullTextMatch(TestBaseUnit):
+    def test_mysql_field_with_fulltext_index_uses_match_against(self):
+        clause = FullTextMatch(User.name, 'John')
+
+        assert str(clause.compile(dialect=mysql.dialect())) == 'MATCH (users.name) AGAINST (%s IN BOOLEAN MODE)'
+
+    def test_mysql_field_without_fulltext_index_falls_back_to_like(self):
+        clause = FullTextMatch(Role.label, 'John')
+
+        assert str(clause.compile(dialect=mysql.dialect())) == "roles.label LIKE concat('%%', %s, '%%')"
+
+    def test_sqlite_falls_back_to_like(self):
+        clause = FullTextMatch(User.name, 'John')
+
+        assert str(clause.compile(dialect=sqlite.dialect())) == "users.name LIKE '%' || ? || '%'"
+
+    @pytest.mark.parametrize(
+        'dialect, expected_value',
+        [(mysql.dialect(), '"a@b.com  John "'), (sqlite.dialect(), 'a@b.com "John"')],
+        ids=['mysql binds a phrase', 'sqlite binds the value'],
+    )
+    def test_boolean_mode_operators_are_matched_as_text(self, dialect, expected_value):
+        clause = FullTextMatch(User.name, sa.bindparam('search_0_0', type_=User.name.type))
+
+        compiled = clause.compile(dialect=dialect)
+        bind_processor = compiled.binds['search_0_0'].type.bind_processor(dialect)
+        bind_value = compiled.construct_params({'search_0_0': 'a@b.com "John"'})['search_0_0']
+
+        assert (bind_processor(bind_value) if bind_processor else bind_value) == expected_value
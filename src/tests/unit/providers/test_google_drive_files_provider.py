@@ -3,10 +3,12 @@ import uuid
 from unittest import mock
 from unittest.mock import MagicMock, patch
 
+import httplib2
 import pytest
 from flask import current_app
 
 from app.providers.google_drive import GoogleDriveFilesProvider
+from app.providers.google_drive.google_drive_files_provider import UPLOAD_CHUNK_SIZE
 from app.utils.constants import FOLDER_MIME_TYPE, PDF_MIME_TYPE
 from tests.base.base_unit_test import TestBaseUnit
 
@@ -191,7 +193,9 @@ class TestGoogleDriveFilesProvider(TestBaseUnit):
 
         result = provider.create_file_from_stream(**file_params, file_stream=file_stream, fields=fields)
 
-        mock_media_io_base_upload.assert_called_once_with(file_stream, mimetype=PDF_MIME_TYPE)
+        mock_media_io_base_upload.assert_called_once_with(
+            file_stream, mimetype=PDF_MIME_TYPE, chunksize=UPLOAD_CHUNK_SIZE, resumable=True
+        )
         mock_files.create.assert_called_once_with(**payload)
         mock_create.execute.assert_called_once()
         assert result == file_data
@@ -293,7 +297,9 @@ class TestGoogleDriveFilesProvider(TestBaseUnit):
 
         result = provider.upload_file_from_stream(**file_params, file_stream=file_stream, fields=fields)
 
-        mock_media_io_base_upload.assert_called_once_with(file_stream, mimetype=PDF_MIME_TYPE)
+        mock_media_io_base_upload.assert_called_once_with(
+            file_stream, mimetype=PDF_MIME_TYPE, chunksize=UPLOAD_CHUNK_SIZE, resumable=True
+        )
         mock_files.update.assert_called_once_with(**payload)
         mock_update.execute.assert_called_once()
         assert result == file_data
@@ -380,3 +386,39 @@ class TestGoogleDriveFilesProvider(TestBaseUnit):
         assert isinstance(result, io.BytesIO)
         assert result.tell() == 0  # NOTE: The .tell() method on a file-like object (such as io.BytesIO) returns
         #       the current position of the file pointer. Ensure seek(0) was called.
+
+    @pytest.mark.parametrize(
+        'start, end, expected_ranges, expected_content',
+        [
+            (0, None, ['bytes=0-3', 'bytes=4-7', 'bytes=8-9'], b'0123456789'),
+            (2, 6, ['bytes=2-5', 'bytes=6-6'], b'23456'),
+            (10, None, ['bytes=10-13'], b''),
+        ],
+        ids=['whole file', 'range', 'range after the end of the file'],
+    )
+    def test_stream_file_content(self, stub_gdrive_files_provider, start, end, expected_ranges, expected_content):
+        provider, mock_files = stub_gdrive_files_provider
+        content = b'0123456789'
+
+        def request(uri, method, headers):
+            first_byte, last_byte = map(int, headers['range'].removeprefix('bytes=').split('-'))
+
+            if first_byte >= len(content):
+                return httplib2.Response({'status': 416, 'content-range': f'bytes */{len(content)}'}), b''
+
+            last_byte = min(last_byte, len(content) - 1)
+            response = httplib2.Response(
+                {'status': 206, 'content-range': f'bytes {first_byte}-{last_byte}/{len(content)}'}
+            )
+            return response, content[first_byte : last_byte + 1]
+
+        mock_request = mock_files.get_media.return_value
+        mock_request.uri = 'https://www.googleapis.com/drive/v3/files/file_id?alt=media'
+        mock_request.headers = {'accept': '*/*'}
+        mock_request.http.request.side_effect = request
+
+        chunks = list(provider.stream_file_content('file_id', chunk_size=4, start=start, end=end))
+
+        assert b''.join(chunks) == expected_content
+        assert all(len(chunk) <= 4 for chunk in chunks)
+        assert [call.kwargs['headers']['range'] for call in mock_request.http.request.call_args_list] == expected_ranges
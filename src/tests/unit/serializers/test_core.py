@@ -3,7 +3,7 @@ from types import SimpleNamespace
 import pytest
 from marshmallow import ValidationError
 
-from app.helpers.sqlalchemy_query_builder import EQUAL_OP, GREATER_THAN_OP
+from app.helpers.sqlalchemy_query_builder import EQUAL_OP, GREATER_THAN_OP, KeysetClauseBuilder
 from app.repositories.base import BaseRepository
 from app.serializers import SearchSerializer
 from app.serializers.core import RepositoryMixin
@@ -99,7 +99,8 @@ class TestSearchSerializer(TestBaseUnit):
                     'field_operator': [
                         (
                             'Must be one of: '
-                            'between, contains, endswith, eq, gt, gte, in, lt, lte, ncontains, ne, nin, startswith.'
+                            'between, contains, endswith, eq, gt, gte, in, lt, lte, match, ncontains, ne, nin, '
+                            'startswith.'
                         )
                     ]
                 }
@@ -136,3 +137,54 @@ class TestSearchSerializer(TestBaseUnit):
 
         with pytest.raises(ValidationError):
             self.serializer.load({'search': [{'field_operator': EQUAL_OP, 'field_value': 'test'}]})
+
+    def test_valid_after_cursor(self):
+        cursor = KeysetClauseBuilder().encode_cursor(
+            SimpleNamespace(name='test', id=42), [('name', 'asc'), ('id', 'asc')]
+        )
+        valid_data = {'order': [{'field_name': 'name', 'sorting': 'asc'}], 'items_per_page': 10, 'after': cursor}
+
+        result = self.serializer.load(valid_data)
+        assert result == valid_data
+
+    def test_after_cursor_with_page_number(self):
+        cursor = KeysetClauseBuilder().encode_cursor(SimpleNamespace(id=42), [('id', 'asc')])
+
+        with pytest.raises(ValidationError) as exc_info:
+            self.serializer.load({'page_number': 2, 'after': cursor})
+
+        assert {'after': ['page_number and after cannot be used together']} == exc_info.value.messages
+
+    def test_invalid_after_cursor(self):
+        with pytest.raises(ValidationError) as exc_info:
+            self.serializer.load({'after': 'invalid-cursor'})
+
+        assert {'after': ['Invalid cursor']} == exc_info.value.messages
+
+    def test_after_cursor_does_not_match_order(self):
+        cursor = KeysetClauseBuilder().encode_cursor(SimpleNamespace(id=42), [('id', 'asc')])
+
+        with pytest.raises(ValidationError) as exc_info:
+            self.serializer.load({'order': [{'field_name': 'name', 'sorting': 'desc'}], 'after': cursor})
+
+        assert {'after': ["Cursor doesn't match the requested order"]} == exc_info.value.messages
+
+    def test_after_cursor_skips_order_fields_not_in_model(self):
+        class SampleModel:
+            id = 'id'
+            name = 'name'
+
+        serializer = SearchSerializer(db_model=SampleModel)
+        order = [{'field_name': 'fake', 'sorting': 'desc'}, {'field_name': 'name', 'sorting': 'asc'}]
+        sort_keys = KeysetClauseBuilder.get_sort_keys({'order': order}, SampleModel)
+        cursor = KeysetClauseBuilder().encode_cursor(SimpleNamespace(name='test', id=42), sort_keys)
+
+        result = serializer.load({'order': order, 'after': cursor})
+        assert sort_keys == [('name', 'asc'), ('id', 'asc')]
+        assert result == {'order': order, 'after': cursor}
+
+    def test_invalid_count_strategy(self):
+        with pytest.raises(ValidationError) as exc_info:
+            self.serializer.load({'count': 'fake'})
+
+        assert {'count': ['Must be one of: cached, estimated, exact, none.']} == exc_info.value.messages
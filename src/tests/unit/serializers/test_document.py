@@ -1,4 +1,5 @@
 # pylint: disable=attribute-defined-outside-init, unused-argument, protected-access
+import io
 from datetime import datetime, UTC
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
@@ -11,6 +12,7 @@ from app.models import Document
 from app.models.document import StorageTypes
 from app.repositories import DocumentRepository
 from app.serializers import DocumentAttachmentSerializer, DocumentSerializer
+from app.serializers.document import MIME_TYPE_SNIFF_SIZE
 from tests.base.base_unit_test import TestBaseUnit
 
 
@@ -93,6 +95,22 @@ class TestDocumentSerializer(TestBaseUnit):
         assert isinstance(exc_info.value, ValidationError)
         assert exc_info.value.messages == ['mime_type not valid']
 
+    @patch('magic.from_buffer')
+    def test_request_file_stream_is_sniffed_from_its_head(self, mock_magic):
+        mock_magic.return_value = 'application/pdf'
+        file_content = b'%PDF-1.4' + b'0' * MIME_TYPE_SNIFF_SIZE
+        data = {'mime_type': 'application/pdf', 'file_stream': io.BytesIO(file_content)}
+
+        assert DocumentSerializer.valid_request_file(data) == data
+        mock_magic.assert_called_once_with(file_content[:MIME_TYPE_SNIFF_SIZE], mime=True)
+        assert data['file_stream'].tell() == 0
+
+    def test_empty_request_file_stream(self):
+        with pytest.raises(ValidationError) as exc_info:
+            DocumentSerializer.valid_request_file({'mime_type': 'application/pdf', 'file_stream': io.BytesIO()})
+
+        assert exc_info.value.messages == ['empty file']
+
     @pytest.mark.parametrize(
         'file_data',
         [None, b'', ''],
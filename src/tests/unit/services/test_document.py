@@ -1,4 +1,7 @@
 # pylint: disable=attribute-defined-outside-init, unused-argument
+import hashlib
+import io
+import os
 import uuid
 from datetime import datetime, UTC
 from types import SimpleNamespace
@@ -7,9 +10,10 @@ from unittest.mock import MagicMock
 
 import pytest
 from flask import current_app
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
 
-from app.file_storages import LocalStorage
+from app.file_storages import ContentAddressedStorage, LocalStorage
+from app.helpers.gdrive_cache import GoogleDriveCache
 from app.models.document import StorageTypes
 from app.repositories import DocumentRepository
 from app.services import DocumentService
@@ -141,6 +145,85 @@ class TestCreateLocalDocumentService(_TestDocumentBaseService):
         assert exc_info.value.code == 400
         assert exc_info.value.description == 'The file already exists!'
 
+    @mock.patch('app.services.document.uuid', autospec=True)
+    @mock.patch('app.services.document.current_user', autospec=True)
+    @mock.patch('app.services.role.db.session')
+    def test_create_local_document_from_stream(self, mock_session, mock_current_user, mock_uuid):
+        mock_current_user.id = self.created_by_id
+        mock_uuid.uuid1.return_value = MagicMock(hex=self.internal_basename)
+
+        local_storage = MagicMock(spec=LocalStorage)
+        local_storage.get_filename.return_value = self.pdf_filename
+        local_storage.get_filesize.return_value = self.document.size
+
+        mock_doc_repo = MagicMock(spec=DocumentRepository)
+        mock_doc_repo.create.return_value = self.document
+        document_service = DocumentService(
+            mock_doc_repo, local_storage, self.mock_gdrive_files_provider, self.mock_gdrive_permissions_provider
+        )
+
+        filepath = f'{current_app.config.get("STORAGE_DIRECTORY")}/{self.internal_filename}'
+        pdf_file = f'{current_app.config.get("MOCKUP_DIRECTORY")}/{self.pdf_filename}'
+
+        with open(pdf_file, 'rb') as file_stream:
+            document_service.create(mime_type=PDF_MIME_TYPE, filename=pdf_file, file_stream=file_stream)
+
+        local_storage.save_stream.assert_called_once_with(
+            file_stream, filepath, max_size=current_app.config['DOCUMENT_MAX_SIZE']
+        )
+        local_storage.save_bytes.assert_not_called()
+        mock_session.add.assert_called_once_with(self.document)
+
+    @mock.patch('app.services.document.current_user', autospec=True)
+    def test_create_document_file_is_too_large(self, mock_current_user):
+        mock_current_user.id = 1
+        current_app.config['DOCUMENT_MAX_SIZE'] = 4
+        document_service = DocumentService(
+            gdrive_files_provider=self.mock_gdrive_files_provider,
+            gdrive_permissions_provider=self.mock_gdrive_permissions_provider,
+        )
+
+        with pytest.raises(RequestEntityTooLarge) as exc_info:
+            document_service.create(
+                mime_type=PDF_MIME_TYPE, filename=self.pdf_filename, file_stream=io.BytesIO(b'%PDF-1.4')
+            )
+
+        assert exc_info.value.code == 413
+        assert exc_info.value.description == 'The file is larger than 4 bytes!'
+
+    @mock.patch('app.services.document.current_user', autospec=True)
+    @mock.patch('app.services.role.db.session')
+    def test_create_documents_with_the_same_content_share_the_blob(self, mock_session, mock_current_user, tmp_path):
+        mock_current_user.id = self.created_by_id
+        mock_doc_repo = MagicMock(spec=DocumentRepository)
+        mock_doc_repo.create.return_value = self.document
+        document_service = DocumentService(
+            mock_doc_repo,
+            ContentAddressedStorage(str(tmp_path)),
+            self.mock_gdrive_files_provider,
+            self.mock_gdrive_permissions_provider,
+        )
+        digest = hashlib.sha256(b'%PDF-1.4').hexdigest()
+
+        for _ in range(2):
+            document_service.create(
+                mime_type=PDF_MIME_TYPE, filename=self.pdf_filename, file_stream=io.BytesIO(b'%PDF-1.4')
+            )
+
+        assert mock_doc_repo.create.call_args_list == 2 * [
+            mock.call(
+                created_by=self.created_by_id,
+                name=self.pdf_filename,
+                internal_filename=digest,
+                mime_type=PDF_MIME_TYPE,
+                directory_path=f'{tmp_path}/{digest[:2]}',
+                content_hash=digest,
+                size=8,
+            )
+        ]
+        assert os.listdir(tmp_path) == [digest[:2]]
+        assert os.listdir(tmp_path / digest[:2]) == [digest]
+
 
 class TestCreateGoogleDriveDocumentService(_TestDocumentBaseService):
     @pytest.fixture(autouse=True)
@@ -223,6 +306,55 @@ class TestCreateGoogleDriveDocumentService(_TestDocumentBaseService):
         mock_session.flush.assert_called_once()
         assert isinstance(created_document, _DocumentStub)
 
+    @mock.patch('app.services.document.current_user', autospec=True)
+    @mock.patch('app.services.role.db.session')
+    def test_create_google_drive_document_uploads_the_request_stream(self, mock_session, mock_current_user):
+        mock_current_user.id = self.created_by_id
+        self.mock_gdrive_files_provider.folder_exists.return_value = {'id': 5}
+        self.mock_gdrive_files_provider.create_file_from_stream.return_value = {
+            'id': 7,
+            'mimeType': PDF_MIME_TYPE,
+            'size': 8,
+            'name': self.pdf_filename,
+        }
+        document_service = DocumentService(
+            document_repository=MagicMock(spec=DocumentRepository),
+            gdrive_files_provider=self.mock_gdrive_files_provider,
+            gdrive_permissions_provider=self.mock_gdrive_permissions_provider,
+        )
+        file_stream = io.BytesIO(b'%PDF-1.4')
+        file_stream.seek(4)
+
+        document_service.create(
+            mime_type=PDF_MIME_TYPE,
+            filename=self.pdf_filename,
+            file_stream=file_stream,
+            storage_type=StorageTypes.GDRIVE.value,
+        )
+
+        assert self.mock_gdrive_files_provider.create_file_from_stream.call_args.kwargs['file_stream'] is file_stream
+        assert file_stream.tell() == 0
+
+    @mock.patch('app.services.document.current_user', autospec=True)
+    def test_create_google_drive_document_file_is_too_large(self, mock_current_user):
+        mock_current_user.id = self.created_by_id
+        current_app.config['DOCUMENT_MAX_SIZE'] = 4
+        self.mock_gdrive_files_provider.folder_exists.return_value = {'id': 5}
+        document_service = DocumentService(
+            gdrive_files_provider=self.mock_gdrive_files_provider,
+            gdrive_permissions_provider=self.mock_gdrive_permissions_provider,
+        )
+
+        with pytest.raises(RequestEntityTooLarge):
+            document_service.create(
+                mime_type=PDF_MIME_TYPE,
+                filename=self.pdf_filename,
+                file_stream=io.BytesIO(b'%PDF-1.4'),
+                storage_type=StorageTypes.GDRIVE.value,
+            )
+
+        self.mock_gdrive_files_provider.create_file_from_stream.assert_not_called()
+
 
 class TestFindByIdDocumentService(_TestDocumentBaseService):
     def test_find_by_id_document(self):
@@ -410,6 +542,30 @@ class TestSaveGoogleDriveDocumentService(_TestDocumentBaseService):
         )
         assert isinstance(created_document, _DocumentStub)
 
+    def test_save_google_drive_document_invalidates_the_cache(self):
+        self.document.storage_type = StorageTypes.GDRIVE
+        self.document.storage_id = 'storage_id'
+        self.mock_gdrive_files_provider.upload_file_from_stream.return_value = {
+            'mimeType': PDF_MIME_TYPE,
+            'size': 8,
+            'name': 'example.pdf',
+        }
+        mock_doc_repo = MagicMock(spec=DocumentRepository)
+        mock_doc_repo.find_by_id.return_value = self.document
+        mock_gdrive_cache = MagicMock(spec=GoogleDriveCache)
+        document_service = DocumentService(
+            document_repository=mock_doc_repo,
+            gdrive_files_provider=self.mock_gdrive_files_provider,
+            gdrive_permissions_provider=self.mock_gdrive_permissions_provider,
+            gdrive_cache=mock_gdrive_cache,
+        )
+
+        document_service.save(
+            self.document_id, mime_type=PDF_MIME_TYPE, filename='example.pdf', file_stream=io.BytesIO(b'%PDF-1.4')
+        )
+
+        mock_gdrive_cache.invalidate.assert_called_once_with('storage_id')
+
 
 class TestDeleteDocumentService(_TestDocumentBaseService):
     def test_delete_document(self):
@@ -516,7 +672,7 @@ class TestGetDocumentContentDocumentService(_TestDocumentBaseService):
             (
                 {'storage_type': StorageTypes.GDRIVE.value},
                 lambda doc: {
-                    'path_or_file': b'',
+                    'size': doc.size,
                     'mimetype': PDF_MIME_TYPE,
                     'as_attachment': 0,
                 },
@@ -532,7 +688,7 @@ class TestGetDocumentContentDocumentService(_TestDocumentBaseService):
         mock_doc_repo.find_by_id.return_value = document
         expected_send_file_kwargs = expected_kwargs(document)
 
-        self.mock_gdrive_files_provider.download_file_content.return_value = b''
+        self.mock_gdrive_files_provider.stream_file_content.return_value = iter([b'%PDF'])
         document_service = DocumentService(
             mock_doc_repo,
             gdrive_files_provider=self.mock_gdrive_files_provider,
@@ -540,7 +696,44 @@ class TestGetDocumentContentDocumentService(_TestDocumentBaseService):
         )
 
         file_data = document_service.get_document_content(document.id, request_args)
+        stream_content = file_data.pop('stream_content')
 
         mock_doc_repo.find_by_id.assert_called_once_with(document.id)
-        self.mock_gdrive_files_provider.download_file_content.assert_called_once_with(document.storage_id)
         assert file_data == expected_send_file_kwargs
+        self.mock_gdrive_files_provider.stream_file_content.assert_not_called()
+
+        assert list(stream_content(2, 9)) == [b'%PDF']
+        self.mock_gdrive_files_provider.stream_file_content.assert_called_once_with(
+            document.storage_id, chunk_size=current_app.config['GDRIVE_DOWNLOAD_CHUNK_SIZE'], start=2, end=9
+        )
+
+    def test_get_cached_gdrive_document_content(self, tmp_path):
+        mock_doc_repo = mock.MagicMock(spec=DocumentRepository)
+        document = GDriveDocumentFactory()
+        mock_doc_repo.find_by_id.return_value = document
+        self.mock_gdrive_files_provider.get_file_metadata.return_value = {
+            'id': document.storage_id,
+            'size': '8',
+            'modifiedTime': '2026-10-18T10:00:00.000Z',
+            'md5Checksum': 'md5',
+        }
+        self.mock_gdrive_files_provider.stream_file_content.side_effect = lambda *args, **kwargs: iter([b'%PDF-1.4'])
+        document_service = DocumentService(
+            mock_doc_repo,
+            gdrive_files_provider=self.mock_gdrive_files_provider,
+            gdrive_permissions_provider=self.mock_gdrive_permissions_provider,
+            gdrive_cache=GoogleDriveCache(str(tmp_path), max_size=1024),
+        )
+
+        file_data = document_service.get_document_content(document.id, {})
+
+        assert file_data['size'] == 8
+        assert file_data['etag'] == 'md5'
+        assert list(file_data['stream_content'](0, None)) == [b'%PDF-1.4']
+
+        file_data = document_service.get_document_content(document.id, {})
+
+        assert file_data['etag'] == 'md5'
+        with open(file_data['path_or_file'], 'rb') as f:
+            assert f.read() == b'%PDF-1.4'
+        self.mock_gdrive_files_provider.stream_file_content.assert_called_once()